@@ -0,0 +1,112 @@
+"""
+Worst-case inputs for comparison sorts, in the spirit of McIlroy's
+"A Killer Adversary for Quicksort" (1999).
+
+killer_adversary() runs a sort over n placeholder items through a
+comparison oracle.  Every item starts as "gas" (value not decided yet);
+whenever two gas items are compared, one of them is frozen to the next
+smallest value, preferring the item most recently seen as a pivot
+candidate.  The values therefore get fixed in exactly the order that makes
+the sort's choices as bad as they can be, and the frozen values, read back
+in input order, are an input on which the same sort goes quadratic.  It
+works for any deterministic comparison sort, but costs as many Python
+comparisons as the sort makes, so it is meant for n up to a few thousand:
+
+    data = killer_adversary(2000, lomuto_quicksort)
+
+lomuto_killer() builds such inputs for the lab's quicksort.cpp (Lomuto
+partition around the last element) directly, in O(n): it simulates the
+partition with every pivot chosen as the smallest or the largest value
+left, so each call peels off one element and the sort makes exactly
+n(n-1)/2 comparisons.  With an rng the min/max choice is random per step,
+giving a different pathological permutation per seed rather than just
+the (also quadratic) sorted or reverse input.  datagen exposes it as the
+"adversary" distribution.
+"""
+
+import numpy as np
+
+
+def lomuto_quicksort(items, less_equal):
+    """Python port of quicksort.cpp: Lomuto partition around the last element.
+
+    Sorts `items` in place comparing with less_equal(a, b) (a <= b); an
+    explicit stack replaces the recursion, whose depth is n on bad inputs.
+    """
+    stack = [(0, len(items) - 1)]
+    while stack:
+        l, r = stack.pop()
+        if l >= r:
+            continue
+        pivot = items[r]
+        i = l
+        for j in range(l, r):
+            if less_equal(items[j], pivot):
+                items[i], items[j] = items[j], items[i]
+                i += 1
+        items[i], items[r] = items[r], items[i]
+        # Same visiting order as the recursive version: left part first
+        stack.append((i + 1, r))
+        stack.append((l, i - 1))
+    return items
+
+
+def killer_adversary(n, sort=lomuto_quicksort):
+    """Values 0..n-1 (as an int64 array) on which `sort` makes about its worst number of comparisons.
+
+    sort(items, less_equal) must sort a list of opaque items using only
+    less_equal.
+    """
+    gas = n
+    values = [gas] * n
+    solid = 0
+    candidate = None
+
+    def freeze(item):
+        nonlocal solid
+        values[item] = solid
+        solid += 1
+
+    def less_equal(x, y):
+        nonlocal candidate
+        if values[x] == gas and values[y] == gas:
+            freeze(x if x == candidate else y)
+        if values[x] == gas:
+            candidate = x
+        elif values[y] == gas:
+            candidate = y
+        return values[x] <= values[y]
+
+    sort(list(range(n)), less_equal)
+    # Items the sort never had to tell apart keep their input order
+    for item in range(n):
+        if values[item] == gas:
+            freeze(item)
+    return np.array(values, dtype=np.int64)
+
+
+def lomuto_killer(n, rng=None):
+    """Ranks 0..n-1 that drive a last-element Lomuto quicksort to n(n-1)/2 comparisons.
+
+    Each simulated partition takes the smallest remaining rank as its pivot
+    (the pivot goes to the front, the front element to the back) or the
+    largest (the range just shrinks from the right); rng picks between them,
+    otherwise the pivot is always the smallest.
+    """
+    ranks = np.empty(n, dtype=np.int64)
+    slots = list(range(n))   # slot of the simulated array -> input position
+    take_largest = (rng.random(n) < 0.5).tolist() if rng is not None else [False] * n
+    low, high = 0, n - 1     # ranks still unassigned
+    l, r = 0, n - 1
+    for step in range(n):
+        pivot = slots[r]
+        if take_largest[step]:
+            ranks[pivot] = high
+            high -= 1
+            r -= 1
+        else:
+            ranks[pivot] = low
+            low += 1
+            slots[r] = slots[l]
+            l += 1
+    return ranks
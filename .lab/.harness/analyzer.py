@@ -0,0 +1,394 @@
+"""
+Measurement machinery shared by the lab's analyzers.
+
+An analyzer measures tasks (one trial each: quicksort's (size,
+distribution, trial), mergesort's (size, iteration, algorithm)) and
+summarizes them per size.  Analyzer holds what does not depend on the
+algorithms: the worker pool, dataset cache and binary workspace, the
+journal that lets an interrupted sweep resume, the noise guard, the
+pinned-core scheduler, the async runner with its deadlines, telemetry
+and the regression check against the results store.  A subclass sets
+up its backends (configure) and says how tasks map to journal keys,
+telemetry labels and async jobs.
+
+Every setting lives on one AnalyzerOptions object (each analyzer module
+extends it with its own), instead of a long keyword list:
+
+    options = QuickSortOptions(journal=True, verify=True, noise=True)
+    analyzer = QuickSortAnalyzer(options)
+    serial = QuickSortAnalyzer(options.replace(concurrency=1, journal=None))
+
+The scheduler builds its worker replicas from replica_config(), a serial
+copy of the options with the executables resolved.
+
+Only what the classes themselves need is imported up front; numpy and the
+rest of the measurement stack (dataset cache, noise guard, scheduler, async
+runner, telemetry, results store) are imported by the methods that use
+them, so an analyzer module loads quickly for lab.py report.
+"""
+
+import copy
+import subprocess
+import time
+
+from arrayio import BINARY, IO_MODES, TEXT, BinaryWorkspace, encode_text, payload_size
+from build import DEFAULT_PROFILE
+from journal import Journal, default_path
+from runner import PREEMPTION_THRESHOLD, RunnerError, WorkerPool
+
+
+class AnalyzerOptions:
+    """How an analyzer measures; an analyzer module subclasses it for its own settings"""
+
+    def __init__(self, persistent=True, io_mode=TEXT, cache=True, concurrency=1, noise_safe=False,
+                 sampler=None, preemption_threshold=PREEMPTION_THRESHOLD, journal=None,
+                 profile=DEFAULT_PROFILE, verify=False, async_concurrency=None, noise=None, telemetry=None):
+        # Persistent mode keeps one --serve process per executable for the whole sweep
+        self.persistent = persistent
+        # Binary mode exchanges memory-mapped int32 files instead of text
+        self.io_mode = io_mode
+        # Inputs come ready-serialized from the on-disk dataset cache (a DatasetCache
+        # to choose its location/budget, or False to disable)
+        self.cache = cache
+        # concurrency != 1 spreads trials over pinned worker processes, each running
+        # a serial replica of the analyzer; noise_safe leaves a core to the OS and
+        # uses one hardware thread per physical core (see scheduler)
+        self.concurrency = concurrency
+        self.noise_safe = noise_safe
+        # An AdaptiveSampler replaces the fixed trial counts: each size is sampled
+        # until its sort-time medians have tight confidence intervals
+        self.sampler = sampler
+        # Trials with more involuntary context switches per second of sort than this
+        # count as preempted (see runner.preempted)
+        self.preemption_threshold = preemption_threshold
+        # Completed trials are appended to a durable journal (a path, a Journal, or
+        # True for one per configuration) so an interrupted sweep resumes where it stopped
+        self.journal = journal
+        # Executables not given explicitly are built (or taken from the build cache)
+        # under this compiler profile
+        self.profile = profile
+        # Check every trial's output is the sorted input (after, not during, the timed run)
+        self.verify = verify
+        # async_concurrency runs that many executables at once on an asyncio event
+        # loop, under per-size deadlines from the fitted model; runs that miss their
+        # deadline are kept as censored trials (one-shot processes only, so it needs
+        # persistent=False and replaces concurrency)
+        self.async_concurrency = async_concurrency
+        # A NoiseGuard (or True for the default one) measures trials in a seeded random
+        # order, in blocks checked against host load, CPU frequency and a calibration probe
+        self.noise = noise
+        # JSON-lines events for every trial, size and sweep (a path, tcp://host:port,
+        # unix:///path, a Telemetry, or True for the default file), for watching a long
+        # sweep with telemetry.py tail
+        self.telemetry = telemetry
+
+    def replace(self, **changes):
+        """A copy with some settings changed"""
+        unknown = set(changes) - set(vars(self))
+        if unknown:
+            raise TypeError(f"Unknown options: {', '.join(sorted(unknown))}")
+        options = copy.copy(self)
+        vars(options).update(changes)
+        return options
+
+    def check(self):
+        """Raise ValueError for settings that cannot be combined"""
+        if self.io_mode not in IO_MODES:
+            raise ValueError(f"io_mode must be one of {IO_MODES}")
+        if self.async_concurrency:
+            # The async runner starts a one-shot process per run and sets its own concurrency
+            if self.persistent:
+                raise ValueError("async_concurrency runs one-shot processes; pass persistent=False")
+            if self.concurrency != 1 or self.noise_safe:
+                raise ValueError("async_concurrency cannot be combined with concurrency or noise_safe")
+            if self.noise:
+                raise ValueError("The noise guard orders serial or pinned trials, not the async runner's")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in vars(self).items())})"
+
+
+class Analyzer:
+    """Base of the lab's analyzers; see the module docstring for what a subclass provides"""
+
+    # Options class of the analyzer (an AnalyzerOptions subclass)
+    Options = AnalyzerOptions
+    # Stem of the default telemetry and journal files
+    name = None
+    # Seconds per unit of the analyzer's measurement times (1e-3 for ms)
+    time_scale = 1
+    # Seed of the noise guard's order
+    seed = 42
+    # Tasks the noise guard keeps in one block (e.g. both algorithms on one dataset); None for none
+    noise_group = None
+
+    def __init__(self, options=None):
+        from async_runner import AsyncRunner
+        from dataset_cache import DatasetCache
+        from noise import NoiseGuard
+        from scheduler import SweepScheduler
+        from telemetry import Telemetry, default_path as telemetry_path
+
+        options = self.Options() if options is None else options
+        options.check()
+        self.options = options
+        self.pool = WorkerPool() if options.persistent else None
+        # The subclass's own settings and its backends ({name: Backend}), which may use the pool
+        self.backends = {}
+        self.configure(options)
+        if options.async_concurrency and any(backend.in_process for backend in self.backends.values()):
+            raise ValueError("The async runner only runs executables")
+        self.results = []
+        # Raw per-trial times of every size, for the historical results store
+        self.samples = []
+        self.io_mode = options.io_mode
+        self.workspace = BinaryWorkspace() if options.io_mode == BINARY else None
+        self.cache = DatasetCache() if options.cache is True else (options.cache or None)
+        self.persistent = options.persistent
+        self.scheduler = (SweepScheduler(options.concurrency, options.noise_safe)
+                          if options.concurrency != 1 else None)
+        self.sampler = options.sampler
+        self.preemption_threshold = options.preemption_threshold
+        self.async_runner = AsyncRunner(options.async_concurrency) if options.async_concurrency else None
+        self.deadlines = {}
+        self.verify = options.verify
+        self.noise = NoiseGuard(seed=self.seed) if options.noise is True else (options.noise or None)
+        self.telemetry = Telemetry.open(telemetry_path(self.name) if options.telemetry is True
+                                        else options.telemetry)
+        journal = options.journal
+        if journal is True:
+            journal = default_path(self.name, self.sweep_config())
+        self.journal = Journal(journal, self.sweep_config()) if isinstance(journal, str) else journal
+
+    def configure(self, options):
+        """Set up the subclass's settings and fill self.backends (the worker pool exists by now)"""
+        raise NotImplementedError
+
+    def sweep_config(self):
+        """Settings that must match for journaled trials to be reused (also stored with each run)"""
+        raise NotImplementedError
+
+    def replica_options(self):
+        """Options a worker replica needs beyond the serial defaults (its resolved executables)"""
+        raise NotImplementedError
+
+    def replica_config(self):
+        """Constructor arguments for a serial copy of this analyzer in a worker process"""
+        return dict(options=self.options.replace(
+            concurrency=1, noise_safe=False, sampler=None, journal=None, async_concurrency=None, noise=None,
+            telemetry=None, cache=self.cache or False, **self.replica_options()))
+
+    def close(self):
+        """Shut down the persistent workers and remove binary scratch files"""
+        if self.scheduler is not None:
+            self.scheduler.close()
+        for backend in self.backends.values():
+            backend.close()
+        if self.pool is not None:
+            self.pool.close()
+        if self.workspace is not None:
+            self.workspace.close()
+        self.telemetry.close()
+
+    def encode(self, data, name="trial"):
+        """Encode raw data for the selected I/O mode"""
+        if self.workspace is not None:
+            return self.workspace.payload(data, name)
+        return encode_text(data)
+
+    # Tasks, journal keys and telemetry labels
+
+    def journal_key(self, task):
+        """Journal keys are (algorithm, distribution, size, trial)"""
+        raise NotImplementedError
+
+    def task_for_key(self, key):
+        """The task a journal key was recorded for"""
+        raise NotImplementedError
+
+    def trial_labels(self, task):
+        """algorithm, distribution, size and trial of a task, for its telemetry event"""
+        algorithm, distribution, size, trial = self.journal_key(task)
+        return dict(algorithm=algorithm, distribution=distribution, size=size, trial=trial)
+
+    def measure_task(self, task):
+        """Measure one task (also what the scheduler's replicas run)"""
+        raise NotImplementedError
+
+    def run_tasks(self, tasks):
+        """Measure tasks in order, reusing measurements already in the journal"""
+        if self.journal is not None:
+            keys = [self.journal_key(task) for task in tasks]
+            return self.journal.replay(keys, lambda missing: self.measure_tasks(
+                [self.task_for_key(key) for key in missing]))
+        return self.measure_tasks(tasks)
+
+    def record_block(self, tasks, measurements):
+        """Journal and report a block as soon as the noise guard accepts it (its run only returns at the end)"""
+        from async_runner import censored
+
+        for task, measurement in zip(tasks, measurements):
+            self.emit_trial(task, measurement)
+            # Censored trials are only a lower bound under this run's deadline; retry them on resume
+            if self.journal is not None and measurement is not None and not censored(measurement):
+                self.journal.record(self.journal_key(task), measurement)
+
+    def emit_trial(self, task, measurement):
+        """Telemetry event for one newly measured task"""
+        from async_runner import censored
+        from telemetry import trial_fields
+
+        if censored(measurement):
+            fields = dict(status='censored', deadline=measurement['deadline'])
+        elif measurement is None:
+            fields = dict(status='failed')
+        else:
+            fields = dict(status='ok', **trial_fields(measurement, scale=self.time_scale))
+            if 'preempted' in measurement:
+                fields['preempted'] = measurement['preempted']
+        self.telemetry.emit('trial', **self.trial_labels(task), **fields)
+
+    def reported(self, tasks, measurements):
+        """Pass measurements through as they arrive, emitting a trial event for each"""
+        for task, measurement in zip(tasks, measurements):
+            self.emit_trial(task, measurement)
+            yield measurement
+
+    def measure_tasks(self, tasks):
+        """Measure tasks in order, serially, on the pinned worker pool or on the async runner
+
+        Under the noise guard they run in random order, block by block, and
+        still come back in task order.
+        """
+        tasks = list(tasks)
+        if self.async_runner is not None:
+            return self.reported(tasks, self.measure_tasks_async(tasks))
+        if self.noise is not None:
+            return iter(self.noise.run(tasks, self.measure_block, group=self.noise_group, done=self.record_block))
+        return self.reported(tasks, self.measure_block(tasks))
+
+    def measure_block(self, tasks):
+        """Measure tasks in order, serially or on the pinned worker pool"""
+        if self.scheduler is None:
+            return (self.measure_task(task) for task in tasks)
+        return self.scheduler.map(type(self), self.replica_config(), "measure_task", tasks)
+
+    # The async runner
+
+    def async_group(self, task):
+        """Tasks run concurrently while this is the same for consecutive tasks (e.g. their size)"""
+        raise NotImplementedError
+
+    def async_job(self, k, task):
+        """(size, deadline key, backend, payload) of the k-th task of a concurrent group
+
+        Tasks with the same deadline key share a DeadlinePolicy; concurrent
+        payloads need distinct names so their binary files don't collide.
+        """
+        raise NotImplementedError
+
+    async def measure_async(self, backend, payload, deadline):
+        """One task on the async runner (censored if it misses its deadline; None if it fails)"""
+        try:
+            return await self.async_runner.run(backend.executable_path, payload, deadline, keep_output=self.verify)
+        except RunnerError as e:
+            print(f"Error running {backend.name}: {e}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(payload), kind='runner',
+                                message=str(e))
+            return None
+
+    def measure_tasks_async(self, tasks):
+        """Yield measurements group by group, running each group's tasks concurrently under deadlines"""
+        import asyncio
+
+        from async_runner import DeadlinePolicy, censored
+        from verify import VerificationError
+
+        tasks = list(tasks)
+        start = 0
+        while start < len(tasks):
+            end = start
+            while end < len(tasks) and self.async_group(tasks[end]) == self.async_group(tasks[start]):
+                end += 1
+            # Deadlines follow the model fitted to the sizes finished so far
+            jobs = []
+            for k, task in enumerate(tasks[start:end]):
+                size, key, backend, payload = self.async_job(k, task)
+                deadline = self.deadlines.setdefault(key, DeadlinePolicy()).deadline(size)
+                jobs.append((size, key, backend, payload, deadline))
+
+            async def measure_all():
+                return await self.async_runner.gather(self.measure_async(backend, payload, deadline)
+                                                      for _, _, backend, payload, deadline in jobs)
+            measurements = asyncio.run(measure_all())
+
+            for (size, key, backend, payload, _), measurement in zip(jobs, measurements):
+                if measurement is not None and not censored(measurement):
+                    self.deadlines[key].observe(size, measurement['wall'] * self.time_scale)
+                    if self.verify:
+                        try:
+                            backend.verify(payload, measurement.pop('output', None))
+                        except (VerificationError, subprocess.TimeoutExpired) as e:
+                            print(f"Incorrect output from {backend.name} with input size {size}: {e}")
+                            measurement = None
+                yield measurement
+            start = end
+
+    # Sweeps
+
+    @staticmethod
+    def timed(steps):
+        """Add the seconds each step (a tuple) took to produce"""
+        steps = iter(steps)
+        while True:
+            started = time.perf_counter()
+            step = next(steps, None)
+            if step is None:
+                return
+            yield step + (time.perf_counter() - started,)
+
+    @staticmethod
+    def shares(elapsed, walls):
+        """Split a batch's elapsed time between its sizes by their measurements' wall time"""
+        total = sum(walls)
+        return [elapsed * (wall / total if total > 0 else 1 / len(walls)) for wall in walls]
+
+    def sweep(self, measure):
+        """Call measure() for a sweep, reporting it to telemetry as interrupted or failed if it raises"""
+        started = time.perf_counter()
+        try:
+            return measure()
+        except BaseException as e:
+            self.telemetry.emit('sweep_end', status='interrupted' if isinstance(e, KeyboardInterrupt) else 'failed',
+                                elapsed=time.perf_counter() - started, error=repr(e))
+            raise
+
+    def save_to_store(self, store, label=None):
+        """Record the measured trials with build and host info; returns the run id"""
+        raise NotImplementedError
+
+    def check_regressions(self):
+        """Store this run and compare it with the pinned baseline (or the previous run)"""
+        from results_store import ResultsStore, format_comparison, reference_run
+
+        with ResultsStore() as store:
+            try:
+                run_id = self.save_to_store(store)
+            except ValueError as e:
+                # Everything was replayed from the journal: that run is already recorded
+                print(f"\nRun not recorded: {e}")
+                return
+            base_id = reference_run(store, run_id)
+            print(f"\nRecorded run #{run_id} in {store.path}")
+            if base_id is not None:
+                try:
+                    rows = store.compare(base_id, run_id)
+                except ValueError as e:
+                    print(f"Not compared: {e}")
+                    return
+                if rows:
+                    print(f"Compared with run #{base_id}:")
+                    print(format_comparison(rows))
@@ -0,0 +1,102 @@
+"""
+Array encodings understood by the sort programs.
+
+Text is the original "n a1 ... an" format.  Binary is raw little-endian
+int32 with no header (the element count is the file size / 4); the harness
+writes it through a memory map and the programs map it back in bulk (see
+bench.hpp), so neither side parses or formats numbers.  Large outputs stay
+on disk and are only mapped when something actually looks at them.
+
+numpy is imported by the functions that touch array data, so the format
+constants (and runner, which imports this module) load without it.
+"""
+
+import os
+import shutil
+import tempfile
+
+BINARY_DTYPE = '<i4'
+BINARY_ITEMSIZE = 4
+TEXT = "text"
+BINARY = "binary"
+IO_MODES = (TEXT, BINARY)
+
+
+def encode_text(data):
+    """Encode an array in the text format read by the sort programs"""
+    import numpy as np
+
+    # numpy scalars format far slower than plain ints
+    values = data.tolist() if isinstance(data, np.ndarray) else data
+    return f"{len(values)}\n" + " ".join(map(str, values)) + "\n"
+
+
+def payload_size(payload):
+    """Number of elements in a raw array, text payload or BinaryPayload"""
+    if isinstance(payload, str):
+        return int(payload[:payload.index("\n")])
+    return len(payload)
+
+
+def write_binary(path, data):
+    """Write an array as raw little-endian int32 through a memory map"""
+    import numpy as np
+
+    data = np.asarray(data)
+    if len(data) == 0:
+        # mmap cannot map an empty file
+        open(path, 'wb').close()
+        return
+    mapped = np.memmap(path, dtype=BINARY_DTYPE, mode='w+', shape=(len(data),))
+    mapped[:] = data
+    mapped.flush()
+    del mapped
+
+
+def read_binary(path):
+    """Memory-map a raw int32 file read-only (nothing is loaded up front)"""
+    import numpy as np
+
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=BINARY_DTYPE)
+    return np.memmap(path, dtype=BINARY_DTYPE, mode='r')
+
+
+class BinaryPayload:
+    """Input/output file pair handed to a program running in --binary mode"""
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+
+    def request_line(self):
+        """Request understood by a --binary --serve worker: one path per line"""
+        if "\n" in self.input_path or "\n" in self.output_path:
+            raise ValueError("binary payload paths cannot contain newlines")
+        return f"{self.input_path}\n{self.output_path}\n"
+
+    def __len__(self):
+        return os.path.getsize(self.input_path) // BINARY_ITEMSIZE
+
+    def read_output(self):
+        return read_binary(self.output_path)
+
+
+class BinaryWorkspace:
+    """Scratch directory holding the binary input/output files of a sweep"""
+
+    def __init__(self, root=None):
+        self.path = tempfile.mkdtemp(prefix="sortbench-", dir=root)
+
+    def payload(self, data, name="trial"):
+        """Write data to <name>.in.bin and return the payload for it"""
+        input_path = os.path.join(self.path, f"{name}.in.bin")
+        write_binary(input_path, data)
+        return self.payload_for(input_path, name)
+
+    def payload_for(self, input_path, name="trial"):
+        """Payload for an existing binary input (e.g. a cached dataset)"""
+        return BinaryPayload(input_path, os.path.join(self.path, f"{name}.out.bin"))
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
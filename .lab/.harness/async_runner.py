@@ -0,0 +1,152 @@
+"""
+Asyncio runner: several sort executables in flight, each with a deadline.
+
+The blocking runners in runner.py wait on one child at a time, so a hung
+or quadratic trial (quicksort's last-element pivot on sorted input) holds
+up the sweep until a fixed 30 s timeout.  AsyncRunner starts programs with
+asyncio.create_subprocess_exec, feeds them through the non-blocking stream
+API and keeps at most `concurrency` of them running.
+
+Each trial gets its own deadline.  DeadlinePolicy fits the complexity
+models (see fitting) to the wall times observed so far and allows
+`factor` times the best model's prediction for the next size, within
+[floor, ceiling]; until three sizes are known only the ceiling applies.
+A trial that misses its deadline is killed and reaped, and comes back as
+a censored measurement instead of an error:
+
+    {'censored': True, 'wall': <deadline>, 'deadline': <deadline>, 'n': <n>}
+
+which says "took longer than wall" and keeps the point in the data.
+
+Without wait4() the resource usage comes from the TIMING line alone: the
+request's getrusage() deltas inside the program, startup excluded.
+"""
+
+import asyncio
+import time
+
+import fitting
+from arrayio import BinaryPayload, payload_size
+from runner import BINARY_FLAG, TIMING_FLAG, RunnerError, output_file, parse_timing
+
+DEFAULT_CEILING = 30.0
+
+
+def censored(measurement):
+    """Whether a measurement is a timed-out (lower bound only) trial"""
+    return measurement is not None and measurement.get('censored', False)
+
+
+class DeadlinePolicy:
+    def __init__(self, factor=5.0, floor=1.0, ceiling=DEFAULT_CEILING):
+        self.factor = factor
+        self.floor = floor
+        self.ceiling = ceiling
+        self.observed = {}
+        self._fit = None
+
+    def observe(self, size, wall):
+        """Record a completed (uncensored) trial's wall time"""
+        self.observed.setdefault(size, []).append(wall)
+        self._fit = None
+
+    def model(self):
+        """Best complexity model of the median wall time per size, or None"""
+        if self._fit is None and len(self.observed) >= 3:
+            sizes = sorted(self.observed)
+            times = [sorted(self.observed[n])[len(self.observed[n]) // 2] for n in sizes]
+            try:
+                self._fit = fitting.fit_models(sizes, times)[0]
+            except ValueError:
+                self._fit = None
+        return self._fit
+
+    def deadline(self, size):
+        """Seconds a trial of this size may take"""
+        fit = self.model()
+        if fit is None:
+            return self.ceiling
+        predicted = float(fitting.predict(fit, size))
+        return min(max(self.factor * predicted, self.floor), self.ceiling)
+
+
+class AsyncRunner:
+    def __init__(self, concurrency=1):
+        self.concurrency = max(concurrency, 1)
+
+    async def run(self, executable_path, payload, deadline=DEFAULT_CEILING, keep_output=False):
+        """Run one trial; a censored measurement if it misses its deadline.
+
+        keep_output has a text run write its stdout to a temporary file, kept
+        open under 'output' (see run_executable); otherwise it is discarded.
+        """
+        sink = output_file() if keep_output and isinstance(payload, str) else None
+        args = [executable_path, TIMING_FLAG]
+        input_bytes = payload.encode() if isinstance(payload, str) else None
+        if isinstance(payload, BinaryPayload):
+            args += [BINARY_FLAG, payload.input_path, payload.output_path]
+
+        start_time = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE if input_bytes is not None else asyncio.subprocess.DEVNULL,
+            stdout=sink if sink is not None else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE)
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(input_bytes), deadline)
+        except asyncio.TimeoutError:
+            if sink is not None:
+                sink.close()
+            return {'censored': True, 'wall': deadline, 'deadline': deadline, 'n': payload_size(payload)}
+        except BaseException:
+            if sink is not None:
+                sink.close()
+            raise
+        finally:
+            # Also covers cancellation of the whole batch: never leave a child behind
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        end_time = time.perf_counter()
+
+        stderr = stderr.decode(errors='replace')
+        if process.returncode != 0:
+            if sink is not None:
+                sink.close()
+            raise RunnerError(f"{executable_path} exited with {process.returncode}: {stderr}")
+        measurement = parse_timing(stderr)
+        measurement['wall'] = end_time - start_time
+        if sink is not None:
+            measurement['output'] = sink
+        return measurement
+
+    async def gather(self, coroutines):
+        """Await coroutines with at most `concurrency` running; results in order"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        tasks = [asyncio.ensure_future(bounded(c)) for c in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def run_all(self, jobs, keep_output=False):
+        """Run (executable_path, payload, deadline) jobs; measurements in job order.
+
+        A job that fails outright yields None, like the blocking analyzers' trials.
+        """
+        async def job(executable_path, payload, deadline):
+            try:
+                return await self.run(executable_path, payload, deadline, keep_output)
+            except RunnerError as e:
+                print(f"Error running {executable_path}: {e}")
+                return None
+
+        return asyncio.run(self.gather(job(*j) for j in jobs))
@@ -0,0 +1,261 @@
+"""
+Pluggable sort backends for the lab analyzers.
+
+A backend sorts one payload (a text string or a BinaryPayload, see
+arrayio) and returns a measurement shaped like run_executable()'s: wall
+and per-phase times in seconds, the element count and resource usage.
+
+* ExecutableBackend runs a compiled sort program, one process per trial or
+  through a persistent WorkerPool, exactly as the analyzers always have.
+* InProcessBackend calls a Python function on the data, timed with
+  perf_counter_ns and no process boundary: "parse" decodes the payload into
+  the function's input type, "sort" is the call itself and "emit" turns the
+  result back into an array (kept for verify()).
+
+An executable's text output is only kept when run() is asked to
+(keep_output), spooled to a temporary file that verify() reads back.
+
+The in-process baselines (IN_PROCESS) are pure-Python ports of
+quicksort.cpp and mergesort.cpp, the built-in sorted() and numpy.sort with
+each of its kinds.  Set against an executable's wall time they show how
+much of a measurement is harness overhead; numpy.sort is the fast, tuned
+reference.
+
+    backend = make_backend("numpy-stable")          # or an executable path
+    measurement = backend.run(encode_text(data), keep_output=True)
+    backend.verify(payload)                         # the last run's output; raises VerificationError
+
+An in-process trial can only be cut short by SIGALRM, so the timeout is
+enforced in the main thread only.  Its rusage counters are the analyzer
+process's own deltas over the trial.  Its max_rss_kb is None: the only
+peak on offer is ru_maxrss, the whole analyzer's lifetime high, which says
+nothing about the trial.
+"""
+
+import platform
+import resource
+import signal
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from arrayio import BinaryPayload, read_binary
+from results_store import build_info
+from runner import run_executable
+from verify import VerificationError, binary_blocks, text_input_blocks, verify, verify_output
+
+
+def quicksort_port(values):
+    """quicksort.cpp in Python: Lomuto partition around the last element (in place)"""
+    # Explicit stack: the recursion is n deep on sorted or adversarial input
+    stack = [(0, len(values) - 1)]
+    while stack:
+        l, r = stack.pop()
+        if l >= r:
+            continue
+        pivot = values[r]
+        i = l
+        for j in range(l, r):
+            if values[j] <= pivot:
+                values[i], values[j] = values[j], values[i]
+                i += 1
+        values[i], values[r] = values[r], values[i]
+        stack.append((i + 1, r))
+        stack.append((l, i - 1))
+    return values
+
+
+def _merge(values, left, mid, right):
+    L = values[left:mid + 1]
+    R = values[mid + 1:right + 1]
+    i = j = 0
+    k = left
+    while i < len(L) and j < len(R):
+        if L[i] <= R[j]:
+            values[k] = L[i]
+            i += 1
+        else:
+            values[k] = R[j]
+            j += 1
+        k += 1
+    values[k:right + 1] = L[i:] if i < len(L) else R[j:]
+
+
+def mergesort_port(values, left=0, right=None):
+    """mergesort.cpp in Python: top-down merge sort through copied halves (in place)"""
+    if right is None:
+        right = len(values) - 1
+    if left < right:
+        mid = left + (right - left) // 2
+        mergesort_port(values, left, mid)
+        mergesort_port(values, mid + 1, right)
+        _merge(values, left, mid, right)
+    return values
+
+
+class Backend:
+    """Something that sorts payloads and reports how long it took"""
+
+    name = None
+    in_process = False
+
+    def run(self, payload, timeout=30, keep_output=False):
+        """Sort payload once; keep_output keeps what verify() needs of this run"""
+        raise NotImplementedError
+
+    def verify(self, payload, output=None):
+        """Check the output of the last run on payload, or a run's captured output (raises VerificationError)"""
+        raise NotImplementedError
+
+    def build_info(self, algorithm):
+        """What was measured, for the results store"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ExecutableBackend(Backend):
+    def __init__(self, executable_path, pool=None):
+        self.executable_path = executable_path
+        self.name = executable_path
+        # A WorkerPool keeps the program running between trials; it belongs to the caller
+        self.pool = pool
+        # File holding the stdout of the last text run with keep_output, for verify()
+        self.output = None
+
+    def discard_output(self):
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+    def run(self, payload, timeout=30, keep_output=False):
+        self.discard_output()
+        if self.pool is not None:
+            measurement = self.pool.run(self.executable_path, payload, timeout=timeout, keep_output=keep_output)
+        else:
+            measurement = run_executable(self.executable_path, payload, timeout=timeout, keep_output=keep_output)
+        self.output = measurement.pop('output', None)
+        return measurement
+
+    def verify(self, payload, output=None):
+        if output is None:
+            # verify_output closes the file
+            output, self.output = self.output, None
+        return verify_output(payload, output)
+
+    def build_info(self, algorithm):
+        return build_info(algorithm, self.executable_path)
+
+    def close(self):
+        self.discard_output()
+
+
+class _Alarm:
+    """Raise TimeoutExpired in the main thread after `timeout` seconds"""
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.armed = timeout and threading.current_thread() is threading.main_thread()
+
+    def expire(self, signum, frame):
+        raise subprocess.TimeoutExpired(self.name, self.timeout)
+
+    def __enter__(self):
+        if self.armed:
+            self.previous = signal.signal(signal.SIGALRM, self.expire)
+            signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self.previous)
+
+
+class InProcessBackend(Backend):
+    in_process = True
+
+    def __init__(self, name, sort, input_type=list):
+        """sort(values) returns the sorted values; input_type is list or np.ndarray"""
+        self.name = name
+        self.sort = sort
+        self.input_type = input_type
+        self.output = None
+
+    def decode(self, payload):
+        if isinstance(payload, BinaryPayload):
+            values = np.array(read_binary(payload.input_path))
+        else:
+            values = np.fromstring(payload, dtype=np.int64, sep=" ")[1:]
+        return values.tolist() if self.input_type is list else values
+
+    def run(self, payload, timeout=30, keep_output=False):
+        # The result array is always kept: building it is the timed emit phase
+        self.output = None
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        with _Alarm(self.name, timeout):
+            start = time.perf_counter_ns()
+            values = self.decode(payload)
+            parsed = time.perf_counter_ns()
+            output = self.sort(values)
+            done = time.perf_counter_ns()
+            self.output = np.asarray(output, dtype=np.int64)
+            emitted = time.perf_counter_ns()
+        after = resource.getrusage(resource.RUSAGE_SELF)
+
+        measurement = {
+            'parse': (parsed - start) / 1e9,
+            'sort': (done - parsed) / 1e9,
+            'emit': (emitted - done) / 1e9,
+            'wall': (emitted - start) / 1e9,
+            'n': len(self.output),
+            'max_rss_kb': None,
+        }
+        for key, field in (('minor_faults', 'ru_minflt'), ('major_faults', 'ru_majflt'),
+                           ('voluntary_ctx', 'ru_nvcsw'), ('involuntary_ctx', 'ru_nivcsw'),
+                           ('user_time', 'ru_utime'), ('system_time', 'ru_stime')):
+            measurement[key] = getattr(after, field) - getattr(before, field)
+        return measurement
+
+    def verify(self, payload, output=None):
+        if self.output is None:
+            raise VerificationError(f"{self.name} has no output to check")
+        if isinstance(payload, BinaryPayload):
+            expected = binary_blocks(payload.input_path)
+        else:
+            expected = text_input_blocks(payload)
+        return verify(expected, [self.output])
+
+    def build_info(self, algorithm):
+        return {
+            'algorithm': algorithm,
+            'executable': f"in-process:{self.name}",
+            'executable_sha256': None,
+            'source_sha256': None,
+            'compiler': f"{platform.python_implementation()} {platform.python_version()}, numpy {np.__version__}",
+            'compiler_flags': None,
+        }
+
+
+IN_PROCESS = {
+    "python-quicksort": (quicksort_port, list),
+    "python-mergesort": (mergesort_port, list),
+    "sorted": (sorted, list),
+    "numpy-quicksort": (lambda values: np.sort(values, kind='quicksort'), np.ndarray),
+    "numpy-mergesort": (lambda values: np.sort(values, kind='mergesort'), np.ndarray),
+    "numpy-heapsort": (lambda values: np.sort(values, kind='heapsort'), np.ndarray),
+    "numpy-stable": (lambda values: np.sort(values, kind='stable'), np.ndarray),
+}
+
+
+def make_backend(spec, pool=None):
+    """A Backend from a Backend, an IN_PROCESS name or an executable path"""
+    if isinstance(spec, Backend):
+        return spec
+    if spec in IN_PROCESS:
+        return InProcessBackend(spec, *IN_PROCESS[spec])
+    return ExecutableBackend(spec, pool)
@@ -0,0 +1,236 @@
+// Benchmark driver shared by the .lab sort programs.
+//
+// Default mode keeps the original contract: read "n a1 ... an" from stdin and
+// print the sorted array on stdout.  Passing --timing additionally reports how
+// long each phase took on stderr as one machine-readable line:
+//
+//     TIMING n=<n> parse_ns=<ns> sort_ns=<ns> emit_ns=<ns>
+//
+// so the analysis scripts can separate the sort itself from process startup
+// and text I/O.
+//
+// --serve turns the program into a persistent worker: it keeps reading
+// length-prefixed arrays from stdin until EOF and answers each one with a
+// single line (empty for an empty array), flushing after every answer.
+//
+// --binary switches to raw little-endian int32 files that are memory-mapped
+// and copied in bulk instead of parsed as text: `prog --binary IN OUT` sorts
+// one file, and with --serve each request is two lines on stdin, the input
+// path then the output path (so paths may contain spaces), answered by
+// "OK <n>".  The element count is the file size divided by four.
+//
+// The TIMING line also carries the resource usage of the request (getrusage
+// deltas plus peak RSS), which is what a persistent worker's trials are
+// accounted by:
+//
+//     ... maxrss_kb=<kb> minflt=<n> majflt=<n> nvcsw=<n> nivcsw=<n>
+//         utime_us=<us> stime_us=<us> sort_nivcsw=<n>
+//
+// sort_nivcsw counts the involuntary context switches of the sort phase
+// alone: while parsing, the program is woken by every pipe write of the
+// harness, so the request's nivcsw mostly measures I/O, not preemption.
+//
+// Peak RSS is reset before every request through /proc/self/clear_refs where
+// the kernel supports it, and a worker hands the array and any freed heap
+// back to the OS after answering (malloc_trim), so a request does not inherit
+// the footprint of an earlier, larger one.  It still includes the worker's
+// own baseline (binary, libc, stdio buffers), so compare peaks per process
+// mode: one-shot and --serve numbers differ by that baseline.
+#pragma once
+#include <bits/stdc++.h>
+#include <fcntl.h>
+#include <malloc.h>
+#include <sys/mman.h>
+#include <sys/resource.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+namespace bench {
+
+using Clock = std::chrono::steady_clock;
+
+inline long long elapsedNs(Clock::time_point from, Clock::time_point to) {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(to - from).count();
+}
+
+inline void readArray(std::istream& in, std::vector<int>& a, int len) {
+    a.assign(len, 0);
+    for (int i = 0; i < len; i++) in >> a[i];
+}
+
+static_assert(sizeof(int) == sizeof(int32_t), "binary format assumes 32-bit int");
+
+inline bool loadBinary(const std::string& path, std::vector<int>& a) {
+    int fd = open(path.c_str(), O_RDONLY);
+    if (fd < 0) return false;
+    struct stat st;
+    if (fstat(fd, &st) != 0) {
+        close(fd);
+        return false;
+    }
+    size_t bytes = st.st_size - st.st_size % sizeof(int32_t);
+    a.resize(bytes / sizeof(int32_t));
+    if (bytes) {
+        void* src = mmap(nullptr, bytes, PROT_READ, MAP_PRIVATE, fd, 0);
+        if (src == MAP_FAILED) {
+            close(fd);
+            return false;
+        }
+        memcpy(a.data(), src, bytes);
+        munmap(src, bytes);
+    }
+    close(fd);
+    return true;
+}
+
+inline bool storeBinary(const std::string& path, const std::vector<int>& a) {
+    int fd = open(path.c_str(), O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (fd < 0) return false;
+    size_t bytes = a.size() * sizeof(int32_t);
+    bool ok = ftruncate(fd, bytes) == 0;
+    if (ok && bytes) {
+        void* dst = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        ok = dst != MAP_FAILED;
+        if (ok) {
+            memcpy(dst, a.data(), bytes);
+            munmap(dst, bytes);
+        }
+    }
+    close(fd);
+    return ok;
+}
+
+inline void writeArray(std::ostream& out, const std::vector<int>& a, bool alwaysNewline = false) {
+    for (size_t i = 0; i < a.size(); ++i) {
+        if (i) out << ' ';
+        out << a[i];
+    }
+    if (!a.empty() || alwaysNewline) out << '\n';
+    out.flush();
+}
+
+inline rusage usageNow() {
+    rusage ru;
+    getrusage(RUSAGE_SELF, &ru);
+    return ru;
+}
+
+inline long long micros(const timeval& tv) {
+    return tv.tv_sec * 1000000LL + tv.tv_usec;
+}
+
+// Writing "5" to clear_refs resets the VmHWM (peak RSS) watermark
+inline void resetPeakRss() {
+    std::ofstream("/proc/self/clear_refs") << "5";
+}
+
+inline long peakRssKb(const rusage& ru) {
+    std::ifstream status("/proc/self/status");
+    std::string line;
+    while (std::getline(status, line)) {
+        if (line.rfind("VmHWM:", 0) == 0) return std::stol(line.substr(6));
+    }
+    return ru.ru_maxrss;
+}
+
+inline void reportTiming(size_t n, long long parseNs, long long sortNs, long long emitNs,
+                         const rusage& before, const rusage& after, long sortNivcsw) {
+    std::cerr << "TIMING n=" << n << " parse_ns=" << parseNs
+              << " sort_ns=" << sortNs << " emit_ns=" << emitNs
+              << " maxrss_kb=" << peakRssKb(after)
+              << " minflt=" << after.ru_minflt - before.ru_minflt
+              << " majflt=" << after.ru_majflt - before.ru_majflt
+              << " nvcsw=" << after.ru_nvcsw - before.ru_nvcsw
+              << " nivcsw=" << after.ru_nivcsw - before.ru_nivcsw
+              << " utime_us=" << micros(after.ru_utime) - micros(before.ru_utime)
+              << " stime_us=" << micros(after.ru_stime) - micros(before.ru_stime)
+              << " sort_nivcsw=" << sortNivcsw << std::endl;
+}
+
+template <class SortFn>
+int run(int argc, char** argv, SortFn sortFn) {
+    bool timing = false, serve = false, binary = false;
+    std::vector<std::string> paths;
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        if (arg == "--timing") {
+            timing = true;
+        } else if (arg == "--serve") {
+            serve = true;
+        } else if (arg == "--binary") {
+            binary = true;
+        } else if (arg.rfind("--", 0) != 0) {
+            paths.push_back(arg);
+        } else {
+            std::cerr << "unknown option: " << arg << std::endl;
+            return 2;
+        }
+    }
+    if (binary && !serve && paths.size() != 2) {
+        std::cerr << "usage: " << argv[0] << " --binary INPUT OUTPUT" << std::endl;
+        return 2;
+    }
+
+    std::ios::sync_with_stdio(false);
+    std::cin.tie(nullptr);
+
+    std::vector<int> arr;
+    int answered = 0;
+    do {
+        std::string inPath, outPath;
+        Clock::time_point t0;
+        rusage u0;
+        if (binary) {
+            if (serve) {
+                if (!std::getline(std::cin, inPath) || !std::getline(std::cin, outPath)) break;
+            } else {
+                inPath = paths[0];
+                outPath = paths[1];
+            }
+            if (timing) resetPeakRss();
+            u0 = usageNow();
+            t0 = Clock::now();
+            if (!loadBinary(inPath, arr)) {
+                std::cerr << "cannot read " << inPath << std::endl;
+                return 1;
+            }
+        } else {
+            int len;
+            if (!(std::cin >> len)) break;
+            // Start after the length so a worker's idle time between requests is not counted
+            if (timing) resetPeakRss();
+            u0 = usageNow();
+            t0 = Clock::now();
+            readArray(std::cin, arr, len);
+        }
+        long sortNivcsw = timing ? usageNow().ru_nivcsw : 0;
+        auto t1 = Clock::now();
+        sortFn(arr);
+        auto t2 = Clock::now();
+        if (timing) sortNivcsw = usageNow().ru_nivcsw - sortNivcsw;
+        if (binary) {
+            if (!storeBinary(outPath, arr)) {
+                std::cerr << "cannot write " << outPath << std::endl;
+                return 1;
+            }
+            if (serve) std::cout << "OK " << arr.size() << std::endl;
+        } else {
+            writeArray(std::cout, arr, serve);
+        }
+        auto t3 = Clock::now();
+
+        if (timing) reportTiming(arr.size(), elapsedNs(t0, t1), elapsedNs(t1, t2), elapsedNs(t2, t3), u0, usageNow(),
+                                 sortNivcsw);
+        ++answered;
+        if (serve) {
+            // Release the array's capacity and freed sort buffers before the next request
+            std::vector<int>().swap(arr);
+            malloc_trim(0);
+        }
+    } while (serve);
+
+    // A one-shot run with no input is an error; a worker may see zero requests
+    return answered || serve ? 0 : 1;
+}
+
+}  // namespace bench
@@ -0,0 +1,170 @@
+"""
+Build matrix for the lab's sort programs.
+
+Every `.lab/*/*.cpp` is an algorithm (named after the file) and can be
+compiled under any number of optimization profiles.  Builds are cached in
+.lab/.cache/builds under a hash of the sources (the .cpp plus the local
+headers it includes), the compiler version and the full flag list, so a
+profile is only recompiled after something it depends on changed.  Each
+binary gets a `<binary>.flags` file next to it, which the results store
+records with every run.
+
+Missing builds are compiled in parallel, one compiler process per CPU:
+
+    builds = build_matrix(profiles=["O2", "O3-native-lto"])
+    path = executable_for("quicksort", "O3")
+
+The default profile matches the editor's build task (-std=c++17 -O2 -Wall).
+"""
+
+import glob
+import hashlib
+import os
+import re
+import subprocess
+import tempfile
+
+LAB_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_ROOT = os.path.join(LAB_ROOT, ".cache", "builds")
+COMPILER = "g++"
+BASE_FLAGS = ("-std=c++17", "-Wall")
+PROFILES = {
+    "O0": ("-O0",),
+    "O2": ("-O2",),
+    "O3": ("-O3",),
+    "O2-lto": ("-O2", "-flto"),
+    "O3-native": ("-O3", "-march=native"),
+    "O3-native-lto": ("-O3", "-march=native", "-flto"),
+}
+DEFAULT_PROFILE = "O2"
+DEFAULT_MATRIX = ("O0", "O2", "O3", "O3-native", "O3-native-lto")
+
+
+class BuildError(RuntimeError):
+    pass
+
+
+def discover_sources(root=LAB_ROOT):
+    """{algorithm name: source path} for every .lab/*/*.cpp"""
+    return {os.path.splitext(os.path.basename(path))[0]: path
+            for path in sorted(glob.glob(os.path.join(root, "*", "*.cpp")))}
+
+
+def source_files(source):
+    """The source file followed by every local header it includes (transitively)"""
+    files, pending = [], [os.path.abspath(source)]
+    while pending:
+        path = pending.pop(0)
+        if path in files or not os.path.exists(path):
+            continue
+        files.append(path)
+        with open(path, errors='replace') as f:
+            for header in re.findall(r'^\s*#\s*include\s*"([^"]+)"', f.read(), re.MULTILINE):
+                pending.append(os.path.normpath(os.path.join(os.path.dirname(path), header)))
+    return files
+
+
+def source_hash(source):
+    """SHA-256 over a source file and its local headers (None if it is missing)"""
+    files = source_files(source)
+    if not files:
+        return None
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.basename(path).encode() + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def compiler_version(compiler=COMPILER):
+    try:
+        output = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.splitlines()[0] if output else None
+
+
+def profile_flags(profile):
+    """Full compiler flag list of a named profile"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile {profile!r}; choose from {list(PROFILES)}")
+    return list(BASE_FLAGS) + list(PROFILES[profile])
+
+
+class Builder:
+    def __init__(self, root=DEFAULT_ROOT, compiler=COMPILER, jobs=None):
+        self.root = os.path.abspath(root)
+        self.compiler = compiler
+        self.jobs = jobs or os.cpu_count() or 1
+        self._version = None
+        os.makedirs(self.root, exist_ok=True)
+
+    @property
+    def version(self):
+        if self._version is None:
+            self._version = compiler_version(self.compiler) or self.compiler
+        return self._version
+
+    def key(self, source, flags):
+        """Cache key: sources, compiler and flags"""
+        ident = "\0".join([source_hash(source) or "", self.version] + list(flags))
+        return hashlib.sha256(ident.encode()).hexdigest()[:16]
+
+    def executable(self, source, flags):
+        """Cached binary path for a source under a flag list (built or not)"""
+        name = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.root, self.key(source, flags), name + ".out")
+
+    def build(self, source, profile=DEFAULT_PROFILE):
+        """Compile one source under a profile unless it is cached; returns a build dict"""
+        flags = profile_flags(profile)
+        path = self.executable(source, flags)
+        result = {
+            'algorithm': os.path.splitext(os.path.basename(source))[0],
+            'profile': profile,
+            'source': os.path.abspath(source),
+            'executable': path,
+            'flags': " ".join(flags),
+            'cached': os.path.exists(path),
+        }
+        if result['cached']:
+            return result
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Compile next to the target and rename, so concurrent builds never see a partial binary
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        try:
+            completed = subprocess.run([self.compiler] + flags + [source, "-o", tmp_path],
+                                       capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise BuildError(f"{self.compiler} failed for {source} ({profile}):\n{completed.stderr}")
+            with open(path + ".flags", 'w') as f:
+                f.write(result['flags'] + "\n")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return result
+
+    def build_matrix(self, sources=None, profiles=DEFAULT_MATRIX):
+        """Build every (algorithm, profile) pair in parallel; returns the build dicts in matrix order"""
+        sources = discover_sources() if sources is None else sources
+        pairs = [(source, profile) for source in sources.values() for profile in profiles]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(lambda pair: self.build(*pair), pairs))
+
+
+def build_matrix(sources=None, profiles=DEFAULT_MATRIX, jobs=None):
+    return Builder(jobs=jobs).build_matrix(sources, profiles)
+
+
+def executable_for(algorithm, profile=DEFAULT_PROFILE):
+    """Path of a discovered algorithm's binary under a profile, building it if needed"""
+    sources = discover_sources()
+    if algorithm not in sources:
+        raise ValueError(f"No source for {algorithm!r}; found {list(sources)}")
+    return Builder().build(sources[algorithm], profile)['executable']
@@ -0,0 +1,107 @@
+"""
+Headless chart rendering from plain-data specs.
+
+The analyzers describe each chart as a spec, a dict of lists and strings
+with no matplotlib objects in it, and render() draws it with the Agg
+backend straight to a file.  matplotlib (and numpy, for the fits) is only
+imported by render(), so measuring never pays for it and a report's parent
+process never loads it; since specs pickle, render_all() can draw several
+charts at once in worker processes:
+
+    spec = {'path': "sweep.png", 'figsize': (12, 8), 'panels': [{
+        'title': "QuickSort", 'xlabel': "n", 'ylabel': "seconds", 'xscale': 'log',
+        'series': [
+            {'kind': 'errorbar', 'x': sizes, 'y': times, 'yerr': stds, 'label': "sort", 'color': 'C0'},
+            {'kind': 'fit', 'x': sizes, 'y': times, 'color': 'C0', 'linestyle': ':'},
+        ]}]}
+    render_all([spec, ...])
+
+Series kinds are 'line' (plot, with an optional 'fmt' such as 'bo-'),
+'errorbar' (with 'yerr'), 'scatter' and 'fit' (the best-ranked fitting
+model over the points, drawn on a geometric grid).  Every other key of a
+series is passed to matplotlib as is; 'annotate' labels each point.
+Series without points are skipped.  Several panels share one figure
+side by side, under an optional 'suptitle'.
+"""
+
+import os
+
+DPI = 300
+
+
+def _draw(ax, series):
+    series = dict(series)
+    kind = series.pop('kind', 'line')
+    x = series.pop('x')
+    y = series.pop('y')
+    annotate = series.pop('annotate', None)
+    if not len(x):
+        return
+    if kind == 'line':
+        fmt = series.pop('fmt', None)
+        ax.plot(x, y, *([fmt] if fmt else []), **series)
+    elif kind == 'errorbar':
+        ax.errorbar(x, y, yerr=series.pop('yerr', None), **series)
+    elif kind == 'scatter':
+        ax.scatter(x, y, **series)
+    elif kind == 'fit':
+        import numpy as np
+
+        import fitting
+
+        try:
+            best = fitting.fit_models(x, y)[0]
+        except ValueError:
+            return
+        grid = np.geomspace(min(x), max(x), 200)
+        ax.plot(grid, fitting.predict(best, grid), label=f"fit: {fitting.describe(best)}", **series)
+    else:
+        raise ValueError(f"Unknown series kind {kind!r}")
+    if annotate is not None:
+        for xi, yi in zip(x, y):
+            ax.annotate(annotate['format'].format(yi), (xi, yi), textcoords="offset points",
+                        xytext=annotate.get('offset', (0, 10)), ha='center', fontsize=10,
+                        bbox=dict(boxstyle="round,pad=0.3", facecolor=annotate.get('facecolor', "white"), alpha=0.7))
+
+
+def render(spec):
+    """Draw one chart spec to spec['path'] with the Agg backend; returns the path"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    panels = spec['panels']
+    fig, axes = plt.subplots(1, len(panels), figsize=spec.get('figsize', (12, 8)),
+                             sharey=spec.get('sharey', False), squeeze=False)
+    for ax, panel in zip(axes[0], panels):
+        for series in panel['series']:
+            _draw(ax, series)
+        label_kwargs = panel.get('label_kwargs', {'fontsize': 12})
+        if panel.get('title'):
+            ax.set_title(panel['title'], **panel.get('title_kwargs', {'fontsize': 14}))
+        if panel.get('xlabel'):
+            ax.set_xlabel(panel['xlabel'], **label_kwargs)
+        if panel.get('ylabel'):
+            ax.set_ylabel(panel['ylabel'], **label_kwargs)
+        ax.set_xscale(panel.get('xscale', 'linear'))
+        ax.set_yscale(panel.get('yscale', 'linear'))
+        ax.legend(**panel.get('legend_kwargs', {'fontsize': 10}))
+        ax.grid(True, **panel.get('grid_kwargs', {'alpha': 0.3}))
+    if spec.get('suptitle'):
+        fig.suptitle(spec['suptitle'], **spec.get('suptitle_kwargs', {'fontsize': 16}))
+    fig.tight_layout()
+    fig.savefig(spec['path'], dpi=spec.get('dpi', DPI), bbox_inches='tight')
+    plt.close(fig)
+    return spec['path']
+
+
+def render_all(specs, jobs=None):
+    """Render chart specs, in parallel worker processes when there are several; returns their paths"""
+    specs = list(specs)
+    jobs = min(jobs or os.cpu_count() or 1, len(specs))
+    if jobs <= 1:
+        return [render(spec) for spec in specs]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(render, specs))
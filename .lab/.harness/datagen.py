@@ -0,0 +1,129 @@
+"""
+Vectorized test data generators shared by the lab analysis scripts.
+
+Every distribution is built from a seeded numpy Generator in a handful of
+whole-array operations (no per-element Python loop), so even 10^7 elements
+take milliseconds; the exception is "adversary", a quicksort worst case
+simulated step by step (about 0.3 s per 10^6 elements).  Values are int32
+in [1, high], where high defaults to 10 * n like the original merge sort
+analysis.  The ordered shapes (sorted, reverse, organ_pipe, and the base of
+nearly_sorted) are evenly spaced arange ramps, sliced or viewed backwards
+rather than sorted, so they depend on the seed only through their swaps.
+
+    generate("nearly_sorted", 100000, seed=(42, 100000, 0), swaps=50)
+
+Seeds can be anything numpy.random.default_rng accepts, including tuples,
+which makes it easy to derive independent streams per (size, trial).
+"""
+
+import numpy as np
+
+from adversary import lomuto_killer
+
+DTYPE = np.int32
+INT32_MAX = np.iinfo(DTYPE).max
+
+
+def _high(n, high):
+    return int(min(high if high is not None else max(10 * n, 10), INT32_MAX))
+
+
+def _ascending(n, high):
+    """Non-decreasing values spread evenly over [1, high], as a single arange"""
+    step = high // n if n else 1
+    if step:
+        # n * step <= high, so the ramp stays inside int32
+        return np.arange(1, n * step + 1, step, dtype=DTYPE)
+    # More elements than values: each value repeats for a run of about n / high
+    return (np.arange(n, dtype=np.int64) * high // n + 1).astype(DTYPE)
+
+
+def random_data(rng, n, high=None):
+    """Uniform random values"""
+    return rng.integers(1, _high(n, high), size=n, dtype=DTYPE, endpoint=True)
+
+
+def sorted_data(rng, n, high=None):
+    """Already sorted (ascending)"""
+    return _ascending(n, _high(n, high))
+
+
+def reverse_data(rng, n, high=None):
+    """Sorted in descending order (a reversed view of the ramp)"""
+    return _ascending(n, _high(n, high))[::-1]
+
+
+def duplicate_data(rng, n, high=None, unique=10):
+    """Few unique values, each repeated many times"""
+    keys = rng.integers(1, _high(n, high), size=max(unique, 1), dtype=DTYPE, endpoint=True)
+    return keys[rng.integers(0, len(keys), size=n)]
+
+
+def nearly_sorted_data(rng, n, high=None, swaps=None):
+    """Sorted, then `swaps` random disjoint pairs exchanged (default 1% of n)"""
+    data = _ascending(n, _high(n, high))
+    if swaps is None:
+        swaps = max(n // 100, 1)
+    swaps = min(swaps, n // 2)
+    if swaps:
+        idx = rng.choice(n, size=2 * swaps, replace=False)
+        left, right = idx[:swaps], idx[swaps:]
+        data[left], data[right] = data[right], data[left]
+    return data
+
+
+def organ_pipe_data(rng, n, high=None):
+    """Ascending to a single peak, then descending"""
+    data = _ascending(n, _high(n, high))
+    return np.concatenate((data[::2], data[1::2][::-1]))
+
+
+def sawtooth_data(rng, n, high=None, teeth=8):
+    """`teeth` ascending runs that each restart from the bottom"""
+    period = max(-(-n // max(teeth, 1)), 1)
+    ramp = np.arange(n, dtype=np.int64) % period
+    scale = max(_high(n, high) // period, 1)
+    return (ramp * scale + 1).astype(DTYPE)
+
+
+def zipf_data(rng, n, high=None, a=1.5):
+    """Zipf-skewed values: a few very frequent small keys and a long tail (a > 1)"""
+    if not a > 1:
+        raise ValueError(f"zipf exponent a must be > 1, got {a}")
+    # Inverse-CDF of the discrete power law P(X >= k) = k^(1 - a); much faster
+    # than rng.zipf's rejection sampler and identical in shape for a > 1
+    u = rng.random(n)
+    values = np.floor((1.0 - u) ** (-1.0 / (a - 1.0)))
+    np.minimum(values, _high(n, high), out=values)
+    return values.astype(DTYPE)
+
+
+def adversary_data(rng, n, high=None):
+    """Distinct values arranged so quicksort.cpp's last-element pivot is always the min or max"""
+    # A different killer permutation per seed (see adversary.lomuto_killer)
+    ranks = lomuto_killer(n, rng)
+    step = max(_high(n, high) // max(n, 1), 1)
+    return (ranks * step + 1).astype(DTYPE)
+
+
+DISTRIBUTIONS = {
+    "random": random_data,
+    "sorted": sorted_data,
+    "reverse": reverse_data,
+    "duplicate": duplicate_data,
+    "nearly_sorted": nearly_sorted_data,
+    "organ_pipe": organ_pipe_data,
+    "sawtooth": sawtooth_data,
+    "zipf": zipf_data,
+    "adversary": adversary_data,
+}
+
+
+def generate(distribution, size, seed=None, **params):
+    """Generate `size` int32 values from a named distribution"""
+    try:
+        generator = DISTRIBUTIONS[distribution]
+    except KeyError:
+        raise ValueError(f"Unknown distribution {distribution!r}; "
+                         f"choose from {', '.join(DISTRIBUTIONS)}")
+    return generator(np.random.default_rng(seed), size, **params)
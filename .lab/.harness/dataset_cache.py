@@ -0,0 +1,136 @@
+"""
+Content-addressed on-disk cache of ready-to-feed benchmark inputs.
+
+Entries are keyed by (distribution, size, seed, format, generator params)
+plus a hash of the generator sources (datagen.py and adversary.py), so
+editing a generator invalidates what it produced before.  They are stored
+as the exact bytes a sort program consumes: the "n a1 ... an" text or a
+raw int32 file (see arrayio).  Repeated sweeps and A/B runs then skip both
+generation and serialization and are guaranteed to measure the same
+inputs.
+
+The cache is bounded by a byte budget.  A hit refreshes the entry's mtime,
+and once the budget is exceeded the least recently used entries are
+deleted.  Writes go through a temporary file and os.replace(), so several
+processes can share one cache directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from arrayio import BINARY, IO_MODES, TEXT, encode_text, read_binary, write_binary
+from datagen import generate
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "datasets")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+EXTENSIONS = {TEXT: ".txt", BINARY: ".bin"}
+GENERATOR_SOURCES = ("datagen.py", "adversary.py")
+
+
+def generator_version():
+    """Short hash of the generator sources, part of every dataset's identity"""
+    digest = hashlib.sha256()
+    for name in GENERATOR_SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+GENERATOR_VERSION = generator_version()
+
+
+class DatasetCache:
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(distribution, size, seed, fmt, **params):
+        """Stable content address for one dataset in one format"""
+        seed = list(seed) if isinstance(seed, (tuple, list)) else seed
+        ident = json.dumps([GENERATOR_VERSION, distribution, size, seed, fmt, sorted(params.items())])
+        return hashlib.sha256(ident.encode()).hexdigest()
+
+    def path(self, distribution, size, seed, fmt=TEXT, **params):
+        """Return the file holding the dataset, generating it on a miss"""
+        if fmt not in IO_MODES:
+            raise ValueError(f"fmt must be one of {IO_MODES}")
+        path = os.path.join(self.root, self.key(distribution, size, seed, fmt, **params) + EXTENSIONS[fmt])
+        try:
+            # Refresh the LRU position
+            os.utime(path)
+            self.hits += 1
+            return path
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        data = generate(distribution, size, seed=seed, **params)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            if fmt == TEXT:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(encode_text(data))
+            else:
+                os.close(fd)
+                write_binary(tmp_path, data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict(keep=path)
+        return path
+
+    def text(self, distribution, size, seed, **params):
+        """Text-format input, ready to pass as stdin"""
+        with open(self.path(distribution, size, seed, TEXT, **params)) as f:
+            return f.read()
+
+    def array(self, distribution, size, seed, **params):
+        """The dataset itself, memory-mapped from its binary entry"""
+        return read_binary(self.path(distribution, size, seed, BINARY, **params))
+
+    def entries(self):
+        """(mtime, bytes, path) of every cached entry, oldest first"""
+        entries = []
+        for name in os.listdir(self.root):
+            if os.path.splitext(name)[1] not in EXTENSIONS.values():
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def usage(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits its budget"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
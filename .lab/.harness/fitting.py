@@ -0,0 +1,86 @@
+"""
+Complexity model fitting for a size sweep.
+
+Each candidate is c*f(n) or, to absorb fixed per-run overhead, a + c*f(n)
+with f in {n, n log n, n^2}.  All of them are fitted to the full sweep by
+weighted least squares and ranked by AIC, which penalizes the extra
+intercept parameter so it only wins when the overhead is real.
+
+Without explicit uncertainties the weights are 1/t^2, i.e. the fit
+minimizes relative error; otherwise large sizes (with the largest absolute
+times) would dominate and the small end would not constrain anything.
+
+    fits = fit_models(sizes, times)
+    best = fits[0]
+    describe(best), predict(best, 10**7)
+"""
+
+import numpy as np
+
+BASES = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * np.log2(np.maximum(n, 2)),
+    "n^2": lambda n: n * n,
+}
+
+
+def _fit(basis, intercept, n, t, w):
+    f = BASES[basis](n)
+    columns = [np.ones_like(n), f] if intercept else [f]
+    design = np.column_stack(columns)
+    sqrt_w = np.sqrt(w)
+    coef, *_ = np.linalg.lstsq(design * sqrt_w[:, None], t * sqrt_w, rcond=None)
+    predicted = design @ coef
+    rss = float(np.sum(w * (t - predicted) ** 2))
+    k = len(coef)
+    m = len(t)
+    # Gaussian AIC; guard the log against an exact fit
+    aic = m * np.log(max(rss, 1e-300) / m) + 2 * k
+    if m - k - 1 > 0:
+        aic += 2 * k * (k + 1) / (m - k - 1)  # small-sample correction (AICc)
+    mean = np.average(t, weights=w)
+    total = float(np.sum(w * (t - mean) ** 2))
+    return {
+        'basis': basis,
+        'intercept': intercept,
+        'a': float(coef[0]) if intercept else 0.0,
+        'c': float(coef[-1]),
+        'rss': rss,
+        'aic': float(aic),
+        'r2': 1 - rss / total if total > 0 else 1.0,
+    }
+
+
+def fit_models(sizes, times, sigma=None):
+    """Fit every candidate model and return them ranked by AIC (best first)"""
+    n = np.asarray(sizes, dtype=float)
+    t = np.asarray(times, dtype=float)
+    keep = (n > 0) & np.isfinite(t) & (t > 0)
+    n, t = n[keep], t[keep]
+    if sigma is not None:
+        s = np.asarray(sigma, dtype=float)[keep]
+        w = 1 / np.maximum(s, 1e-12) ** 2
+    else:
+        w = 1 / t ** 2
+    if len(t) < 3:
+        raise ValueError("need at least 3 positive points to fit")
+
+    fits = [_fit(basis, intercept, n, t, w) for basis in BASES for intercept in (False, True)]
+    # A negative growth constant is not a meaningful fit of a growing runtime
+    fits = [f for f in fits if f['c'] > 0] or fits
+    return sorted(fits, key=lambda f: f['aic'])
+
+
+def predict(fit, sizes):
+    """Runtime predicted by a fitted model"""
+    return fit['a'] + fit['c'] * BASES[fit['basis']](np.asarray(sizes, dtype=float))
+
+
+def name(fit):
+    return f"a + c·{fit['basis']}" if fit['intercept'] else f"c·{fit['basis']}"
+
+
+def describe(fit):
+    """Human readable formula with the fitted constants"""
+    term = f"{fit['c']:.4g}·{fit['basis']}"
+    return f"{fit['a']:.4g} + {term}" if fit['intercept'] else term
@@ -0,0 +1,147 @@
+"""
+Durable measurement journal for resumable sweeps.
+
+Every completed measurement is appended to a JSON-lines file as
+{"key": [algorithm, distribution, size, trial], "value": {...}} and
+fsync()ed before the sweep moves on, so killing the analyzer (Ctrl-C, OOM,
+a reclaimed shared machine) loses at most the trial that was running.
+Re-running the same sweep against the same journal replays the recorded
+measurements instantly and only measures what is missing.
+
+The first line records the sweep configuration (executables, I/O mode,
+seed, ...).  Resuming with a different configuration would silently mix
+incomparable numbers, so that is refused; delete the file (or pass
+fresh=True) to start over, or let default_path() pick a journal per
+configuration.  A line torn by a crash mid-write is ignored.
+
+Once a sweep has finished, complete() retires its journal: it is renamed
+to <name>.done-<timestamp>.jsonl next to where it was, so the next run of
+the same sweep measures afresh instead of replaying it forever.  Only an
+unfinished journal is resumed.
+
+    journal = Journal(default_path("quicksort"), config={'io_mode': 'text'})
+    if key not in journal:
+        journal.record(key, measure())
+    journal.complete()
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "journals")
+
+
+def default_path(name, config=None):
+    """Journal file for a named sweep under .lab/.cache/journals.
+
+    With a config the name also carries a short hash of it, so every
+    configuration (e.g. each build of the executables) gets its own journal.
+    """
+    if config is not None:
+        name += "-" + hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(DEFAULT_ROOT, f"{name}.jsonl")
+
+
+def _key(key):
+    # JSON turns tuples into lists; normalize so lookups match either way
+    return json.dumps(list(key))
+
+
+class Journal:
+    def __init__(self, path, config=None, fresh=False):
+        self.path = os.path.abspath(path)
+        self.config = config or {}
+        self.entries = {}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if fresh and os.path.exists(self.path):
+            os.remove(self.path)
+        if os.path.exists(self.path) and not self.load():
+            # Finished but never renamed (e.g. a crash inside complete())
+            self.retire()
+            self.entries = {}
+        if not os.path.exists(self.path):
+            self._append({'config': self.config})
+        # Entries present before this run, i.e. work a resumed sweep skips
+        self.resumed = len(self.entries)
+
+    def load(self):
+        """Read the recorded entries; False if the journal belongs to a finished sweep"""
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        for number, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write from an interrupted run
+            if number == 0 and 'config' in entry:
+                if entry['config'] != self.config:
+                    raise ValueError(f"Journal {self.path} was written by a different sweep configuration "
+                                     f"({entry['config']}); delete it or pass fresh=True")
+                continue
+            if entry.get('complete'):
+                return False
+            if 'key' in entry:
+                self.entries[_key(entry['key'])] = entry['value']
+        return True
+
+    def _append(self, entry):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def retire(self):
+        """Move the file aside as <name>.done-<timestamp>.jsonl; returns its new path"""
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        done_path = f"{os.path.splitext(self.path)[0]}.done-{stamp}.jsonl"
+        os.replace(self.path, done_path)
+        return done_path
+
+    def complete(self):
+        """Mark the sweep finished and retire the journal; later records start a new one"""
+        self._append({'complete': True})
+        done_path = self.retire()
+        self.entries = {}
+        self.resumed = 0
+        self._append({'config': self.config})
+        return done_path
+
+    def __contains__(self, key):
+        return _key(key) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        return self.entries.get(_key(key), default)
+
+    def record(self, key, value):
+        """Durably append one completed measurement"""
+        self._append({'key': list(key), 'value': value})
+        self.entries[_key(key)] = value
+
+    def replay(self, keys, measure):
+        """Yield a measurement per key, in order, measuring only the missing ones.
+
+        measure(missing_keys) must yield results for those keys in order;
+        None results (failed or timed-out trials) and censored ones (that
+        missed an async deadline, see async_runner) are not recorded, so a
+        resumed sweep retries them.  measure may record keys itself as it
+        goes (e.g. block by block); they are not recorded twice.  Values
+        read back from the journal carry 'replayed': True, so callers can
+        tell them from this run's measurements.
+        """
+        keys = list(keys)
+        missing = [key for key in keys if key not in self]
+        pending = {_key(key) for key in missing}
+        measured = iter(measure(missing))
+        for key in keys:
+            if _key(key) not in pending:
+                yield dict(self.get(key), replayed=True)
+                continue
+            value = next(measured)
+            if value is not None and not value.get('censored') and key not in self:
+                self.record(key, value)
+            yield value
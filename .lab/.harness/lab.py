@@ -0,0 +1,96 @@
+"""
+Single entry point for the lab's analyzers.
+
+    python lab.py run quicksort           # measure (as the analysis script's main)
+    python lab.py run                     # every analyzer, one after the other
+    python lab.py report                  # redraw every chart from the saved results
+    python lab.py report mergesort --jobs 4
+    python lab.py compare [--against 12 | --baseline baseline] ...
+
+`run` measures and then saves its results next to the analysis script
+(quicksort_results.json, sorting_comparison_improved.csv) before drawing
+the charts from them.  `report` only reads those files: nothing is
+measured or built, and the charts are rendered in parallel worker
+processes with the Agg backend.  `compare` is results_store.py's compare
+(the options after it are passed through) and exits with status 1 on a
+regression.
+
+Analysis modules are imported only for the command that needs them,
+matplotlib only when a chart is drawn, and numpy with the measurement stack
+only when something is measured or compared: `run` starts measuring
+without matplotlib, and `report` builds its chart specs without numpy.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+LAB_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# Analyzer name -> (analysis directory under .lab, module)
+ANALYZERS = {
+    "quicksort": (os.path.join("1_QuickSort", ".analysis"), "quicksort_analysis"),
+    "mergesort": (os.path.join("2_MergeSort", ".analysis"), "mergesort_analysis"),
+}
+
+
+def load(name):
+    """Import an analyzer's analysis module"""
+    directory, module = ANALYZERS[name]
+    path = os.path.abspath(os.path.join(LAB_ROOT, directory))
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(module)
+
+
+def report(names, jobs=None):
+    """Redraw the charts of the named analyzers from their saved results; returns the chart paths"""
+    import charts
+
+    specs = []
+    for name in names:
+        specs += load(name).report_charts()
+    if not specs:
+        return []
+    print(f"Rendering {len(specs)} charts...")
+    paths = charts.render_all(specs, jobs)
+    for path in paths:
+        print(f"Graph saved to: {path}")
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the lab's sort analyzers, redraw their charts, "
+                                                 "or compare stored runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="measure and save results (then draw the charts)")
+    run.add_argument("analyzers", nargs="*", metavar="analyzer",
+                     help=f"{', '.join(ANALYZERS)} (default: all)")
+    report_parser = commands.add_parser("report", help="redraw the charts from saved results, without measuring")
+    report_parser.add_argument("analyzers", nargs="*", metavar="analyzer",
+                               help=f"{', '.join(ANALYZERS)} (default: all)")
+    report_parser.add_argument("--jobs", type=int, help="charts rendered at once (default: one per core)")
+    compare = commands.add_parser("compare", help="compare stored runs (see results_store.py compare --help)",
+                                  add_help=False)
+    compare.add_argument("--db", help="results database")
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command == "compare":
+        import results_store
+
+        return results_store.main((["--db", args.db] if args.db else []) + ["compare"] + rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    unknown = [name for name in args.analyzers if name not in ANALYZERS]
+    if unknown:
+        parser.error(f"unknown analyzer(s) {', '.join(unknown)}; choose from {', '.join(ANALYZERS)}")
+    names = args.analyzers or list(ANALYZERS)
+    if args.command == "run":
+        for name in names:
+            load(name).main()
+        return 0
+    return 0 if report(names, args.jobs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Measurement noise control: randomized order, interleaving and a host guard.
+
+Measuring sizes in increasing order, and merge sort always before quick
+sort, lets slow drifts (thermal throttling, frequency scaling, a backup
+job starting halfway through) bias the results in one direction.
+NoiseGuard.run() measures a list of tasks in a seeded random order instead,
+and hands the results back in task order.  Tasks with the same group key
+(e.g. both algorithms on one dataset) stay adjacent, in random order
+within the group, so algorithms are interleaved on identical inputs.
+
+Only the tasks of one call are shuffled.  A fixed size list is one call;
+a planned sweep (see planner) hands over a batch of sizes at a time, its
+queued refinements and its next growth step, so its growth steps still
+come in increasing order: each depends on the size before it.
+
+The shuffled tasks are measured in blocks.  Around each block the guard
+takes a snapshot of the host: the 1-minute load average (/proc/loadavg),
+the mean current CPU frequency (/sys/.../cpufreq/scaling_cur_freq, when
+the kernel exposes it) and a calibration probe, a fixed in-process sort
+whose time only moves when the machine does.  One sort takes a few
+milliseconds, well inside timer and cache jitter, so a probe is the median
+of as many as fit in `probe_time` (50 ms).  A block is disturbed when
+
+* the load average exceeds `load_threshold` (default: one runnable task
+  per core plus half a task, our own sweep being one of them),
+* the CPU frequency drops more than `freq_tolerance` below the highest
+  frequency seen, or
+* the probe runs more than `probe_tolerance` slower than the median of
+  the last `probe_window` probes of undisturbed blocks (a slow drift moves
+  the reference along; one lucky fast probe does not).
+
+Disturbed blocks are measured again, up to `max_reruns` times; if the last
+attempt is still disturbed its measurements are kept but carry
+'noisy': True.  Every block's snapshots and verdict are in `blocks`.
+
+    guard = NoiseGuard(seed=42)
+    results = guard.run(tasks, lambda block: [measure(t) for t in block],
+                        group=lambda task: task[:2])
+    print(guard.describe())
+"""
+
+import glob
+import math
+import os
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+PROBE_SIZE = 1 << 15
+
+
+def load_average():
+    """1-minute load average, or None where /proc is unavailable"""
+    try:
+        with open("/proc/loadavg") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def cpu_frequency():
+    """Mean current frequency (MHz) over the CPUs we may run on, or None if not exposed"""
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    paths = ([f"/sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_cur_freq" for cpu in cpus] if cpus is not None
+             else glob.glob("/sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq"))
+    frequencies = []
+    for path in paths:
+        try:
+            with open(path) as f:
+                frequencies.append(int(f.read()) / 1000)
+        except (OSError, ValueError):
+            continue
+    return sum(frequencies) / len(frequencies) if frequencies else None
+
+
+class NoiseGuard:
+    def __init__(self, seed=None, block_size=16, load_threshold=None, freq_tolerance=0.1,
+                 probe_tolerance=0.15, max_reruns=2, probe_repeats=5, probe_time=0.05, probe_window=16):
+        self.rng = random.Random(seed)
+        self.block_size = max(block_size, 1)
+        if load_threshold is None:
+            cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+            load_threshold = cores + 0.5
+        self.load_threshold = load_threshold
+        self.freq_tolerance = freq_tolerance
+        self.probe_tolerance = probe_tolerance
+        self.max_reruns = max_reruns
+        # At least probe_repeats sorts per probe, more if they fit in probe_time (set on the first probe)
+        self.probe_repeats = probe_repeats
+        self.probe_time = probe_time
+        self._probe_calibrated = False
+        self._probe_data = np.random.default_rng(0).integers(0, 1 << 30, size=PROBE_SIZE, dtype=np.int32)
+        # Probes of recent undisturbed blocks, whose median is the reference for later ones
+        self.probes = deque(maxlen=max(probe_window, 1))
+        # Highest frequency seen so far
+        self.best_freq = None
+        self.blocks = []
+
+    def probe(self):
+        """Seconds for a fixed sort, median of probe_repeats"""
+        if not self._probe_calibrated:
+            start = time.perf_counter_ns()
+            np.sort(self._probe_data, kind='stable')
+            single = max((time.perf_counter_ns() - start) / 1e9, 1e-6)
+            self.probe_repeats = max(self.probe_repeats, math.ceil(self.probe_time / single))
+            self._probe_calibrated = True
+        # The median, not the minimum: a competing task that takes some of the
+        # CPU should show up, not be filtered out
+        times = []
+        for _ in range(self.probe_repeats):
+            start = time.perf_counter_ns()
+            np.sort(self._probe_data, kind='stable')
+            times.append((time.perf_counter_ns() - start) / 1e9)
+        return sorted(times)[len(times) // 2]
+
+    def snapshot(self):
+        """Host state right now: load average, CPU frequency and calibration probe"""
+        state = {'time': time.time(), 'loadavg': load_average(), 'freq_mhz': cpu_frequency(), 'probe': self.probe()}
+        if state['freq_mhz'] is not None:
+            self.best_freq = state['freq_mhz'] if self.best_freq is None else max(self.best_freq, state['freq_mhz'])
+        return state
+
+    def disturbances(self, before, after):
+        """Why the host looked disturbed around a block (empty if it did not)"""
+        reasons = []
+        loads = [s['loadavg'] for s in (before, after) if s['loadavg'] is not None]
+        if loads and max(loads) > self.load_threshold:
+            reasons.append(f"load average {max(loads):.2f} > {self.load_threshold:g}")
+        freqs = [s['freq_mhz'] for s in (before, after) if s['freq_mhz'] is not None]
+        if freqs and min(freqs) < self.best_freq * (1 - self.freq_tolerance):
+            reasons.append(f"CPU frequency {min(freqs):.0f} MHz, {1 - min(freqs) / self.best_freq:.0%} "
+                           f"below {self.best_freq:.0f} MHz")
+        # Until there is a history the block's own faster probe is the reference
+        reference = (float(np.median(self.probes)) if self.probes
+                     else min(before['probe'], after['probe']))
+        probe = max(before['probe'], after['probe'])
+        if probe > reference * (1 + self.probe_tolerance):
+            reasons.append(f"calibration probe {probe / reference - 1:.0%} slower than its recent median")
+        return reasons
+
+    def order(self, tasks, group=None):
+        """Task indices in a random order, groups kept together and shuffled inside"""
+        groups = {}
+        for index, task in enumerate(tasks):
+            groups.setdefault(group(task) if group is not None else index, []).append(index)
+        groups = list(groups.values())
+        self.rng.shuffle(groups)
+        order = []
+        for members in groups:
+            self.rng.shuffle(members)
+            order += members
+        return order
+
+    def run(self, tasks, measure, group=None, done=None):
+        """Measure tasks in a random, blocked order under the guard; results in task order.
+
+        measure(block) must return the measurements of a list of tasks in
+        order (dicts or None).  done(block, measurements), if given, is called
+        as each block is accepted, e.g. to journal it before the whole list
+        has been measured.
+        """
+        tasks = list(tasks)
+        results = [None] * len(tasks)
+        order = self.order(tasks, group)
+        # Blocks end on group boundaries so interleaved tasks share their snapshots
+        keys = [group(tasks[index]) if group is not None else index for index in order]
+        start = 0
+        while start < len(order):
+            end = min(start + self.block_size, len(order))
+            while end < len(order) and keys[end] == keys[end - 1]:
+                end += 1
+            block = order[start:end]
+            for attempt in range(self.max_reruns + 1):
+                before = self.snapshot()
+                measured = list(measure([tasks[index] for index in block]))
+                after = self.snapshot()
+                reasons = self.disturbances(before, after)
+                if not reasons:
+                    self.probes.extend((before['probe'], after['probe']))
+                    break
+            self.blocks.append({'tasks': len(block), 'attempts': attempt + 1, 'before': before, 'after': after,
+                                'reasons': reasons, 'noisy': bool(reasons)})
+            for index, measurement in zip(block, measured):
+                if reasons and measurement is not None:
+                    measurement['noisy'] = True
+                results[index] = measurement
+            if done is not None:
+                done([tasks[index] for index in block], measured)
+            start = end
+        return results
+
+    def describe(self):
+        """One-line summary of the blocks measured so far"""
+        reruns = sum(block['attempts'] - 1 for block in self.blocks)
+        noisy = [block for block in self.blocks if block['noisy']]
+        text = f"{len(self.blocks)} blocks, {reruns} re-runs, {len(noisy)} still disturbed"
+        if noisy:
+            text += f" (last: {'; '.join(noisy[-1]['reasons'])})"
+        return text
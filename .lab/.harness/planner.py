@@ -0,0 +1,187 @@
+"""
+Adaptive size sweep: geometric growth, slope refinement, budgeted cutoff.
+
+Instead of a fixed list of sizes, SweepPlanner proposes the next n as the
+sweep goes.  It starts at `start` and multiplies by `growth` each step.
+Wherever the local log-log slope (the empirical exponent between two
+neighbouring sizes) changes by more than `slope_tolerance`, it inserts the
+geometric midpoint of the wider neighbouring interval, so the sweep gets
+denser where the growth rate bends, e.g. where the data stops fitting in
+cache or a quadratic case takes over.  Times under `min_time` are too
+noisy to tell slopes apart and never trigger refinement.
+
+It stops once a trial takes longer than `trial_budget`, once the sweep has
+spent `total_budget` seconds, or at `max_size`.  Before growing it
+extrapolates the last slope to the next size and stops early if that size
+would break either budget, so a quadratic case ends before it eats the
+budget while an n log n one carries on towards 10^7-10^8 (give those
+larger budgets and binary I/O).
+
+The caller measures the proposed size and must record() it before asking
+for the next one:
+
+    planner = SweepPlanner(trial_budget=2.0, total_budget=300)
+    for size in planner:
+        t = measure(size)
+        planner.record(size, t, elapsed=...)    # t=None: failed or timed out
+    planner.stop_reason, planner.sizes()
+
+batch() hands over every size that can be measured without waiting for
+another, the queued refinements plus the next growth step, so a caller
+can measure them together in a random order (see noise); record() each
+before asking for the next batch.
+"""
+
+import math
+
+
+class SweepPlanner:
+    def __init__(self, start=100, growth=2.0, max_size=10**8, trial_budget=2.0, total_budget=600.0,
+                 slope_tolerance=0.25, min_time=1e-4, min_ratio=1.2, max_refinements=16):
+        if growth <= 1:
+            raise ValueError("growth must be greater than 1")
+        self.start = start
+        self.growth = growth
+        self.max_size = max_size
+        self.trial_budget = trial_budget
+        self.total_budget = total_budget
+        self.slope_tolerance = slope_tolerance
+        self.min_time = min_time
+        self.min_ratio = min_ratio
+        self.max_refinements = max_refinements
+        self.points = {}
+        self.queue = []
+        self.frontier = None
+        self.spent = 0.0
+        self.refinements = 0
+        self.stop_reason = None
+        # Seconds of sweep time per second of recorded time at the frontier
+        self._cost_ratio = 1.0
+
+    def config(self):
+        """Constructor arguments (to start an identical planner, e.g. per algorithm)"""
+        return dict(start=self.start, growth=self.growth, max_size=self.max_size,
+                    trial_budget=self.trial_budget, total_budget=self.total_budget,
+                    slope_tolerance=self.slope_tolerance, min_time=self.min_time,
+                    min_ratio=self.min_ratio, max_refinements=self.max_refinements)
+
+    def __iter__(self):
+        while True:
+            size = self.next_size()
+            if size is None:
+                return
+            yield size
+
+    def sizes(self):
+        """Sizes recorded so far, ascending"""
+        return sorted(self.points)
+
+    def stop(self, reason):
+        if self.stop_reason is None:
+            self.stop_reason = reason
+
+    @staticmethod
+    def slope(n0, t0, n1, t1):
+        """Empirical exponent between two (size, time) points"""
+        return math.log(t1 / t0) / math.log(n1 / n0)
+
+    def frontier_slope(self):
+        """Slope of the last growth step (1 until there are two points)"""
+        sizes = [n for n in self.sizes() if n <= self.frontier]
+        if len(sizes) < 2:
+            return 1.0
+        n0, n1 = sizes[-2], sizes[-1]
+        return self.slope(n0, self.points[n0], n1, self.points[n1])
+
+    def next_size(self):
+        """Next size to measure, or None once the sweep is over"""
+        if self.stop_reason is not None:
+            return None
+        if self.queue:
+            return self.queue[0]
+        return self.growth_size()
+
+    def batch(self):
+        """Sizes that can be measured together, in any order; empty once the sweep is over"""
+        if self.stop_reason is not None:
+            return []
+        # Refinements only depend on points already recorded, and the next
+        # growth step only on the frontier, so none waits for another
+        growth = self.growth_size(pending=self.queue)
+        return self.queue + ([growth] if growth is not None else [])
+
+    def growth_size(self, pending=()):
+        """Next size past the frontier, or None (stopping the sweep) if it would break a budget.
+
+        pending sizes will be measured as well; their predicted cost counts
+        against the total budget.
+        """
+        if self.frontier is None:
+            return self.start
+        if self.frontier >= self.max_size:
+            self.stop("max size")
+            return None
+
+        size = min(max(int(round(self.frontier * self.growth)), self.frontier + 1), self.max_size)
+        # Extrapolate conservatively (never better than linear) before committing to it
+        predicted = self.points[self.frontier] * (size / self.frontier) ** max(self.frontier_slope(), 1.0)
+        if predicted > self.trial_budget:
+            self.stop(f"n={size:,} would exceed the per-trial budget (~{predicted:.3g}s predicted)")
+            return None
+        # Pending sizes (refinements below the frontier) are extrapolated the same way
+        pending_cost = sum(self.points[self.frontier] * (n / self.frontier) ** max(self.frontier_slope(), 1.0)
+                           for n in pending)
+        if self.spent + (predicted + pending_cost) * self._cost_ratio > self.total_budget:
+            self.stop(f"n={size:,} would exceed the total budget")
+            return None
+        return size
+
+    def record(self, size, time, trial_time=None, elapsed=None):
+        """Record a measured size.
+
+        time is the representative (e.g. median) time that drives the slopes;
+        trial_time the longest single trial (default: time), checked against
+        the per-trial budget; elapsed the sweep time the size cost (default:
+        trial_time).  time=None means the size failed or timed out, which ends
+        the sweep.
+        """
+        if size in self.queue:
+            self.queue.remove(size)
+        trial_time = time if trial_time is None else trial_time
+        elapsed = (trial_time or 0.0) if elapsed is None else elapsed
+        self.spent += elapsed
+        if time is None or time <= 0:
+            self.stop(f"n={size:,} failed or timed out")
+            return
+        self.points[size] = time
+        if self.frontier is None or size > self.frontier:
+            self.frontier = size
+            self._cost_ratio = max(elapsed / time, 1.0)
+
+        if trial_time > self.trial_budget:
+            self.stop(f"n={size:,} exceeded the per-trial budget ({trial_time:.3g}s)")
+        elif self.spent >= self.total_budget:
+            self.stop("total budget spent")
+        else:
+            self.refine()
+
+    def refine(self):
+        """Queue midpoints where neighbouring slopes disagree"""
+        sizes = self.sizes()
+        for n0, n1, n2 in zip(sizes, sizes[1:], sizes[2:]):
+            if self.refinements >= self.max_refinements:
+                return
+            t0, t1, t2 = self.points[n0], self.points[n1], self.points[n2]
+            if min(t0, t1, t2) < self.min_time:
+                continue
+            if abs(self.slope(n1, t1, n2, t2) - self.slope(n0, t0, n1, t1)) <= self.slope_tolerance:
+                continue
+            # Split the wider of the two intervals, if it is still wide enough to split
+            lo, hi = (n0, n1) if n1 / n0 >= n2 / n1 else (n1, n2)
+            if hi / lo < self.min_ratio ** 2:
+                continue
+            middle = int(round(math.sqrt(lo * hi)))
+            if middle not in self.points and middle not in self.queue:
+                self.queue.append(middle)
+                self.refinements += 1
+        self.queue.sort()
@@ -0,0 +1,392 @@
+"""
+Historical results store and performance-regression check.
+
+Every sweep can be recorded in a local SQLite database together with what
+was measured: for each executable the SHA-256 of its C++ sources (the .cpp
+next to it plus the local headers it includes), of the binary itself, the
+compiler and its flags, and for the run the host, the sweep settings and a
+timestamp.  The raw per-trial sort and wall times are kept, not just
+aggregates, so any two runs can be compared statistically later.
+
+Trials a resumed sweep replayed from its journal are stored with the run
+but flagged: they were measured by an earlier run, so compare() ignores
+them, and a run that measured nothing new is refused.
+
+Compiler flags come from the caller or from the `<executable>.flags` file
+that build.py writes next to every binary; they are stored as unknown
+otherwise.
+
+compare() lines up the (algorithm, distribution, size) points two runs
+share and flags a regression when the new median is more than `threshold`
+slower and a one-sided Mann-Whitney test finds the slowdown significant at
+`alpha`.  Runs measured under different settings (I/O mode, persistent
+worker, seed, ...) are not comparable and are refused; only the executables
+may differ.  As a script it exits with status 1 when any size regressed:
+
+    python results_store.py list
+    python results_store.py pin 12 baseline
+    python results_store.py compare                  # latest vs baseline/previous run
+    python results_store.py compare 14 --against 12
+    python results_store.py compare --baseline baseline --threshold 0.1
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import sys
+
+from build import compiler_version, discover_sources, source_hash
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "results.sqlite")
+DEFAULT_THRESHOLD = 0.05
+DEFAULT_ALPHA = 0.05
+DEFAULT_BASELINE = "baseline"
+METRICS = ("sort", "wall")
+# Config keys naming the executables; they change with every build, which is
+# what a comparison is for, so they are left out when matching settings
+BUILD_KEYS = ("executable_path", "mergesort_path", "quicksort_path")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    analyzer TEXT NOT NULL,
+    label TEXT,
+    host TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS builds (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    algorithm TEXT NOT NULL,
+    executable TEXT NOT NULL,
+    executable_sha256 TEXT,
+    source_sha256 TEXT,
+    compiler TEXT,
+    compiler_flags TEXT,
+    PRIMARY KEY (run_id, algorithm)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    algorithm TEXT NOT NULL,
+    distribution TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    trial INTEGER NOT NULL,
+    sort_time REAL,
+    wall_time REAL,
+    replayed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS samples_point ON samples (run_id, algorithm, distribution, size);
+CREATE TABLE IF NOT EXISTS baselines (
+    analyzer TEXT NOT NULL,
+    name TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    PRIMARY KEY (analyzer, name)
+);
+"""
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_info(algorithm, executable, flags=None, source=None):
+    """What was measured for one algorithm: binary, source and compiler fingerprints"""
+    executable = os.path.abspath(executable)
+    stem = os.path.splitext(executable)[0]
+    if source is None:
+        # Prebuilt binaries sit next to their .cpp; cached builds are named after it
+        source = stem + ".cpp" if os.path.exists(stem + ".cpp") else discover_sources().get(os.path.basename(stem))
+    if flags is None and os.path.exists(executable + ".flags"):
+        with open(executable + ".flags") as f:
+            flags = f.read().strip()
+    return {
+        'algorithm': algorithm,
+        'executable': executable,
+        'executable_sha256': _sha256_file(executable) if os.path.exists(executable) else None,
+        'source_sha256': source_hash(source) if source else None,
+        'compiler': compiler_version(),
+        'compiler_flags': flags,
+    }
+
+
+def host_info():
+    """Machine the run was measured on"""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'cpu': cpu,
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+class ResultsStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+        # Databases from before replayed trials were flagged
+        if "replayed" not in [row['name'] for row in self.db.execute("PRAGMA table_info(samples)")]:
+            with self.db:
+                self.db.execute("ALTER TABLE samples ADD COLUMN replayed INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, analyzer, samples, builds, config=None, label=None):
+        """Store one sweep and return its run id.
+
+        samples are dicts with algorithm, distribution, size, trial and the
+        sort/wall times in seconds, and 'replayed' set on trials taken from a
+        journal rather than measured; builds come from build_info().  Raises
+        ValueError if every sample was replayed.
+        """
+        if not any(not s.get('replayed') for s in samples):
+            raise ValueError("No new measurements in this run (every trial was replayed from a journal)")
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (created, analyzer, label, host, config) VALUES (?, ?, ?, ?, ?)",
+                (datetime.datetime.now().isoformat(timespec='seconds'), analyzer, label,
+                 json.dumps(host_info()), json.dumps(config or {}, sort_keys=True)))
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO builds VALUES (:run_id, :algorithm, :executable, :executable_sha256, "
+                ":source_sha256, :compiler, :compiler_flags)",
+                [dict(build, run_id=run_id) for build in builds])
+            self.db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, s['algorithm'], s['distribution'], s['size'], s['trial'], s.get('sort'), s.get('wall'),
+                  int(bool(s.get('replayed')))) for s in samples])
+        return run_id
+
+    def runs(self, analyzer=None):
+        query = "SELECT * FROM runs" + (" WHERE analyzer = ?" if analyzer else "") + " ORDER BY id"
+        return [dict(row) for row in self.db.execute(query, (analyzer,) if analyzer else ())]
+
+    def run(self, run_id):
+        row = self.db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No run #{run_id} in {self.path}")
+        return dict(row)
+
+    def builds(self, run_id):
+        return [dict(row) for row in self.db.execute("SELECT * FROM builds WHERE run_id = ? ORDER BY algorithm",
+                                                     (run_id,))]
+
+    def settings(self, run_id):
+        """A run's stored config without the executables (see BUILD_KEYS)"""
+        config = json.loads(self.run(run_id)['config'])
+        return {key: value for key, value in config.items() if key not in BUILD_KEYS}
+
+    def samples(self, run_id, metric="sort", replayed=False):
+        """{(algorithm, distribution, size): [times in seconds]} for one run, replayed trials only if asked"""
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
+        points = {}
+        for row in self.db.execute(f"SELECT algorithm, distribution, size, {metric}_time AS t FROM samples "
+                                   "WHERE run_id = ? AND t IS NOT NULL AND (? OR replayed = 0) ORDER BY trial",
+                                   (run_id, bool(replayed))):
+            points.setdefault((row['algorithm'], row['distribution'], row['size']), []).append(row['t'])
+        return points
+
+    def pin(self, name, run_id):
+        """Pin a run as its analyzer's named baseline (replacing any previous one)"""
+        analyzer = self.run(run_id)['analyzer']
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO baselines VALUES (?, ?, ?)", (analyzer, name, run_id))
+
+    def baseline(self, name, analyzer):
+        row = self.db.execute("SELECT run_id FROM baselines WHERE analyzer = ? AND name = ?",
+                              (analyzer, name)).fetchone()
+        if row is None:
+            raise KeyError(f"No {analyzer} baseline named {name!r} in {self.path}")
+        return row['run_id']
+
+    def latest(self, analyzer=None, before=None):
+        """Id of the newest run (of an analyzer, older than run `before`), or None"""
+        query, args = "SELECT id FROM runs WHERE 1", []
+        if analyzer:
+            query += " AND analyzer = ?"
+            args.append(analyzer)
+        if before is not None:
+            query += " AND id < ?"
+            args.append(before)
+        row = self.db.execute(query + " ORDER BY id DESC LIMIT 1", args).fetchone()
+        return row['id'] if row else None
+
+    def compare(self, base_id, new_id, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA, metric="sort"):
+        """Per-point comparison of run new_id against base_id, sorted by point.
+
+        Raises ValueError if the runs were measured under different settings.
+        """
+        # numpy only loads for an actual comparison, not for list/pin or recording a run
+        import numpy as np
+
+        from stats import mann_whitney
+
+        base_settings, new_settings = self.settings(base_id), self.settings(new_id)
+        if base_settings != new_settings:
+            differences = ", ".join(f"{key} {base_settings.get(key)!r} vs {new_settings.get(key)!r}"
+                                    for key in sorted(base_settings.keys() | new_settings.keys())
+                                    if base_settings.get(key) != new_settings.get(key))
+            raise ValueError(f"Runs #{base_id} and #{new_id} were measured under different settings ({differences})")
+        base = self.samples(base_id, metric)
+        new = self.samples(new_id, metric)
+        rows = []
+        for point in sorted(base.keys() & new.keys()):
+            base_median = float(np.median(base[point]))
+            new_median = float(np.median(new[point]))
+            change = new_median / base_median - 1 if base_median > 0 else 0.0
+            _, p_slower = mann_whitney(new[point], base[point], 'greater')
+            _, p_faster = mann_whitney(new[point], base[point], 'less')
+            if change > threshold and p_slower < alpha:
+                verdict = 'regression'
+            elif change < -threshold and p_faster < alpha:
+                verdict = 'improvement'
+            else:
+                verdict = 'unchanged'
+            algorithm, distribution, size = point
+            rows.append({
+                'algorithm': algorithm,
+                'distribution': distribution,
+                'size': size,
+                'base_median': base_median,
+                'new_median': new_median,
+                'change': change,
+                'p_value': p_slower if change > 0 else p_faster,
+                'base_n': len(base[point]),
+                'new_n': len(new[point]),
+                'verdict': verdict,
+            })
+        return rows
+
+
+def reference_run(store, run_id, baseline=DEFAULT_BASELINE):
+    """Run to check run_id against: the pinned baseline, else the analyzer's previous run with the same settings"""
+    analyzer = store.run(run_id)['analyzer']
+    try:
+        return store.baseline(baseline, analyzer)
+    except KeyError:
+        settings = store.settings(run_id)
+        for run in reversed(store.runs(analyzer)):
+            if run['id'] < run_id and store.settings(run['id']) == settings:
+                return run['id']
+        return None
+
+
+def format_comparison(rows):
+    """Text table of compare() rows"""
+    lines = [f"{'Algorithm':<12} {'Distribution':<14} {'Size':>9} {'Base':>12} {'New':>12} "
+             f"{'Change':>8} {'p':>7}  Verdict",
+             "-" * 90]
+    for r in rows:
+        lines.append(f"{r['algorithm']:<12} {r['distribution']:<14} {r['size']:>9} {r['base_median']:>12.6f} "
+                     f"{r['new_median']:>12.6f} {r['change']:>+8.1%} {r['p_value']:>7.3f}  {r['verdict']}")
+    return "\n".join(lines)
+
+
+def describe_run(store, run_id):
+    run = store.run(run_id)
+    host = json.loads(run['host'])
+    text = f"#{run['id']} {run['created']} {run['analyzer']}"
+    if run['label']:
+        text += f" ({run['label']})"
+    text += f" on {host['hostname']}"
+    for build in store.builds(run_id):
+        source = (build['source_sha256'] or 'unknown')[:12]
+        text += f"\n    {build['algorithm']}: source {source}, flags {build['compiler_flags'] or 'unknown'}"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect stored sweeps and check them for regressions")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="results database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list recorded runs")
+
+    pin = commands.add_parser("pin", help="pin a run as a named baseline")
+    pin.add_argument("run", type=int)
+    pin.add_argument("name", nargs="?", default=DEFAULT_BASELINE)
+
+    compare = commands.add_parser("compare", help="compare a run against another run or a pinned baseline")
+    compare.add_argument("run", type=int, nargs="?", help="run to check (default: latest)")
+    against = compare.add_mutually_exclusive_group()
+    against.add_argument("--against", type=int,
+                         help=f"run to compare with (default: the {DEFAULT_BASELINE!r} baseline, else the previous run)")
+    against.add_argument("--baseline", help="pinned baseline to compare with")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="relative slowdown of the median that counts as a regression")
+    compare.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="significance level")
+    compare.add_argument("--metric", choices=METRICS, default="sort")
+    args = parser.parse_args(argv)
+
+    with ResultsStore(args.db) as store:
+        if args.command == "list":
+            for run in store.runs():
+                print(describe_run(store, run['id']))
+            return 0
+
+        try:
+            if args.command == "pin":
+                store.pin(args.name, args.run)
+                print(f"Pinned run #{args.run} as {args.name!r}")
+                return 0
+
+            new_id = args.run if args.run is not None else store.latest()
+            if new_id is None:
+                parser.error("no runs recorded yet")
+            analyzer = store.run(new_id)['analyzer']
+            if args.baseline:
+                base_id = store.baseline(args.baseline, analyzer)
+            elif args.against is not None:
+                base_id = store.run(args.against)['id']
+            else:
+                base_id = reference_run(store, new_id)
+                if base_id is None:
+                    parser.error(f"run #{new_id} has no baseline or earlier run to compare with")
+            rows = store.compare(base_id, new_id, args.threshold, args.alpha, args.metric)
+        except (KeyError, ValueError) as e:
+            parser.error(e.args[0])
+
+        print(f"Base: {describe_run(store, base_id)}")
+        print(f"New:  {describe_run(store, new_id)}")
+        print()
+        if not rows:
+            print("The runs have no (algorithm, distribution, size) points in common")
+            return 0
+        print(format_comparison(rows))
+        regressions = [r for r in rows if r['verdict'] == 'regression']
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} "
+              f"(one-sided Mann-Whitney, alpha={args.alpha:g}) in {len(rows)} points")
+        return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
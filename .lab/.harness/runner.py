@@ -0,0 +1,365 @@
+"""
+Executable runner shared by the lab analysis scripts.
+
+The sort programs accept a --timing flag (see bench.hpp) that makes them
+report how long each phase took on stderr:
+
+    TIMING n=<n> parse_ns=<ns> sort_ns=<ns> emit_ns=<ns>
+
+run_executable() wraps a single subprocess call and returns the wall-clock
+time alongside those in-binary phase durations, so the analyzers can plot
+the sort on its own instead of fork/exec + text I/O.
+
+With --serve the same programs stay alive and answer one array after
+another; WorkerPool keeps one such process per executable so a sweep pays
+for process creation once instead of once per trial.
+
+Every runner takes a payload: either a text string from encode_text() or a
+BinaryPayload (see arrayio), which switches the program to --binary mode.
+
+Measurements also carry the trial's resource usage (RUSAGE_FIELDS): peak
+RSS, minor/major page faults, voluntary/involuntary context switches and
+user/system CPU time.  One-shot runs are reaped with os.wait4(), so the
+numbers cover the whole process including startup; persistent workers
+report getrusage() deltas for the request itself on the TIMING line.  Peak
+RSS always comes from the program's own VmHWM when it reports one: the
+kernel carries the harness's RSS over fork/exec into the child's
+ru_maxrss, which would otherwise swamp small runs.  A persistent worker
+releases its memory between requests, but its peak still includes its own
+resident baseline, so only compare max_rss_kb within one process mode.
+
+preempted() judges a trial by the involuntary context switches of its sort
+phase alone (sort_involuntary_ctx), against a rate per second of sort
+time (PREEMPTION_THRESHOLD) so long sorts are not flagged for their length:
+the parse phase is switched out at every pipe write of the harness, and a
+one-shot run's totals include process startup.
+"""
+
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from arrayio import BinaryPayload, encode_text  # noqa: F401 (re-exported)
+
+TIMING_FLAG = "--timing"
+SERVE_FLAG = "--serve"
+BINARY_FLAG = "--binary"
+PHASES = ("parse", "sort", "emit")
+# stdout is drained (and, for verification, spooled to disk) this much at a time
+OUTPUT_CHUNK_BYTES = 1 << 16
+# measurement key -> (TIMING line key, scale to measurement units)
+RUSAGE_FIELDS = {
+    'max_rss_kb': ("maxrss_kb", 1),
+    'minor_faults': ("minflt", 1),
+    'major_faults': ("majflt", 1),
+    'voluntary_ctx': ("nvcsw", 1),
+    'involuntary_ctx': ("nivcsw", 1),
+    'user_time': ("utime_us", 1e-6),
+    'system_time': ("stime_us", 1e-6),
+}
+
+
+# A trial counts as preempted with more than PREEMPTION_SLACK involuntary
+# context switches plus PREEMPTION_THRESHOLD per second of sort time.  Even
+# on an idle machine a sort is switched out a few times at its start (the
+# harness's own threads wake as the input pipe drains) and a few dozen
+# times a second after that (timer and kernel worker wakeups, microseconds
+# each); a competing task takes the CPU every scheduler slice, hundreds of
+# times a second.
+PREEMPTION_THRESHOLD = 50
+PREEMPTION_SLACK = 5
+
+
+def preempted(measurement, threshold=PREEMPTION_THRESHOLD):
+    """Whether a trial was disturbed by preemption (threshold: switches per second)"""
+    # Executables count the sort phase's own switches (sort_involuntary_ctx); an
+    # in-process trial has no I/O to wait on, so all of its CPU time is judged
+    if 'sort_involuntary_ctx' in measurement:
+        switches, seconds = measurement['sort_involuntary_ctx'], measurement['sort']
+    else:
+        switches = measurement.get('involuntary_ctx', 0)
+        seconds = measurement.get('user_time', 0) + measurement.get('system_time', 0)
+    return switches > PREEMPTION_SLACK + threshold * seconds
+
+
+def peak_rss(measurements):
+    """Highest max_rss_kb over measurements; None when none has one (in-process trials)"""
+    peaks = [m['max_rss_kb'] for m in measurements if m.get('max_rss_kb') is not None]
+    return max(peaks) if peaks else None
+
+
+def format_rss(max_rss_kb):
+    """Peak RSS for a printout; "n/a" for trials that have none"""
+    return "n/a" if max_rss_kb is None else f"{max_rss_kb} KiB"
+
+
+class RunnerError(RuntimeError):
+    """Raised when an executable fails or does not report its timing"""
+
+
+def parse_timing(stderr):
+    """Extract phase durations (seconds) from the last TIMING line on stderr"""
+    for line in reversed(stderr.splitlines()):
+        if not line.startswith("TIMING "):
+            continue
+        fields = dict(item.split("=", 1) for item in line.split()[1:])
+        try:
+            timing = {phase: int(fields[f"{phase}_ns"]) / 1e9 for phase in PHASES}
+            timing['n'] = int(fields['n'])
+            for key, (field, scale) in RUSAGE_FIELDS.items():
+                if field in fields:
+                    timing[key] = int(fields[field]) * scale
+            if 'sort_nivcsw' in fields:
+                timing['sort_involuntary_ctx'] = int(fields['sort_nivcsw'])
+        except (KeyError, ValueError):
+            raise RunnerError(f"Malformed timing line: {line!r}")
+        return timing
+    raise RunnerError("Executable did not report a TIMING line")
+
+
+def rusage_measurement(ru):
+    """Measurement fields from a resource.struct_rusage (ru_maxrss is KiB on Linux)"""
+    return {
+        'max_rss_kb': ru.ru_maxrss,
+        'minor_faults': ru.ru_minflt,
+        'major_faults': ru.ru_majflt,
+        'voluntary_ctx': ru.ru_nvcsw,
+        'involuntary_ctx': ru.ru_nivcsw,
+        'user_time': ru.ru_utime,
+        'system_time': ru.ru_stime,
+    }
+
+
+def _spool(read, sink):
+    """Copy a stream into sink (a file, or None to discard it) chunk by chunk, until EOF"""
+    while True:
+        chunk = read(OUTPUT_CHUNK_BYTES)
+        if not chunk:
+            return
+        if sink is not None:
+            sink.write(chunk)
+
+
+def _spawn_and_reap(args, input_str, timeout, sink=None):
+    """Run a child to completion, reaping it with os.wait4 to keep its rusage.
+
+    stdout always goes through a pipe, so the program's emit phase is timed
+    the same way whether it is kept (copied to sink) or not.
+    """
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.PIPE if input_str is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    errors = []
+
+    def drain_stdout():
+        _spool(process.stdout.read1, sink)
+        process.stdout.close()
+
+    def drain_stderr():
+        errors.append(process.stderr.read().decode(errors='replace'))
+        process.stderr.close()
+
+    readers = [threading.Thread(target=drain, daemon=True) for drain in (drain_stdout, drain_stderr)]
+    for reader in readers:
+        reader.start()
+
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        process.kill()
+
+    watchdog = threading.Timer(timeout, expire)
+    watchdog.start()
+    try:
+        if input_str is not None:
+            try:
+                process.stdin.write(input_str.encode())
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        # Reap ourselves: Popen.wait() would discard the child's resource usage
+        _, status, ru = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        watchdog.cancel()
+    for reader in readers:
+        reader.join()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(args, timeout)
+    return process.returncode, errors[0], ru
+
+
+def output_file():
+    """Anonymous temporary file a run's stdout is spooled to (removed when closed)"""
+    return tempfile.TemporaryFile(prefix="sort-output-")
+
+
+def run_executable(executable_path, payload, timeout=30, keep_output=False):
+    """Run a sort executable once and return wall, per-phase times (seconds) and rusage.
+
+    With keep_output a text run's stdout is spooled to a temporary file,
+    kept open under 'output' for verify.verify_output(); otherwise it is
+    read and discarded.  Binary runs write theirs to payload.output_path.
+    """
+    args = [executable_path, TIMING_FLAG]
+    input_str = payload
+    if isinstance(payload, BinaryPayload):
+        args += [BINARY_FLAG, payload.input_path, payload.output_path]
+        input_str = None
+
+    sink = output_file() if keep_output and input_str is not None else None
+    try:
+        start_time = time.perf_counter()
+        returncode, stderr, ru = _spawn_and_reap(args, input_str, timeout, sink)
+        end_time = time.perf_counter()
+        if returncode != 0:
+            raise RunnerError(f"{executable_path} exited with {returncode}: {stderr}")
+    except BaseException:
+        if sink is not None:
+            sink.close()
+        raise
+
+    measurement = parse_timing(stderr)
+    measurement['wall'] = end_time - start_time
+    # Whole-process usage (startup included) supersedes the in-binary request deltas
+    usage = rusage_measurement(ru)
+    if 'max_rss_kb' in measurement:
+        del usage['max_rss_kb']
+    measurement.update(usage)
+    if sink is not None:
+        measurement['output'] = sink
+    return measurement
+
+
+class SortWorker:
+    """A long-lived sort executable answering arrays over a pipe"""
+
+    def __init__(self, executable_path, binary=False):
+        self.executable_path = executable_path
+        self.binary = binary
+        args = [executable_path, SERVE_FLAG, TIMING_FLAG]
+        if binary:
+            args.append(BINARY_FLAG)
+        self.process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def read_answer(self, sink):
+        """Read one answer line from stdout in chunks, copying it to sink (or discarding it)
+
+        Returns whether the line was complete (False when the worker died).
+        """
+        while True:
+            chunk = self.process.stdout.read1(OUTPUT_CHUNK_BYTES)
+            if not chunk:
+                return False
+            if sink is not None:
+                sink.write(chunk)
+            # An answer is a single line and nothing follows it until the next request
+            if chunk.endswith(b"\n"):
+                return True
+
+    def run(self, payload, timeout=30, keep_output=False):
+        """Sort one array; same result shape as run_executable()"""
+        if isinstance(payload, BinaryPayload) != self.binary:
+            raise RunnerError("payload format does not match the worker mode")
+        request = (payload.request_line() if self.binary else payload).encode()
+        sink = output_file() if keep_output and not self.binary else None
+        try:
+            measurement = self.request(request, timeout, sink)
+        except BaseException:
+            if sink is not None:
+                sink.close()
+            raise
+        if sink is not None:
+            measurement['output'] = sink
+        return measurement
+
+    def request(self, request, timeout, sink):
+        """Send one encoded request and time the worker's answer"""
+        # A hung worker is killed, which unblocks the pending reads below
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            self.process.kill()
+
+        watchdog = threading.Timer(timeout, expire)
+        watchdog.start()
+        try:
+            start_time = time.perf_counter()
+            self.process.stdin.write(request)
+            self.process.stdin.flush()
+            answered = self.read_answer(sink)
+            timing_line = self.process.stderr.readline().decode(errors='replace')
+            end_time = time.perf_counter()
+        except (BrokenPipeError, ValueError) as e:
+            raise RunnerError(f"{self.executable_path} worker died: {e}")
+        finally:
+            watchdog.cancel()
+
+        if not answered or not timing_line:
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(self.executable_path, timeout)
+            raise RunnerError(f"{self.executable_path} worker exited with {self.process.poll()}")
+
+        measurement = parse_timing(timing_line)
+        measurement['wall'] = end_time - start_time
+        return measurement
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        for stream in (self.process.stdout, self.process.stderr):
+            stream.close()
+
+
+class WorkerPool:
+    """One persistent SortWorker per executable and format, restarted if it dies"""
+
+    def __init__(self):
+        self.workers = {}
+
+    def run(self, executable_path, payload, timeout=30, keep_output=False):
+        key = (executable_path, isinstance(payload, BinaryPayload))
+        worker = self.workers.get(key)
+        if worker is None or not worker.alive():
+            worker = self.workers[key] = SortWorker(*key)
+        try:
+            return worker.run(payload, timeout=timeout, keep_output=keep_output)
+        except Exception:
+            # Don't reuse a worker left in an unknown state
+            worker.close()
+            del self.workers[key]
+            raise
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+        self.workers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
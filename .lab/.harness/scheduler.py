@@ -0,0 +1,116 @@
+"""
+Parallel sweep scheduler with one pinned core per worker.
+
+Independent trials are spread over a process pool.  Each worker process
+claims a dedicated CPU with os.sched_setaffinity() before doing anything
+else; the sort executables it launches inherit that mask, so concurrent
+trials never share a core.
+
+Workers are replicas of the analyzer that submitted the sweep: the
+scheduler builds `factory(**config)` once per worker and calls
+`getattr(replica, method)(task)` for each task.  Results come back in task
+order, so the analyzers merge them into their result dicts exactly as if
+the sweep had run serially.  The pool stays up between map() calls (so
+adaptive sampling can submit small batches cheaply) until close().
+
+noise_safe=True trades throughput for cleaner numbers: the first `reserve`
+cores are left to the OS and the harness, and only one hardware thread per
+physical core is used so SMT siblings don't compete for the same pipeline.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+
+_replica = None
+
+
+def _thread_siblings(cpu):
+    """Logical CPUs sharing a physical core with `cpu` (just itself if unknown)"""
+    path = f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list"
+    try:
+        with open(path) as f:
+            text = f.read().strip()
+    except OSError:
+        return {cpu}
+    siblings = set()
+    for part in text.split(","):
+        lo, _, hi = part.partition("-")
+        siblings.update(range(int(lo), int(hi or lo) + 1))
+    return siblings
+
+
+def available_cores():
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(core_queue, factory, config):
+    global _replica
+    core = core_queue.get()
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+    _replica = factory(**config)
+    if hasattr(_replica, "close"):
+        # Runs when the pool shuts the worker down (atexit is skipped in workers)
+        Finalize(_replica, _replica.close, exitpriority=10)
+
+
+def _call_replica(args):
+    method, task = args
+    return getattr(_replica, method)(task)
+
+
+class SweepScheduler:
+    def __init__(self, concurrency=None, noise_safe=False, reserve=1):
+        self.noise_safe = noise_safe
+        self.cores = self.select_cores(noise_safe, reserve)
+        # More workers than cores would defeat the pinning
+        self.concurrency = min(concurrency or len(self.cores), len(self.cores))
+        self.executor = None
+        self.replica_spec = None
+
+    @staticmethod
+    def select_cores(noise_safe=False, reserve=1):
+        """Cores handed out to workers, one each"""
+        cores = available_cores()
+        if not noise_safe:
+            return cores
+        # Keep the first cores for the OS/harness, but never all of them
+        cores = cores[reserve:] if len(cores) > reserve else cores[-1:]
+        selected, taken = [], set()
+        for cpu in cores:
+            if cpu in taken:
+                continue
+            selected.append(cpu)
+            taken |= _thread_siblings(cpu)
+        return selected
+
+    def start(self, factory, config):
+        """(Re)start the worker pool unless it already runs these replicas"""
+        if self.executor is not None and self.replica_spec == (factory, config):
+            return
+        self.close()
+        core_queue = multiprocessing.Queue()
+        for core in self.cores[:self.concurrency]:
+            core_queue.put(core)
+        self.executor = ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_worker,
+                                            initargs=(core_queue, factory, config))
+        self.replica_spec = (factory, config)
+
+    def map(self, factory, config, method, tasks):
+        """Yield replica.method(task) for every task, in task order"""
+        tasks = list(tasks)
+        if not tasks:
+            return iter(())
+        self.start(factory, config)
+        return self.executor.map(_call_replica, [(method, task) for task in tasks])
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.replica_spec = None
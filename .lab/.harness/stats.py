@@ -0,0 +1,165 @@
+"""
+Statistics for benchmark samples.
+
+summarize() describes a list of timings: median with a bootstrap confidence
+interval, Tukey-fence outliers (1.5 IQR beyond the quartiles) and the mean
+of the remaining samples.
+
+AdaptiveSampler replaces fixed trial counts: it keeps requesting batches of
+measurements until the median's confidence interval is narrower than
+`rel_width` (relative to the median) for every series, or until the sample
+cap or time budget runs out.  Cheap, noisy small sizes therefore get many
+samples and expensive large ones only as many as they need.
+
+mann_whitney() compares two independent sets of timings without assuming
+normality, which run-to-run benchmark noise rarely is.
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+def bootstrap_median_ci(samples, confidence=0.95, resamples=2000, seed=0):
+    """Percentile bootstrap confidence interval of the median"""
+    x = np.asarray(samples, dtype=float)
+    if len(x) < 2:
+        value = float(x[0]) if len(x) else float('nan')
+        return value, value
+    rng = np.random.default_rng(seed)
+    medians = np.median(x[rng.integers(0, len(x), size=(resamples, len(x)))], axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(medians, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def detect_outliers(samples, k=1.5):
+    """Indices of samples outside the Tukey fences [Q1 - k*IQR, Q3 + k*IQR]"""
+    x = np.asarray(samples, dtype=float)
+    if len(x) < 4:
+        return []
+    q1, q3 = np.quantile(x, [0.25, 0.75])
+    spread = k * (q3 - q1)
+    return np.flatnonzero((x < q1 - spread) | (x > q3 + spread)).tolist()
+
+
+def summarize(samples, confidence=0.95, resamples=2000):
+    """Median, bootstrap CI, outliers and outlier-free mean of a list of timings"""
+    x = np.asarray(samples, dtype=float)
+    if len(x) == 0:
+        return {'n': 0, 'median': 0, 'mean': 0, 'std': 0, 'clean_mean': 0,
+                'ci_low': 0, 'ci_high': 0, 'rel_ci_width': float('inf'), 'outliers': []}
+    median = float(np.median(x))
+    ci_low, ci_high = bootstrap_median_ci(x, confidence, resamples)
+    outliers = detect_outliers(x)
+    clean = np.delete(x, outliers)
+    return {
+        'n': len(x),
+        'median': median,
+        'mean': float(np.mean(x)),
+        'std': float(np.std(x)),
+        'clean_mean': float(np.mean(clean)),
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'rel_ci_width': (ci_high - ci_low) / median if median > 0 else float('inf'),
+        'outliers': outliers,
+    }
+
+
+def _ranks(x):
+    """1-based ranks with ties averaged, plus the size of every tie group"""
+    order = np.argsort(x, kind='mergesort')
+    ordered = x[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(x)]
+    ranks = np.empty(len(x))
+    ranks[order] = np.repeat((starts + ends + 1) / 2, ends - starts)
+    return ranks, ends - starts
+
+
+def mann_whitney(x, y, alternative='two-sided'):
+    """Mann-Whitney U test of x against y; returns (U of x, p-value).
+
+    alternative='greater' tests whether x tends to be larger than y, 'less'
+    whether it tends to be smaller.  Uses the tie-corrected normal
+    approximation with continuity correction, which is adequate from about
+    five samples per side.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nx, ny = len(x), len(y)
+    if nx == 0 or ny == 0:
+        return float('nan'), 1.0
+    ranks, ties = _ranks(np.concatenate([x, y]))
+    u = float(ranks[:nx].sum() - nx * (nx + 1) / 2)
+    n = nx + ny
+    variance = nx * ny / 12 * ((n + 1) - float(np.sum(ties ** 3 - ties)) / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0  # every value tied: no evidence either way
+    delta = u - nx * ny / 2
+    sd = math.sqrt(variance)
+    if alternative == 'greater':
+        return u, 0.5 * math.erfc((delta - 0.5) / sd / math.sqrt(2))
+    if alternative == 'less':
+        return u, 0.5 * math.erfc(-(delta + 0.5) / sd / math.sqrt(2))
+    if alternative != 'two-sided':
+        raise ValueError(f"Unknown alternative {alternative!r}")
+    z = max(abs(delta) - 0.5, 0) / sd
+    return u, min(1.0, math.erfc(z / math.sqrt(2)))
+
+
+class AdaptiveSampler:
+    def __init__(self, rel_width=0.05, confidence=0.95, min_samples=5, max_samples=200,
+                 time_budget=30.0, batch=1, resamples=2000):
+        self.rel_width = rel_width
+        self.confidence = confidence
+        # The bootstrap needs a few points before its interval means anything
+        self.min_samples = max(min_samples, 3)
+        self.max_samples = max(max_samples, self.min_samples)
+        self.time_budget = time_budget
+        self.batch = max(batch, 1)
+        self.resamples = resamples
+
+    def converged(self, summaries):
+        return bool(summaries) and all(
+            s['n'] >= self.min_samples and s['rel_ci_width'] <= self.rel_width
+            for s in summaries.values())
+
+    def sample(self, measure_batch, values):
+        """Collect measurements until every series meets the CI target.
+
+        measure_batch(start, count) returns `count` raw measurements for trial
+        indices start..start+count-1; values(measurement) maps one of them to
+        {series name: timing or None}.  Returns (measurements, report).
+        """
+        measurements = []
+        series = {}
+        summaries = {}
+        start_time = time.perf_counter()
+        while True:
+            count = max(self.min_samples - len(measurements), self.batch)
+            count = min(count, self.max_samples - len(measurements))
+            batch = measure_batch(len(measurements), count)
+            measurements.extend(batch)
+            for measurement in batch:
+                for name, value in values(measurement).items():
+                    series.setdefault(name, [])
+                    if value is not None:
+                        series[name].append(value)
+            summaries = {name: summarize(v, self.confidence, self.resamples) for name, v in series.items()}
+
+            elapsed = time.perf_counter() - start_time
+            if (self.converged(summaries) or len(measurements) >= self.max_samples
+                    or elapsed >= self.time_budget):
+                break
+            # Nothing succeeded at all: more attempts won't help
+            if len(measurements) >= self.min_samples and not any(series.values()):
+                break
+
+        return measurements, {
+            'converged': self.converged(summaries),
+            'samples': len(measurements),
+            'elapsed': elapsed,
+            'series': summaries,
+        }
@@ -0,0 +1,368 @@
+"""
+Structured JSON-lines telemetry for live sweep monitoring.
+
+The analyzers emit one JSON object per line for every lifecycle change,
+trial and size summary, so a long sweep can be watched (and killed early)
+from another terminal or machine:
+
+    {"ts": 1760000000.1, "event": "sweep_start", "sweep": "3f2a9c1d", "analyzer": "quicksort_analysis", ...}
+    {"ts": ..., "event": "trial", "sweep": ..., "algorithm": "quicksort", "size": 4000, "trial": 2,
+     "status": "ok", "wall": 0.0021, "sort": 0.0009, ..., "max_rss_kb": 3412}
+    {"ts": ..., "event": "size", "sweep": ..., "size": 4000, "median_sort": 0.0009, ...}
+    {"ts": ..., "event": "error", "sweep": ..., "message": "..."}
+    {"ts": ..., "event": "sweep_end", "sweep": ..., "status": "done", "elapsed": 812.4}
+
+Times are in seconds whatever the analyzer prints.  A trial's status is
+"ok", "censored" (missed its deadline) or "failed".  sweep_start carries
+planned_trials for a fixed size list, or budget (seconds) for a planned
+one, which is what the ETA is based on.
+
+Events go to a file (appended and flushed line by line) or a socket:
+
+    QuickSortAnalyzer(QuickSortOptions(telemetry="sweep.jsonl"))
+    QuickSortAnalyzer(QuickSortOptions(telemetry="tcp://monitor:9100"))   # or unix:///tmp/sweep.sock
+    QuickSortAnalyzer(QuickSortOptions(telemetry=True))   # .lab/.cache/telemetry/quicksort_analysis.jsonl
+
+and the command line shows throughput, ETA and per-size medians:
+
+    python telemetry.py tail sweep.jsonl --follow
+    python telemetry.py listen --port 9100 --output sweep.jsonl
+
+A socket never slows the sweep down: it is non-blocking, and an event
+that does not fit in the send buffer (a slow or stalled listener) is
+dropped and counted in `dropped` rather than waited for.  A broken socket
+disables telemetry for the rest of the sweep rather than failing it.
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import time
+import uuid
+from collections import deque
+
+TIME_FIELDS = ('wall', 'parse', 'sort', 'emit')
+COUNTER_FIELDS = ('max_rss_kb', 'minor_faults', 'major_faults', 'voluntary_ctx', 'involuntary_ctx')
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "telemetry")
+
+
+def default_path(name):
+    """Event file for a named analyzer under .lab/.cache/telemetry (appended to by every sweep)"""
+    return os.path.join(DEFAULT_ROOT, f"{name}.jsonl")
+
+
+def _plain(value):
+    """JSON fallback for numpy scalars"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def trial_fields(measurement, scale=1.0):
+    """Event fields of one measurement; scale converts its times to seconds (1e-3 for ms)"""
+    fields = {key: measurement[key] * scale for key in TIME_FIELDS if key in measurement}
+    fields.update({key: measurement[key] for key in COUNTER_FIELDS if key in measurement})
+    for key in ('user', 'system'):
+        if f'{key}_time' in measurement:
+            fields[f'{key}_time'] = measurement[f'{key}_time']
+        elif f'{key}_ms' in measurement:
+            fields[f'{key}_time'] = measurement[f'{key}_ms'] / 1000
+    fields['noisy'] = bool(measurement.get('noisy', False))
+    return fields
+
+
+class Telemetry:
+    def __init__(self, target=None):
+        """target: a file path, tcp://host:port, unix:///path, a writable file object or None (off)"""
+        self.target = target
+        self.sweep = None
+        self._file = None
+        self._socket = None
+        # Events dropped because the socket's send buffer was full
+        self.dropped = 0
+        # Unsent tail of an event that only partly fit
+        self._pending = b""
+        if target is None:
+            return
+        if not isinstance(target, str):
+            self._file = target
+        elif target.startswith("tcp://"):
+            host, _, port = target[len("tcp://"):].rpartition(":")
+            self._socket = socket.create_connection((host or "localhost", int(port)))
+        elif target.startswith("unix://"):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(target[len("unix://"):])
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self._file = open(target, 'a')
+        if self._socket is not None:
+            # emit() must never wait on a slow listener (see _send)
+            self._socket.setblocking(False)
+
+    @classmethod
+    def open(cls, target):
+        """A Telemetry as is, or one for a target (None gives a disabled one)"""
+        return target if isinstance(target, cls) else cls(target)
+
+    @property
+    def enabled(self):
+        return self._file is not None or self._socket is not None
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        record = {'ts': time.time(), 'event': event, 'sweep': self.sweep}
+        record.update(fields)
+        line = json.dumps(record, default=_plain) + "\n"
+        try:
+            if self._socket is not None:
+                self._send(line.encode())
+            else:
+                self._file.write(line)
+                self._file.flush()
+        except OSError as e:
+            print(f"Telemetry to {self.target} failed ({e}); disabled")
+            self.close()
+
+    def _send(self, data):
+        # Finish a partly sent event first; a new one is never started while it is stuck
+        if self._pending:
+            try:
+                self._pending = self._pending[self._socket.send(self._pending):]
+            except BlockingIOError:
+                pass
+            if self._pending:
+                self.dropped += 1
+                return
+        try:
+            sent = self._socket.send(data)
+        except BlockingIOError:
+            self.dropped += 1
+            return
+        self._pending = data[sent:]
+
+    def start(self, analyzer, **fields):
+        """Begin a sweep: a new sweep id for this and the following events"""
+        self.sweep = uuid.uuid4().hex[:8]
+        self.emit('sweep_start', analyzer=analyzer, pid=os.getpid(), **fields)
+
+    def close(self):
+        if self._socket is not None:
+            if self.dropped:
+                print(f"Telemetry to {self.target}: {self.dropped} events dropped (listener too slow)")
+            if self._pending:
+                # Flush the last partial event so the listener does not see a torn line
+                self._socket.setblocking(True)
+                self._socket.settimeout(1.0)
+                try:
+                    self._socket.sendall(self._pending)
+                except OSError:
+                    pass
+                self._pending = b""
+            self._socket.close()
+        elif self._file is not None and isinstance(self.target, str):
+            self._file.close()
+        self._socket = self._file = None
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def _duration(seconds):
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class Aggregator:
+    """Live view of the sweeps in an event stream"""
+
+    def __init__(self, window=60.0, sizes=8):
+        self.window = window
+        self.sizes = sizes
+        self.sweeps = {}
+
+    def add(self, event):
+        sweep = self.sweeps.setdefault(event.get('sweep'), {
+            'analyzer': None, 'start': event['ts'], 'last': event['ts'], 'status': 'running',
+            'counts': {'ok': 0, 'censored': 0, 'failed': 0}, 'recent': deque(), 'medians': {},
+            'planned': None, 'budget': None, 'errors': 0, 'last_error': None, 'labels': {},
+        })
+        sweep['last'] = event['ts']
+        kind = event['event']
+        if kind == 'sweep_start':
+            sweep.update(analyzer=event['analyzer'], start=event['ts'], planned=event.get('planned_trials'),
+                         budget=event.get('budget'))
+            sweep['labels'] = {key: event[key] for key in ('distribution', 'profile', 'backend') if event.get(key)}
+        elif kind == 'trial':
+            sweep['counts'][event['status']] = sweep['counts'].get(event['status'], 0) + 1
+            sweep['recent'].append(event['ts'])
+            if event['status'] == 'ok' and 'sort' in event:
+                key = (event['size'], event.get('algorithm'), event.get('distribution'))
+                sweep['medians'].setdefault(key, []).append(event['sort'])
+        elif kind == 'error':
+            sweep['errors'] += 1
+            sweep['last_error'] = event.get('message')
+        elif kind == 'sweep_end':
+            sweep['status'] = event.get('status', 'done')
+        while sweep['recent'] and sweep['recent'][0] < sweep['last'] - self.window:
+            sweep['recent'].popleft()
+
+    def render(self, now=None):
+        lines = []
+        for sweep_id, sweep in self.sweeps.items():
+            now_ = sweep['last'] if now is None or sweep['status'] != 'running' else now
+            elapsed = now_ - sweep['start']
+            labels = ", ".join(f"{key}={value}" for key, value in sweep['labels'].items())
+            lines.append(f"sweep {sweep_id} {sweep['analyzer'] or '?'}"
+                         + (f" ({labels})" if labels else "") + f" {sweep['status']} {_duration(elapsed)}")
+            done = sum(sweep['counts'].values())
+            span = min(self.window, elapsed) or 1.0
+            rate = len(sweep['recent']) / span
+            eta = ""
+            if sweep['status'] == 'running':
+                if sweep['planned'] and rate > 0:
+                    eta = f" | ETA {_duration((sweep['planned'] - done) / rate)}"
+                elif sweep['budget']:
+                    eta = f" | ETA <= {_duration(sweep['budget'] - elapsed)} (budget)"
+            planned = f"/{sweep['planned']}" if sweep['planned'] else ""
+            lines.append(f"  trials {done}{planned}: {sweep['counts']['ok']} ok, {sweep['counts']['failed']} failed, "
+                         f"{sweep['counts']['censored']} censored | {rate:.2f} trials/s{eta}")
+            if sweep['medians']:
+                lines.append(f"  {'size':>10} {'algorithm':<12} {'distribution':<14} {'trials':>6} {'median sort (s)':>16}")
+                for key in sorted(sweep['medians'], key=lambda k: (k[0], str(k[1]), str(k[2])))[-self.sizes:]:
+                    size, algorithm, distribution = key
+                    times = sweep['medians'][key]
+                    lines.append(f"  {size:>10,} {algorithm or '-':<12} {distribution or '-':<14} {len(times):>6} "
+                                 f"{_median(times):>16.6f}")
+            if sweep['errors']:
+                lines.append(f"  {sweep['errors']} errors, last: {sweep['last_error']}")
+        return "\n".join(lines) if lines else "No events yet"
+
+
+def read_events(stream):
+    """Parse JSON lines, skipping a torn last line"""
+    for line in stream:
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def _show(aggregator, clear):
+    text = aggregator.render(now=time.time())
+    print(("\033[H\033[J" if clear else "") + text, flush=True)
+
+
+def tail(path, follow=False, interval=2.0):
+    aggregator = Aggregator()
+    clear = sys.stdout.isatty()
+    with open(path) as f:
+        for event in read_events(f):
+            aggregator.add(event)
+        _show(aggregator, clear)
+        buffer = ""
+        while follow:
+            time.sleep(interval)
+            buffer += f.read()
+            lines = buffer.split("\n")
+            buffer = lines.pop()
+            for event in read_events(lines):
+                aggregator.add(event)
+            _show(aggregator, clear)
+
+
+def listen(host, port, output=None, interval=2.0):
+    """Accept analyzers' event streams on a TCP port, aggregating (and optionally saving) them"""
+    aggregator = Aggregator()
+    clear = sys.stdout.isatty()
+    sink = open(output, 'a') if output else None
+    server = socket.create_server((host, port))
+    server.setblocking(False)
+    # The listening socket and every connection, each drained whenever it is readable
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, None)
+    print(f"Listening on {host or '*'}:{port}")
+
+    def receive(connection, buffer):
+        """Read a connection until it would block, closing it at EOF"""
+        while True:
+            try:
+                data = connection.recv(1 << 16)
+            except BlockingIOError:
+                return
+            except ConnectionError:
+                data = b""
+            if not data:
+                selector.unregister(connection)
+                connection.close()
+                return
+            lines = (buffer.pop() + data).split(b"\n")
+            buffer.append(lines.pop())
+            for line in lines:
+                if sink is not None:
+                    sink.write(line.decode() + "\n")
+                for event in read_events([line]):
+                    aggregator.add(event)
+
+    try:
+        shown = 0.0
+        while True:
+            for key, _ in selector.select(timeout=interval):
+                if key.fileobj is server:
+                    while True:
+                        try:
+                            connection, _ = server.accept()
+                        except BlockingIOError:
+                            break
+                        connection.setblocking(False)
+                        # The data is this connection's incomplete last line
+                        selector.register(connection, selectors.EVENT_READ, [b""])
+                else:
+                    receive(key.fileobj, key.data)
+            if sink is not None:
+                sink.flush()
+            if time.monotonic() - shown >= interval:
+                _show(aggregator, clear)
+                shown = time.monotonic()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+        if sink is not None:
+            sink.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch analyzer telemetry: throughput, ETA and per-size medians")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tail_parser = commands.add_parser("tail", help="summarize an event file")
+    tail_parser.add_argument("path")
+    tail_parser.add_argument("-f", "--follow", action="store_true", help="keep reading as events arrive")
+    tail_parser.add_argument("--interval", type=float, default=2.0, help="refresh interval (seconds)")
+    listen_parser = commands.add_parser("listen", help="receive events over TCP (telemetry=\"tcp://host:port\")")
+    listen_parser.add_argument("--host", default="")
+    listen_parser.add_argument("--port", type=int, required=True)
+    listen_parser.add_argument("--output", help="also append the events to this file")
+    listen_parser.add_argument("--interval", type=float, default=2.0, help="refresh interval (seconds)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "tail":
+            if not os.path.exists(args.path):
+                parser.error(f"no such file: {args.path}")
+            tail(args.path, args.follow, args.interval)
+        else:
+            listen(args.host, args.port, args.output, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Streaming correctness check of a sort program's output.
+
+The timed runs only look at the exit status.  verify() checks that an
+output really is the input sorted: it must be non-decreasing and hold the
+same multiset of values.  Both are checked block by block with vectorized
+NumPy, so memory stays bounded by the block size whatever n is:
+
+* order: every block is non-decreasing and starts at or above the last
+  value of the previous block;
+* multiset: input and output get an order-independent fingerprint, the
+  count plus the wrapping uint64 sum of a 64-bit mix (splitmix64) of each
+  value under two keys.  Any change of values or multiplicities alters
+  it except with negligible probability.
+
+What is checked is always the timed run's own output, after the timing
+has stopped: text output is the stdout the runners spooled to a temporary
+file (see run_executable's keep_output), read back and parsed in
+fixed-size chunks with np.fromstring, carrying a token split across
+chunks over; binary output is read in blocks from the file the timed run
+wrote.  Neither is ever held in memory whole.
+
+    measurement = run_executable(executable_path, payload, keep_output=True)
+    summary = verify_output(payload, measurement.pop('output', None))   # raises VerificationError
+"""
+
+import numpy as np
+
+from arrayio import BinaryPayload, read_binary
+from runner import RunnerError
+
+CHUNK_BYTES = 1 << 20
+BLOCK_ELEMENTS = 1 << 18
+_KEYS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xD1B54A32D192ED03))
+
+
+class VerificationError(RunnerError):
+    """Raised when a program's output is not its input in sorted order"""
+
+
+def _mix(values, key):
+    """splitmix64 finalizer of (value + key), elementwise with uint64 wraparound"""
+    z = values.astype(np.int64).view(np.uint64) + key
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class Fingerprint:
+    """Order-independent multiset fingerprint, fed block by block"""
+
+    def __init__(self):
+        self.count = 0
+        self.sums = [np.uint64(0)] * len(_KEYS)
+
+    def update(self, block):
+        self.count += len(block)
+        with np.errstate(over='ignore'):
+            self.sums = [s + _mix(block, key).sum(dtype=np.uint64) for s, key in zip(self.sums, _KEYS)]
+
+    def __eq__(self, other):
+        return self.count == other.count and self.sums == other.sums
+
+
+class OrderCheck:
+    """Non-decreasing check across consecutive blocks"""
+
+    def __init__(self):
+        self.last = None
+        self.position = 0
+        self.first_violation = None
+
+    def update(self, block):
+        if len(block) == 0:
+            return
+        if self.first_violation is None:
+            if self.last is not None and block[0] < self.last:
+                self.first_violation = self.position
+            else:
+                drops = np.flatnonzero(block[1:] < block[:-1])
+                if len(drops):
+                    self.first_violation = self.position + int(drops[0]) + 1
+        self.last = block[-1]
+        self.position += len(block)
+
+
+def text_blocks(read, chunk_bytes=CHUNK_BYTES):
+    """Yield int64 arrays parsed from a whitespace-separated byte stream, chunk by chunk"""
+    carry = b""
+    while True:
+        chunk = read(chunk_bytes)
+        if not chunk:
+            break
+        chunk = carry + chunk
+        # Hold back a token that may continue in the next chunk
+        cut = max(chunk.rfind(b" "), chunk.rfind(b"\n"))
+        if cut < 0:
+            carry = chunk
+            continue
+        carry = chunk[cut + 1:]
+        if cut > 0:
+            yield np.fromstring(chunk[:cut], dtype=np.int64, sep=" ")
+    if carry.strip():
+        yield np.fromstring(carry, dtype=np.int64, sep=" ")
+
+
+def _string_reader(text):
+    """read(size) over a str, returning bytes, for text_blocks"""
+    position = 0
+
+    def read(size):
+        nonlocal position
+        piece = text[position:position + size]
+        position += size
+        return piece.encode()
+
+    return read
+
+
+def text_input_blocks(text, chunk_bytes=CHUNK_BYTES):
+    """Array values of an "n a1 ... an" input string (the leading length is skipped)"""
+    first = True
+    for block in text_blocks(_string_reader(text), chunk_bytes):
+        if first and len(block):
+            block = block[1:]
+            first = False
+        yield block
+
+
+def binary_blocks(path, block_elements=BLOCK_ELEMENTS):
+    """Blocks of a raw int32 file, read through a memory map"""
+    mapped = read_binary(path)
+    for start in range(0, len(mapped), block_elements):
+        yield np.asarray(mapped[start:start + block_elements], dtype=np.int64)
+
+
+def verify(input_blocks, output_blocks):
+    """Check output against input; returns a summary dict, raises VerificationError"""
+    expected = Fingerprint()
+    for block in input_blocks:
+        expected.update(block)
+
+    actual = Fingerprint()
+    order = OrderCheck()
+    for block in output_blocks:
+        actual.update(block)
+        order.update(block)
+
+    if actual.count != expected.count:
+        raise VerificationError(f"output has {actual.count} values, input has {expected.count}")
+    if order.first_violation is not None:
+        raise VerificationError(f"output decreases at index {order.first_violation}")
+    if actual != expected:
+        raise VerificationError("output is ordered but is not a permutation of the input")
+    return {'n': actual.count, 'sorted': True, 'permutation': True}
+
+
+def verify_output(payload, output=None):
+    """Verify the output of the timed run on one payload.
+
+    Binary payloads are checked against the output file the run left
+    behind; text payloads against `output`, the file its stdout was
+    spooled to, which is closed afterwards.
+    """
+    if isinstance(payload, BinaryPayload):
+        return verify(binary_blocks(payload.input_path), binary_blocks(payload.output_path))
+    if output is None:
+        raise VerificationError("no captured output to check")
+    with output:
+        output.seek(0)
+        return verify(text_input_blocks(payload), text_blocks(output.read))
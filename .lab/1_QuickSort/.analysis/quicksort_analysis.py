@@ -4,80 +4,259 @@ QuickSort Performance Analysis Script
 
 This script analyzes the performance of the quicksort.cpp implementation
 by running it with different input sizes and measuring execution time.
-It generates a comprehensive graph showing time complexity.
+It saves the results next to this script and draws the time complexity
+graphs from them; `python lab.py report quicksort` (in .lab/.harness)
+redraws them later without measuring again.
+
+numpy and the measurement stack (backends, data generation, planner,
+statistics, verification) are imported by the methods that measure, so a
+report only loads what the harness base and the chart specs need.
 """
 
+import json
 import subprocess
-import time
-import random
-import matplotlib.pyplot as plt
-import numpy as np
 import os
 import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".harness"))
+from analyzer import Analyzer, AnalyzerOptions
+import charts
+from build import BuildError, executable_for
+from arrayio import BINARY, BinaryPayload, payload_size
+from runner import PHASES, RUSAGE_FIELDS, RunnerError, format_rss, preempted
+
+# Saved results and charts live next to this script
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = "quicksort_results.json"
+
+class QuickSortOptions(AnalyzerOptions):
+    """Settings of a QuickSortAnalyzer: the shared AnalyzerOptions plus what it measures"""
 
-class QuickSortAnalyzer:
-    def __init__(self, executable_path="../quicksort.out"):
+    def __init__(self, executable_path=None, backend=None, seed=42, **options):
+        super().__init__(**options)
+        # The quicksort executable; without one quicksort.cpp is built under `profile`
         self.executable_path = executable_path
-        self.results = []
+        # backend measures something else than quicksort.cpp: an in-process
+        # baseline named in backends.IN_PROCESS (e.g. "numpy-quicksort") or a Backend
+        self.backend = backend
+        # Seed of the generated inputs and of the noise guard's order
+        self.seed = seed
+
+
+class QuickSortAnalyzer(Analyzer):
+    Options = QuickSortOptions
+    name = "quicksort_analysis"
+    
+    def configure(self, options):
+        """Pick the backend: quicksort.cpp (built under the profile), an executable or a baseline"""
+        from backends import ExecutableBackend, make_backend
         
-    def generate_test_data(self, size):
-        """Generate random test data of specified size"""
-        return [random.randint(1, 10000) for _ in range(size)]
+        self.seed = options.seed
+        self.backend = make_backend(options.backend, self.pool) if options.backend is not None else None
+        if self.backend is not None and self.backend.in_process:
+            self.profile = None
+            self.executable_path = None
+        else:
+            executable_path = self.backend.executable_path if self.backend is not None else options.executable_path
+            # Without an explicit executable, quicksort.cpp is built (or taken from
+            # the build cache) under the given compiler profile
+            self.profile = None if executable_path else options.profile
+            self.executable_path = executable_path or executable_for("quicksort", options.profile)
+            self.backend = self.backend or ExecutableBackend(self.executable_path, self.pool)
+        self.backends = {"quicksort": self.backend}
+        # Sizes where every trial timed out: {'distribution', 'size', 'deadline', 'trials'}
+        self.censored = []
+    
+    def sweep_config(self):
+        """Settings that must match for journaled trials to be reused (also stored with each run)"""
+        target = (dict(executable_path=os.path.abspath(self.executable_path)) if self.executable_path
+                  else dict(backend=self.backend.name))
+        return dict(target, profile=self.profile, io_mode=self.io_mode, persistent=self.persistent, seed=self.seed)
+    
+    def replica_options(self):
+        return dict(executable_path=self.executable_path,
+                    backend=self.backend.name if self.backend.in_process else None)
+        
+    def generate_test_data(self, size, distribution="random", trial=0):
+        """Generate seeded test data of specified size and distribution"""
+        from datagen import generate
+        
+        return generate(distribution, size, seed=(self.seed, size, trial))
+    
+    def prepare_input(self, size, distribution="random", trial=0, name="trial"):
+        """Return the ready-to-feed input for one trial, from the dataset cache when enabled
+
+        Concurrent trials need distinct names so their binary files don't collide.
+        """
+        if self.cache is None:
+            return self.encode(self.generate_test_data(size, distribution, trial), name)
+        seed = (self.seed, size, trial)
+        if self.workspace is not None:
+            return self.workspace.payload_for(self.cache.path(distribution, size, seed, BINARY), name)
+        return self.cache.text(distribution, size, seed)
     
     def run_quicksort(self, data):
-        """Run the quicksort executable with given data and measure time"""
+        """Run the backend (the quicksort executable by default) with given data (or a prepared payload)
+        and measure wall and per-phase time"""
+        from verify import VerificationError
+        
+        payload = data if isinstance(data, (str, BinaryPayload)) else self.encode(data)
         try:
-            # Prepare input string
-            input_str = f"{len(data)}\n" + " ".join(map(str, data)) + "\n"
-            
-            # Measure execution time
-            start_time = time.perf_counter()
-            
-            # Run the executable
-            process = subprocess.run(
-                [self.executable_path],
-                input=input_str,
-                text=True,
-                capture_output=True,
-                timeout=30  # 30 second timeout
-            )
-            
-            end_time = time.perf_counter()
-            execution_time = end_time - start_time
-            
-            if process.returncode != 0:
-                print(f"Error running executable: {process.stderr}")
-                return None
-                
-            return execution_time
+            measurement = self.backend.run(payload, timeout=30, keep_output=self.verify)
+            if self.verify:
+                self.backend.verify(payload)
+            return measurement
             
         except subprocess.TimeoutExpired:
-            print(f"Timeout for size {len(data)}")
+            print(f"Timeout for size {payload_size(payload)}")
+            self.telemetry.emit('error', size=payload_size(payload), kind='timeout', message="timed out after 30s")
+            return None
+        except VerificationError as e:
+            print(f"Incorrect output for size {payload_size(payload)}: {e}")
+            self.telemetry.emit('error', size=payload_size(payload), kind='verification', message=str(e))
+            return None
+        except RunnerError as e:
+            print(f"Error running executable: {e}")
+            self.telemetry.emit('error', size=payload_size(payload), kind='runner', message=str(e))
             return None
         except Exception as e:
             print(f"Error: {e}")
+            self.telemetry.emit('error', size=payload_size(payload), kind=type(e).__name__, message=str(e))
             return None
     
-    def analyze_performance(self, sizes, trials=3):
-        """Analyze performance for different input sizes"""
-        print(f"Analyzing QuickSort performance with random data...")
-        print(f"Testing sizes: {sizes}")
-        print(f"Trials per size: {trials}")
+    def measure_task(self, task):
+        """Measure one (size, distribution, trial) task"""
+        size, distribution, trial = task
+        # Fresh (seeded, cached) data for each trial
+        return self.run_quicksort(self.prepare_input(size, distribution, trial))
+    
+    def journal_key(self, task):
+        size, distribution, trial = task
+        return ("quicksort", distribution, size, trial)
+    
+    def task_for_key(self, key):
+        _, distribution, size, trial = key
+        return (size, distribution, trial)
+    
+    def async_group(self, task):
+        # The trials of one size and distribution run at once
+        return task[:2]
+    
+    def async_job(self, k, task):
+        size, distribution, trial = task
+        return size, distribution, self.backend, self.prepare_input(size, distribution, trial, name=f"trial{k}")
+    
+    def sample_adaptively(self, size, distribution):
+        """Run trials of one size until the sampler's confidence target is met"""
+        from async_runner import censored
+        
+        def measure_batch(start, count):
+            return list(self.run_tasks([(size, distribution, trial) for trial in range(start, start + count)]))
+        
+        measurements, report = self.sampler.sample(
+            measure_batch, lambda m: {'sort': m['sort'] if m is not None and not censored(m) else None})
+        return measurements, report['converged']
+    
+    def analyze_performance(self, sizes, distribution="random", trials=3):
+        """Analyze performance for different input sizes (trials is ignored when a sampler is set)
+
+        sizes is a list, or a SweepPlanner that picks each next size from the
+        results so far and ends the sweep when its time budget runs out.
+        """
+        from datagen import DISTRIBUTIONS
+        from planner import SweepPlanner
+        
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {distribution!r}")
+        planner = sizes if isinstance(sizes, SweepPlanner) else None
+        print(f"Analyzing QuickSort performance with {distribution} data...")
+        if planner is None:
+            print(f"Testing sizes: {sizes}")
+        else:
+            print(f"Testing sizes: adaptive, from {planner.start:,} growing x{planner.growth:g} "
+                  f"(budget {planner.trial_budget:g}s per trial, {planner.total_budget:g}s total)")
+        if self.sampler is None:
+            print(f"Trials per size: {trials}")
+        else:
+            print(f"Trials per size: adaptive (median CI within ±{self.sampler.rel_width / 2:.1%}, "
+                  f"{self.sampler.min_samples}-{self.sampler.max_samples} trials, "
+                  f"{self.sampler.time_budget:g}s budget)")
+        if self.scheduler is not None:
+            print(f"Workers: {self.scheduler.concurrency} pinned to cores {self.scheduler.cores[:self.scheduler.concurrency]}")
+        if self.async_runner is not None:
+            print(f"Async runner: up to {self.async_runner.concurrency} executables in flight, "
+                  f"deadlines from the fitted model")
+        if self.noise is not None:
+            print(f"Order: randomized, in blocks of {self.noise.block_size} trials between host checks")
         print("-" * 50)
         
+        self.telemetry.start("quicksort_analysis", distribution=distribution, profile=self.profile,
+                             backend=self.backend.name if self.backend.in_process else None,
+                             sizes=None if planner is not None else list(sizes),
+                             planner=planner.config() if planner is not None else None,
+                             planned_trials=len(sizes) * trials if planner is None and self.sampler is None else None,
+                             budget=planner.total_budget if planner is not None else None,
+                             resumed=self.journal.resumed if self.journal is not None else 0)
+        started = time.perf_counter()
+        results = self.sweep(lambda: self.measure_sizes(sizes, planner, distribution, trials))
+        
+        if planner is not None:
+            print(f"Sweep stopped: {planner.stop_reason}")
+        if self.noise is not None:
+            print(f"Noise control: {self.noise.describe()}")
+        self.telemetry.emit('sweep_end', status='done', elapsed=time.perf_counter() - started, sizes=len(results),
+                            stop_reason=planner.stop_reason if planner is not None else None,
+                            noise=self.noise.describe() if self.noise is not None else None)
+        return results
+    
+    def measure_sizes(self, sizes, planner, distribution, trials):
+        """The per-size loop of analyze_performance: measure, summarize and print each size"""
+        import numpy as np
+        
+        from async_runner import censored
+        from stats import summarize
+        
         results = []
+        if planner is not None:
+            # The planner hands over a batch of sizes at a time
+            steps = self.planned_sizes(planner, distribution, trials)
+        elif self.sampler is None:
+            # Measurements arrive in task order, size by size
+            measurements = self.run_tasks([(size, distribution, trial) for size in sizes for trial in range(trials)])
+            steps = self.timed((size, [next(measurements) for _ in range(trials)], None) for size in sizes)
+        else:
+            steps = self.timed((size,) + self.sample_adaptively(size, distribution) for size in sizes)
         
-        for size in sizes:
+        for size, size_measurements, converged, measured_in in steps:
             print(f"Testing size: {size:>6}", end=" ")
+            # Sweep time of this size: measuring it, then summarizing it below
+            started = time.perf_counter() - measured_in
             
             times = []
-            for trial in range(trials):
-                # Generate fresh data for each trial
-                data = self.generate_test_data(size)
-                execution_time = self.run_quicksort(data)
-                
-                if execution_time is not None:
-                    times.append(execution_time)
+            phase_times = {phase: [] for phase in PHASES}
+            usage = {key: [] for key in RUSAGE_FIELDS}
+            preempted_trials = 0
+            noisy_trials = 0
+            censored_trials = 0
+            deadline = 0
+            for trial, measurement in enumerate(size_measurements):
+                if censored(measurement):
+                    # Timed out: only known to take longer than its deadline
+                    censored_trials += 1
+                    deadline = max(deadline, measurement['deadline'])
+                    print("C", end="", flush=True)
+                elif measurement is not None:
+                    self.samples.append({'algorithm': 'quicksort', 'distribution': distribution, 'size': size,
+                                         'trial': trial, 'sort': measurement['sort'], 'wall': measurement['wall'],
+                                         'replayed': measurement.get('replayed', False)})
+                    times.append(measurement['wall'])
+                    for phase in PHASES:
+                        phase_times[phase].append(measurement[phase])
+                    for key in RUSAGE_FIELDS:
+                        usage[key].append(measurement[key])
+                    preempted_trials += preempted(measurement, self.preemption_threshold)
+                    noisy_trials += measurement.get('noisy', False)
                     print(".", end="", flush=True)
                 else:
                     print("X", end="", flush=True)
@@ -85,147 +264,375 @@ class QuickSortAnalyzer:
             if times:
                 avg_time = np.mean(times)
                 std_time = np.std(times) if len(times) > 1 else 0
-                results.append({
+                result = {
                     'size': size,
                     'avg_time': avg_time,
                     'std_time': std_time,
                     'min_time': min(times),
                     'max_time': max(times),
                     'trials': len(times)
-                })
-                print(f" -> {avg_time:.6f}s (±{std_time:.6f}s)")
+                }
+                # In-binary phase timings, free of process startup overhead
+                for phase in PHASES:
+                    result[f'avg_{phase}_time'] = np.mean(phase_times[phase])
+                    result[f'std_{phase}_time'] = np.std(phase_times[phase]) if len(times) > 1 else 0
+                # Robust sort-phase statistics: median, its bootstrap CI and outlier trials
+                sort_stats = summarize(phase_times['sort'])
+                result['median_sort_time'] = sort_stats['median']
+                result['sort_ci_low'] = sort_stats['ci_low']
+                result['sort_ci_high'] = sort_stats['ci_high']
+                result['outliers'] = len(sort_stats['outliers'])
+                result['converged'] = converged
+                # OS-level cost per trial: peak memory, page faults, context switches, CPU split
+                # (None for in-process baselines, which have no peak of their own)
+                result['max_rss_kb'] = max((peak for peak in usage['max_rss_kb'] if peak is not None), default=None)
+                for key in RUSAGE_FIELDS:
+                    if key != 'max_rss_kb':
+                        result[f'avg_{key}'] = np.mean(usage[key])
+                result['preempted_trials'] = preempted_trials
+                result['noisy_trials'] = noisy_trials
+                result['censored_trials'] = censored_trials
+                results.append(result)
+                self.telemetry.emit('size', status='ok', distribution=distribution, size=size, trials=len(times),
+                                    elapsed=time.perf_counter() - started,
+                                    **{key: result[key] for key in ('avg_time', 'median_sort_time', 'sort_ci_low',
+                                                                    'sort_ci_high', 'outliers', 'max_rss_kb',
+                                                                    'preempted_trials', 'noisy_trials',
+                                                                    'censored_trials', 'converged')})
+                print(f" -> {avg_time:.6f}s (±{std_time:.6f}s), sort {result['median_sort_time']:.6f}s "
+                      f"[{result['sort_ci_low']:.6f}, {result['sort_ci_high']:.6f}], "
+                      f"{len(times)} trials, {result['outliers']} outliers, "
+                      f"{format_rss(result['max_rss_kb'])} peak RSS, {preempted_trials} preempted"
+                      + (f", {noisy_trials} in disturbed blocks" if noisy_trials else ""))
+            elif censored_trials:
+                self.censored.append({'distribution': distribution, 'size': size, 'deadline': deadline,
+                                      'trials': censored_trials})
+                self.telemetry.emit('size', status='censored', distribution=distribution, size=size,
+                                    censored_trials=censored_trials, deadline=deadline,
+                                    elapsed=time.perf_counter() - started)
+                print(f" -> CENSORED (all {censored_trials} trials > {deadline:.3f}s)")
             else:
+                self.telemetry.emit('size', status='failed', distribution=distribution, size=size,
+                                    elapsed=time.perf_counter() - started)
                 print(" -> FAILED")
+            
+            if planner is not None:
+                # The median sort time shapes the sweep; the slowest trial is checked against the budget
+                elapsed = time.perf_counter() - started
+                if times:
+                    planner.record(size, result['median_sort_time'], trial_time=max(times), elapsed=elapsed)
+                else:
+                    planner.record(size, None, elapsed=elapsed)
         
+        if planner is not None:
+            # Refinement sizes are measured out of order
+            results.sort(key=lambda r: r['size'])
         return results
     
+    def planned_sizes(self, planner, distribution, trials):
+        """(size, measurements, converged, seconds) for a planned sweep, a batch of sizes at a time
+
+        Each batch (see SweepPlanner.batch) is measured as one task list, so
+        under the noise guard its sizes are shuffled as well as their
+        trials.  Its time is split between the sizes by their trials' wall
+        time.
+        """
+        while True:
+            batch = planner.batch()
+            if not batch:
+                return
+            started = time.perf_counter()
+            if self.sampler is not None:
+                per_size = [self.sample_adaptively(size, distribution) for size in batch]
+            else:
+                measurements = iter(list(self.run_tasks([(size, distribution, trial) for size in batch
+                                                         for trial in range(trials)])))
+                per_size = [([next(measurements) for _ in range(trials)], None) for _ in batch]
+            elapsed = time.perf_counter() - started
+            walls = [sum(m['wall'] for m in size_measurements if m is not None)
+                     for size_measurements, _ in per_size]
+            for size, (size_measurements, converged), seconds in zip(batch, per_size, self.shares(elapsed, walls)):
+                yield size, size_measurements, converged, seconds
+    
+    def save_to_store(self, store, label=None):
+        """Record the measured trials with build and host info; returns the run id"""
+        # Each build profile is its own history, so runs are only compared like for like
+        name = f"quicksort_analysis/{self.profile}" if self.profile else "quicksort_analysis"
+        if self.backend.in_process:
+            name += f"/{self.backend.name}"
+        return store.record_run(name, self.samples, [self.backend.build_info("quicksort")],
+                                self.sweep_config(), label)
+    
+    @staticmethod
+    def by_distribution(results):
+        """Accept a single result list (random data) or a {distribution: results} dict"""
+        if isinstance(results, dict):
+            return {name: r for name, r in results.items() if r}
+        return {"random": results} if results else {}
+    
     def plot_results(self, results, save_path="quicksort_analysis.png"):
         """Plot the performance analysis results"""
-        plt.figure(figsize=(12, 8))
-        
+        results = self.by_distribution(results)
         if not results:
             print("No results to plot")
             return
-            
-        sizes = [r['size'] for r in results]
-        avg_times = [r['avg_time'] for r in results]
-        std_times = [r['std_time'] for r in results]
-        
-        # Plot with error bars
-        plt.errorbar(sizes, avg_times, yerr=std_times, 
-                    label="Random Data",
-                    color='blue', marker='o', markersize=6,
-                    capsize=3, capthick=1, linewidth=2)
-        
-        plt.xlabel('Input Size (n)', fontsize=12)
-        plt.ylabel('Execution Time (seconds)', fontsize=12)
-        plt.title('QuickSort Performance Analysis\nTime Complexity vs Input Size (Random Data)', fontsize=14)
-        plt.legend(fontsize=10)
-        plt.grid(True, alpha=0.3)
-        
-        # Use log scale if needed
-        if max(avg_times) > 1:
-            plt.yscale('log')
-            plt.ylabel('Execution Time (seconds) - Log Scale', fontsize=12)
-        
-        plt.tight_layout()
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-        
+        charts.render(results_chart(results, self.censored, save_path))
         print(f"Graph saved as: {save_path}")
     
+    def save_results(self, results, filename=RESULTS_FILE):
+        """Save the results (a list for random data or a {distribution: results} dict) for `lab.py report`"""
+        path = os.path.join(OUTPUT_DIR, filename)
+        with open(path, 'w') as f:
+            json.dump({'profile': self.profile, 'backend': self.backend.name,
+                       'results': self.by_distribution(results), 'censored': self.censored},
+                      f, indent=1, default=lambda value: value.item())
+        print(f"Results saved to: {path}")
+        return path
+    
     def generate_comprehensive_report(self, results):
         """Generate a comprehensive analysis report"""
+        results = self.by_distribution(results)
         print("\n" + "="*60)
-        print("QUICKSORT PERFORMANCE ANALYSIS REPORT - RANDOM DATA")
+        print("QUICKSORT PERFORMANCE ANALYSIS REPORT")
         print("="*60)
         
         if not results:
             print("No results to report")
             return
-            
-        print(f"\nRANDOM DATA:")
+        
+        for distribution, dist_results in results.items():
+            self.report_distribution(distribution, dist_results)
+        
+        if "random" in results and "adversary" in results:
+            self.report_worst_case(results["random"], results["adversary"])
+    
+    @staticmethod
+    def report_worst_case(average, worst):
+        """Adversarial against random input at the sizes both sweeps measured"""
+        average = {r['size']: r['avg_sort_time'] for r in average}
+        worst = {r['size']: r['avg_sort_time'] for r in worst}
+        common = sorted(set(average) & set(worst))
+        print("\nWORST CASE (adversary) vs AVERAGE CASE (random), sort phase:")
+        print(f"{'Size':>10} {'Random (s)':>12} {'Adversary (s)':>14} {'Slowdown':>10}")
+        for size in common:
+            slowdown = worst[size] / average[size] if average[size] > 0 else float('inf')
+            print(f"{size:>10,} {average[size]:>12.6f} {worst[size]:>14.6f} {slowdown:>9.1f}x")
+        if not common:
+            print("  No sizes in common")
+    
+    def report_distribution(self, distribution, results):
+        """Print the result table and growth analysis for one distribution"""
+        import fitting
+        
+        print(f"\n{distribution.replace('_', ' ').upper()} DATA:")
         print("-" * 30)
-        print(f"{'Size':>8} {'Avg Time':>12} {'Std Dev':>12} {'Min Time':>12} {'Max Time':>12}")
-        print("-" * 68)
+        print(f"{'Size':>8} {'Avg Time':>12} {'Std Dev':>12} {'Min Time':>12} {'Max Time':>12} "
+              f"{'Parse':>12} {'Sort':>12} {'Emit':>12} {'Sort Median 95% CI':>27} {'Trials':>7} {'Outl.':>6}")
+        print("-" * 150)
         
         for r in results:
             print(f"{r['size']:>8} {r['avg_time']:>12.6f} {r['std_time']:>12.6f} "
-                  f"{r['min_time']:>12.6f} {r['max_time']:>12.6f}")
-        
-        # Calculate growth rate
-        if len(results) >= 2:
-            first_result = results[0]
-            last_result = results[-1]
-            size_ratio = last_result['size'] / first_result['size']
-            time_ratio = last_result['avg_time'] / first_result['avg_time']
-            
-            print(f"\nGrowth Analysis:")
-            print(f"Size increased by factor: {size_ratio:.2f}")
-            print(f"Time increased by factor: {time_ratio:.2f}")
-            
-            # Estimate complexity (rough approximation)
-            if size_ratio > 1:
-                complexity_factor = np.log(time_ratio) / np.log(size_ratio)
-                print(f"Estimated complexity: O(n^{complexity_factor:.2f})")
+                  f"{r['min_time']:>12.6f} {r['max_time']:>12.6f} "
+                  f"{r['avg_parse_time']:>12.6f} {r['avg_sort_time']:>12.6f} {r['avg_emit_time']:>12.6f} "
+                  f"{r['sort_ci_low']:>13.6f}-{r['sort_ci_high']:<13.6f} {r['trials']:>7} {r['outliers']:>6}")
+        
+        print(f"\nResource usage (per trial):")
+        print(f"{'Size':>8} {'Wall':>12} {'User':>12} {'System':>12} {'Peak RSS KiB':>13} "
+              f"{'Minor Flt':>10} {'Major Flt':>10} {'Vol. Ctx':>9} {'Invol. Ctx':>11} {'Preempted':>10}")
+        print("-" * 117)
+        for r in results:
+            print(f"{r['size']:>8} {r['avg_time']:>12.6f} {r['avg_user_time']:>12.6f} {r['avg_system_time']:>12.6f} "
+                  f"{r['max_rss_kb'] if r['max_rss_kb'] is not None else 'n/a':>13} {r['avg_minor_faults']:>10.1f} {r['avg_major_faults']:>10.1f} "
+                  f"{r['avg_voluntary_ctx']:>9.1f} {r['avg_involuntary_ctx']:>11.1f} "
+                  f"{r['preempted_trials']:>4}/{r['trials']:<5}")
+        
+        timed_out = [c for c in self.censored if c['distribution'] == distribution]
+        partly = [r for r in results if r.get('censored_trials')]
+        if timed_out or partly:
+            print(f"\nCensored trials (missed their deadline):")
+            for r in partly:
+                print(f"{r['size']:>8}: {r['censored_trials']} of {r['censored_trials'] + r['trials']} trials")
+            for c in timed_out:
+                print(f"{c['size']:>8}: all {c['trials']} trials, each run > {c['deadline']:.3f}s wall")
+        
+        # Fit complexity models to the whole sweep rather than its two end points
+        sizes = [r['size'] for r in results]
+        try:
+            fits = fitting.fit_models(sizes, [r['avg_sort_time'] for r in results])
+        except ValueError:
+            return
+        
+        print(f"\nGrowth Analysis (weighted least squares, ranked by AIC):")
+        print(f"{'Model':>16} {'Fit':>36} {'AIC':>10} {'R^2':>8}")
+        for fit in fits:
+            print(f"{fitting.name(fit):>16} {fitting.describe(fit):>36} {fit['aic']:>10.2f} {fit['r2']:>8.4f}")
+        best = fits[0]
+        print(f"Best model: {fitting.name(best)}")
+        for n in (10 * max(sizes), 10**6, 10**7, 10**8):
+            print(f"Predicted sort time at n={n:,}: {float(fitting.predict(best, n)):.6f}s")
+
+def print_backend_comparison(executable, baselines):
+    """The executable's wall and sort-phase time per size next to each in-process baseline's sort time"""
+    print("\n" + "="*60)
+    print("HARNESS OVERHEAD AND IN-PROCESS BASELINES (random data, seconds)")
+    print("="*60)
+    sort_times = {name: {r['size']: r['avg_sort_time'] for r in results} for name, results in baselines.items()}
+    print(f"{'Size':>10} {'Exe wall':>10} {'Exe sort':>10} {'Overhead':>9}" + "".join(f" {name:>16}" for name in baselines))
+    for r in executable:
+        overhead = 1 - r['avg_sort_time'] / r['avg_time'] if r['avg_time'] > 0 else 0
+        row = f"{r['size']:>10,} {r['avg_time']:>10.6f} {r['avg_sort_time']:>10.6f} {overhead:>9.0%}"
+        for name in baselines:
+            # "-" where the baseline's sweep stopped before this size
+            time_ = sort_times[name].get(r['size'])
+            row += f" {time_:>16.6f}" if time_ is not None else f" {'-':>16}"
+        print(row)
+    print("Overhead: share of the executable's wall time spent outside the sort (process, pipes, parsing)")
+
+def results_chart(results, censored, save_path):
+    """Chart spec of sort-phase (and wall) time against size for each distribution"""
+    series = []
+    max_time = 0
+    all_sizes = []
+    for i, (distribution, dist_results) in enumerate(results.items()):
+        label = distribution.replace("_", " ").title()
+        color = f"C{i % 10}"
+        sizes = [r['size'] for r in dist_results]
+        avg_times = [r['avg_sort_time'] for r in dist_results]
+        max_time = max(max_time, max(avg_times))
+        all_sizes += sizes
+        # The sort phase with error bars; wall time shows the process overhead
+        series.append({'kind': 'errorbar', 'x': sizes, 'y': avg_times, 'yerr': [r['std_sort_time'] for r in dist_results],
+                       'label': f"{label} Data (sort phase)", 'color': color, 'marker': 'o', 'markersize': 6,
+                       'capsize': 3, 'capthick': 1, 'linewidth': 2})
+        series.append({'kind': 'line', 'x': sizes, 'y': [r['avg_time'] for r in dist_results],
+                       'label': f"{label} Data (wall, incl. startup/I-O)", 'color': color, 'linestyle': '--',
+                       'marker': '.', 'alpha': 0.4})
+        series.append({'kind': 'fit', 'x': sizes, 'y': avg_times, 'color': color, 'linestyle': ':', 'linewidth': 1.5})
+        # Timed-out sizes only have a lower bound: the deadline they missed
+        lower_bounds = [c for c in censored if c['distribution'] == distribution]
+        series.append({'kind': 'scatter', 'x': [c['size'] for c in lower_bounds],
+                       'y': [c['deadline'] for c in lower_bounds], 'marker': '^', 'color': color,
+                       'label': f"{label} Data (timed out, > deadline)"})
+    
+    names = ", ".join(name.replace("_", " ").title() for name in results)
+    # Log time scale once the slow cases pass a second; planned sweeps grow
+    # geometrically and span several decades of sizes
+    log_time = max_time > 1
+    log_size = max(all_sizes) > 100 * min(all_sizes)
+    return {'path': save_path, 'figsize': (12, 8), 'panels': [{
+        'title': f'QuickSort Performance Analysis\nTime Complexity vs Input Size ({names} Data)',
+        'xlabel': 'Input Size (n) - Log Scale' if log_size else 'Input Size (n)',
+        'ylabel': 'Execution Time (seconds) - Log Scale' if log_time else 'Execution Time (seconds)',
+        'xscale': 'log' if log_size else 'linear', 'yscale': 'log' if log_time else 'linear',
+        'series': series}]}
+
+def detailed_chart(results, save_path):
+    """Chart spec of one distribution's sort phase with its fitted model"""
+    sizes = [r['size'] for r in results]
+    times = [r['avg_sort_time'] for r in results]
+    return {'path': save_path, 'figsize': (10, 6), 'panels': [{
+        'title': 'QuickSort Performance - Random Data\nDetailed Analysis',
+        'xlabel': 'Input Size (n)', 'ylabel': 'Sort Time (seconds)',
+        'title_kwargs': {}, 'label_kwargs': {}, 'legend_kwargs': {},
+        'series': [
+            {'kind': 'errorbar', 'x': sizes, 'y': times, 'yerr': [r['std_sort_time'] for r in results],
+             'marker': 'o', 'capsize': 3, 'label': 'Sort phase'},
+            {'kind': 'fit', 'x': sizes, 'y': times, 'color': 'black', 'linestyle': ':', 'linewidth': 1.5},
+        ]}]}
+
+def report_charts(filename=RESULTS_FILE):
+    """Chart specs for every graph of a saved run (see QuickSortAnalyzer.save_results)"""
+    path = os.path.join(OUTPUT_DIR, filename)
+    if not os.path.exists(path):
+        print(f"No saved results in {path}")
+        return []
+    with open(path) as f:
+        saved = json.load(f)
+    results = {name: r for name, r in saved['results'].items() if r}
+    if not results:
+        return []
+    specs = [results_chart(results, saved['censored'], os.path.join(OUTPUT_DIR, "quicksort_comprehensive_analysis.png"))]
+    if results.get("random"):
+        specs.append(detailed_chart(results["random"], os.path.join(OUTPUT_DIR, "quicksort_random_detailed.png")))
+    return specs
 
 def main():
-    # Check if executable exists
-    executable_path = "../quicksort.out"
-    if not os.path.exists(executable_path):
-        print(f"Error: Executable not found at {executable_path}")
-        print("Please compile quicksort.cpp first:")
-        print("g++ -std=c++17 -O2 -Wall quicksort.cpp -o quicksort.out")
+    from backends import IN_PROCESS
+    from planner import SweepPlanner
+    
+    # Build quicksort.cpp (cached by source and flags); each trial is journaled
+    # as it completes, so re-running resumes an interrupted sweep
+    try:
+        analyzer = QuickSortAnalyzer(QuickSortOptions(journal=True, verify=True, noise=True, telemetry=True))
+    except BuildError as e:
+        print(f"Error: {e}")
         return
+    print(f"Executable: {analyzer.executable_path} ({analyzer.profile})")
+    print(f"Telemetry: {analyzer.telemetry.target} (watch with: python telemetry.py tail <file> --follow)")
+    if analyzer.journal.resumed:
+        print(f"Resuming: {analyzer.journal.resumed} trials already recorded in {analyzer.journal.path}")
     
-    analyzer = QuickSortAnalyzer(executable_path)
+    # Sizes grow geometrically from 10 and are refined where the slope bends;
+    # each distribution stops on its own once a trial would exceed 2s, so the
+    # quadratic cases end early while random data runs into the millions
+    sweep = dict(start=10, growth=2.0, trial_budget=2.0, total_budget=300.0)
+    # The pure-Python ports are far slower; give the baselines a smaller budget
+    baseline_sweep = dict(start=10, growth=2.0, trial_budget=0.5, total_budget=30.0)
     
-    # Define test sizes - comprehensive range for detailed analysis
-    small_sizes = list(range(10, 101, 10))           # 10, 20, ..., 100
-    medium_sizes = list(range(200, 1001, 100))       # 200, 300, ..., 1000
-    large_sizes = list(range(2000, 10001, 1000))     # 2000, 3000, ..., 10000
-    extra_large_sizes = list(range(15000, 50001, 5000))  # 15000, 20000, ..., 50000
+    # Test different data types (any name from datagen.DISTRIBUTIONS works)
+    # "adversary" is the constructed worst case for the last-element pivot
+    data_types = ["random", "sorted", "reverse", "duplicate", "adversary"]
     
-    # Combine all sizes
-    all_sizes = small_sizes + medium_sizes + large_sizes + extra_large_sizes
+    all_results = {}
     
-    # Test different data types
-    data_types = ["random", "sorted", "reverse", "duplicate"]
+    try:
+        for data_type in data_types:
+            print(f"\n{'='*50}")
+            print(f"Testing with {data_type.upper()} data")
+            print('='*50)
+            
+            results = analyzer.analyze_performance(SweepPlanner(**sweep), data_type, trials=3)
+            all_results[data_type] = results
+            
+            if not results:
+                print(f"No results obtained for {data_type} data")
+        # Every distribution finished: retire the journal so the next run measures afresh
+        analyzer.journal.complete()
+    except KeyboardInterrupt:
+        # Completed trials are already in the journal; report what finished
+        print(f"\nInterrupted: {len(analyzer.journal)} trials saved to {analyzer.journal.path}; "
+              "run again to resume")
+    finally:
+        analyzer.close()
     
-    all_results = {}
+    # Keep the run in the results history and check for regressions
+    if analyzer.samples:
+        analyzer.check_regressions()
     
-    for data_type in data_types:
-        print(f"\n{'='*50}")
-        print(f"Testing with {data_type.upper()} data")
-        print('='*50)
-        
-        results = analyzer.analyze_performance(all_sizes, data_type, trials=3)
-        all_results[data_type] = results
-        
-        if not results:
-            print(f"No results obtained for {data_type} data")
+    # The same random inputs through every in-process baseline: no process boundary,
+    # so set against the executable they show the harness overhead
+    if all_results.get("random"):
+        baselines = {}
+        try:
+            for name in IN_PROCESS:
+                print(f"\n{'='*50}\nIn-process baseline: {name}\n{'='*50}")
+                baseline = QuickSortAnalyzer(QuickSortOptions(backend=name, verify=True,
+                                                              telemetry=analyzer.telemetry.target))
+                try:
+                    baselines[name] = baseline.analyze_performance(SweepPlanner(**baseline_sweep), "random", trials=3)
+                finally:
+                    baseline.close()
+        except KeyboardInterrupt:
+            print("\nBaselines interrupted")
+        print_backend_comparison(all_results["random"], baselines)
     
-    # Generate plots and report
+    # Save the results, report, and draw the charts from the saved file exactly as
+    # `lab.py report quicksort` would
     if any(all_results.values()):
-        analyzer.plot_results(all_results, "quicksort_comprehensive_analysis.png")
+        analyzer.save_results(all_results)
         analyzer.generate_comprehensive_report(all_results)
-        
-        # Additional plot for just random data with more detail
-        if all_results.get("random"):
-            plt.figure(figsize=(10, 6))
-            results = all_results["random"]
-            sizes = [r['size'] for r in results]
-            times = [r['avg_time'] for r in results]
-            stds = [r['std_time'] for r in results]
-            
-            plt.errorbar(sizes, times, yerr=stds, marker='o', capsize=3)
-            plt.xlabel('Input Size (n)')
-            plt.ylabel('Execution Time (seconds)')
-            plt.title('QuickSort Performance - Random Data\nDetailed Analysis')
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
-            plt.savefig("quicksort_random_detailed.png", dpi=300, bbox_inches='tight')
-            plt.show()
+        for path in charts.render_all(report_charts()):
+            print(f"Graph saved as: {path}")
     else:
         print("No successful test results obtained!")
 
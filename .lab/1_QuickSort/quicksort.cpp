@@ -1,4 +1,5 @@
 #include <bits/stdc++.h>
+#include "../.harness/bench.hpp"
 using namespace std;
 
 int partitionVec(vector<int>& a, int l, int r) {
@@ -20,18 +21,9 @@ void quickSort(vector<int>& a, int l, int r) {
     quickSort(a, l, p - 1);
     quickSort(a, p + 1, r);
 }
-int main() {
-    int len;
-    cin >> len;
-    vector<int> arr(len);
-    for (int i = 0; i < len; i++) cin >> arr[i];
-
-    if (len > 0) quickSort(arr, 0, len - 1);
-    for (int i = 0; i < len; ++i) {
-        if (i) cout << ' ';
-        cout << arr[i];
-    }
-    if (len) cout << '\n';
-    
-    return 0;
-}
\ No newline at end of file
+int main(int argc, char** argv) {
+    return bench::run(argc, argv, [](vector<int>& arr) {
+        int len = arr.size();
+        if (len > 0) quickSort(arr, 0, len - 1);
+    });
+}
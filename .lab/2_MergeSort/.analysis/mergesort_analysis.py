@@ -3,139 +3,521 @@
 Merge Sort vs Quick Sort Performance Analysis
 Compares the running time of Merge Sort and Quick Sort algorithms
 on different input sizes and generates CSV and graphical results.
+The graphs are drawn from the saved CSV; `python lab.py report mergesort`
+(in .lab/.harness) redraws them later without measuring again.
+
+numpy and the measurement stack (backends, data generation, planner,
+statistics, verification) are imported by the methods that measure, so a
+report only loads what the harness base and the chart specs need.
 """
 
 import subprocess
-import time
-import random
 import csv
-import matplotlib.pyplot as plt
 import math
 import os
 import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", ".harness"))
+from analyzer import Analyzer, AnalyzerOptions
+import charts
+from build import DEFAULT_MATRIX, DEFAULT_PROFILE, BuildError, build_matrix, executable_for
+from arrayio import BINARY, BinaryPayload, payload_size
+from runner import PHASES, RunnerError, format_rss, peak_rss, preempted
+
+ALGORITHMS = ("merge_sort", "quick_sort")
+
+# Saved results and charts live next to this script
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FILE = "sorting_comparison_improved.csv"
+
+# Per-algorithm resource usage columns (peak RSS first, preempted run count last)
+USAGE_COLUMNS = ('max_rss_kb', 'minor_faults', 'major_faults', 'voluntary_ctx', 'involuntary_ctx',
+                 'user_ms', 'system_ms', 'preempted')
+# Per-algorithm columns left empty (None) at a size where the algorithm completed no run
+MEASURED_COLUMNS = (('time_ms', 'median_ms') + tuple(f'{phase}_ms' for phase in PHASES)
+                    + ('sort_ci_low_ms', 'sort_ci_high_ms', 'outliers') + USAGE_COLUMNS[1:-1])
+
+def measured(results, key):
+    """(sizes, values) of the results that have a value for key (None, or 0 in older CSVs, means not measured)"""
+    points = [(r['input_size'], r[key]) for r in results if r[key]]
+    return [size for size, _ in points], [value for _, value in points]
+
+
+class SortingOptions(AnalyzerOptions):
+    """Settings of a SortingAnalyzer: the shared AnalyzerOptions plus what it compares"""
+
+    def __init__(self, distribution="random", mergesort_path=None, quicksort_path=None, backends=None, **options):
+        super().__init__(**options)
+        # Input distribution of every dataset (a name from datagen.DISTRIBUTIONS)
+        self.distribution = distribution
+        # The executables; without them mergesort.cpp and quicksort.cpp are built under `profile`
+        self.mergesort_path = mergesort_path
+        self.quicksort_path = quicksort_path
+        # backends replaces either algorithm's executable, e.g. {'quick_sort': "python-quicksort"}:
+        # an in-process baseline named in backends.IN_PROCESS, an executable path or a Backend
+        self.backends = backends
+
+    def check(self):
+        from datagen import DISTRIBUTIONS
 
-class SortingAnalyzer:
-    def __init__(self):
+        super().check()
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {self.distribution!r}")
+
+
+class SortingAnalyzer(Analyzer):
+    Options = SortingOptions
+    name = "sorting_comparison"
+    # Measurements are in milliseconds
+    time_scale = 1e-3
+    
+    def configure(self, options):
+        """Pick both algorithms' backends: the lab's sources (built under the profile), executables or baselines"""
+        from backends import ExecutableBackend, make_backend
+        
+        self.distribution = options.distribution
+        # Sizes of a run_analysis() without a planner
         # Use larger minimum input sizes to reduce overhead impact
         self.input_sizes = [10,100, 500, 1000, 5000, 10000]
-        self.mergesort_path = "/home/anmol/ds/.lab/2_MergeSort/mergesort.out"
-        self.quicksort_path = "/home/anmol/ds/.lab/1_QuickSort/quicksort.out"
-        self.results = []
+        self.backends = {algorithm: make_backend(spec, self.pool)
+                         for algorithm, spec in (options.backends or {}).items()}
+        paths = {'merge_sort': options.mergesort_path, 'quick_sort': options.quicksort_path}
+        for algorithm, backend in self.backends.items():
+            paths[algorithm] = None if backend.in_process else backend.executable_path
+        # Executables not given explicitly are built (or taken from the build
+        # cache) from the lab's sources under the compiler profile
+        built = [algorithm for algorithm in ALGORITHMS if algorithm not in self.backends and not paths[algorithm]]
+        self.profile = options.profile if built else None
+        for algorithm, source in (('merge_sort', "mergesort"), ('quick_sort', "quicksort")):
+            if algorithm not in self.backends:
+                paths[algorithm] = paths[algorithm] or executable_for(source, options.profile)
+                self.backends[algorithm] = ExecutableBackend(paths[algorithm], self.pool)
+        # None for an in-process backend
+        self.mergesort_path = paths['merge_sort']
+        self.quicksort_path = paths['quick_sort']
+        self._prepared = (None, None)
+    
+    def sweep_config(self):
+        """Settings that must match for journaled measurements to be reused (also stored with each run)"""
+        def target(path, algorithm):
+            return os.path.abspath(path) if path else f"in-process:{self.backends[algorithm].name}"
+        return dict(mergesort_path=target(self.mergesort_path, 'merge_sort'),
+                    quicksort_path=target(self.quicksort_path, 'quick_sort'), profile=self.profile,
+                    io_mode=self.io_mode, persistent=self.persistent)
+    
+    def replica_options(self):
+        return dict(mergesort_path=self.mergesort_path, quicksort_path=self.quicksort_path,
+                    backends={algorithm: backend.name for algorithm, backend in self.backends.items()
+                              if backend.in_process})
+    
+    def execute(self, backend, input_data, timeout, keep_output=False):
+        """Run one trial on a backend (executables go through the persistent worker when enabled)"""
+        return backend.run(input_data, timeout=timeout, keep_output=keep_output)
+        
+    def generate_test_data(self, size, seed):
+        """Generate seeded test data of given size from the selected distribution"""
+        from datagen import generate
         
-    def generate_random_data(self, size):
-        """Generate a list of random integers of given size"""
-        return [random.randint(1, size * 10) for _ in range(size)]
+        return generate(self.distribution, size, seed=seed)
+    
+    def prepare_input(self, size, seed, name="trial"):
+        """Return the ready-to-feed input for one dataset, from the dataset cache when enabled
+
+        Concurrent measurements need distinct names so their binary files don't collide.
+        """
+        # Both algorithms run back to back on the same dataset; prepare it once
+        key, payload = self._prepared
+        if key == (size, seed, name):
+            return payload
+        if self.cache is None:
+            payload = self.encode(self.generate_test_data(size, seed), name)
+        elif self.workspace is not None:
+            payload = self.workspace.payload_for(self.cache.path(self.distribution, size, seed, BINARY), name)
+        else:
+            payload = self.cache.text(self.distribution, size, seed)
+        self._prepared = ((size, seed, name), payload)
+        return payload
     
-    def measure_execution_time(self, executable_path, data):
-        """Measure the execution time of a sorting algorithm with improved accuracy"""
+    def measure_execution_time(self, backend, data):
+        """Measure wall and per-phase time (ms) of a sorting algorithm with improved accuracy"""
+        from verify import VerificationError
+        
         try:
-            # Prepare input data as string
-            input_data = f"{len(data)}\n" + " ".join(map(str, data)) + "\n"
+            # Prepare input data in the selected format (prepared payloads are used as-is)
+            input_data = data if isinstance(data, (str, BinaryPayload)) else self.encode(data)
             
             # Warm-up run to minimize cold start effects
-            subprocess.run(
-                [executable_path],
-                input=input_data,
-                text=True,
-                capture_output=True,
-                timeout=10
-            )
+            self.execute(backend, input_data, timeout=10)
             
             # Measure multiple runs and take the minimum (best case)
-            times = []
-            for _ in range(3):  # Take 3 measurements
-                start_time = time.perf_counter()
-                
-                process = subprocess.run(
-                    [executable_path],
-                    input=input_data,
-                    text=True,
-                    capture_output=True,
-                    timeout=30
-                )
-                
-                end_time = time.perf_counter()
-                
-                if process.returncode != 0:
-                    print(f"Error running {executable_path}: {process.stderr}")
-                    return None
-                
-                times.append((end_time - start_time) * 1000)  # Convert to milliseconds
+            measurements = []
+            for run in range(3):  # Take 3 measurements
+                # Only the last run's output is kept, for verification
+                measurements.append(self.execute(backend, input_data, timeout=30,
+                                                 keep_output=self.verify and run == 2))
+            result = self.aggregate(measurements)
             
-            # Return the minimum time (best performance, least affected by system noise)
-            execution_time = min(times)
-            return execution_time
+            if self.verify:
+                backend.verify(input_data)
+            return result
             
         except subprocess.TimeoutExpired:
-            print(f"Timeout occurred for {executable_path} with input size {len(data)}")
+            print(f"Timeout occurred for {backend.name} with input size {payload_size(data)}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(data), kind='timeout',
+                                message="timed out")
+            return None
+        except VerificationError as e:
+            print(f"Incorrect output from {backend.name} with input size {payload_size(data)}: {e}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(data), kind='verification',
+                                message=str(e))
+            return None
+        except RunnerError as e:
+            print(f"Error running {backend.name}: {e}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(data), kind='runner', message=str(e))
             return None
         except Exception as e:
             print(f"Error measuring execution time: {e}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(data), kind=type(e).__name__,
+                                message=str(e))
+            return None
+    
+    def aggregate(self, measurements):
+        """Combine the repeated runs of one measurement (times in ms)"""
+        # Keep the fastest run (best performance, least affected by system noise); its
+        # phases are taken together so they add up to its wall time
+        best = min(measurements, key=lambda m: m['wall'])
+        result = {key: best[key] * 1000  # Convert to milliseconds
+                  for key in ('wall',) + PHASES}
+        # Resource usage: peak memory over the runs, mean of the per-run counters
+        result['max_rss_kb'] = peak_rss(measurements)
+        for key in ('minor_faults', 'major_faults', 'voluntary_ctx', 'involuntary_ctx'):
+            result[key] = sum(m[key] for m in measurements) / len(measurements)
+        result['user_ms'] = sum(m['user_time'] for m in measurements) / len(measurements) * 1000
+        result['system_ms'] = sum(m['system_time'] for m in measurements) / len(measurements) * 1000
+        result['preempted'] = sum(preempted(m, self.preemption_threshold) for m in measurements)
+        return result
+    
+    async def measure_async(self, backend, payload, deadline):
+        """Warm-up plus 3 runs of one measurement on the async runner; censored if any run times out"""
+        from async_runner import censored
+        
+        measurements = []
+        try:
+            for run in range(4):
+                # Only the last run's output is kept, for verification
+                measurement = await self.async_runner.run(backend.executable_path, payload, deadline,
+                                                          keep_output=self.verify and run == 3)
+                if censored(measurement):
+                    return measurement
+                measurements.append(measurement)
+        except RunnerError as e:
+            print(f"Error running {backend.name}: {e}")
+            self.telemetry.emit('error', backend=backend.name, size=payload_size(payload), kind='runner',
+                                message=str(e))
             return None
+        output = measurements[-1].pop('output', None)
+        # The first run is the warm-up
+        result = self.aggregate(measurements[1:])
+        if output is not None:
+            result['output'] = output
+        return result
+    
+    def measure_task(self, task):
+        """Measure one (size, iteration, algorithm) task"""
+        size, i, algorithm = task
+        # Use different seed for each iteration
+        data = self.prepare_input(size, seed=42 + i + size)
+        return self.measure_execution_time(self.backends[algorithm], data)
+    
+    def journal_key(self, task):
+        size, i, algorithm = task
+        return (algorithm, self.distribution, size, i)
+    
+    def task_for_key(self, key):
+        algorithm, _, size, i = key
+        return (size, i, algorithm)
+    
+    @staticmethod
+    def noise_group(task):
+        # Tasks on one (size, iteration) dataset stay together
+        return task[:2]
+    
+    def async_group(self, task):
+        # Every measurement of a size runs at once; deadlines follow each algorithm's model
+        return task[0]
+    
+    def async_job(self, k, task):
+        size, i, algorithm = task
+        payload = self.prepare_input(size, seed=42 + i + size, name=f"{size}-{i}")
+        if isinstance(payload, BinaryPayload):
+            payload = self.workspace.payload_for(payload.input_path, f"{size}-{i}-{algorithm}")
+        return size, algorithm, self.backends[algorithm], payload
+    
+    @staticmethod
+    def iterations_for(size):
+        # Use more iterations for better statistical accuracy
+        return 7 if size <= 5000 else 5  # More iterations for smaller sizes
+    
+    @staticmethod
+    def summarize(times):
+        """Return (outlier-free mean, median) of a list of timings"""
+        from stats import summarize
+        
+        stats = summarize(times)
+        return stats['clean_mean'], stats['median']
+    
+    def measure_iterations(self, size, start, count, algorithms=ALGORITHMS):
+        """(merge, quick) measurement pairs for iterations start..start+count-1
+
+        Algorithms left out of `algorithms` are not run; their side of each pair is None.
+        """
+        measurements = iter(self.run_tasks([(size, i, algorithm) for i in range(start, start + count)
+                                            for algorithm in algorithms]))
+        # Consecutive results belong to the same dataset
+        return [tuple(next(measurements) if algorithm in algorithms else None for algorithm in ALGORITHMS)
+                for _ in range(count)]
+    
+    def sample_adaptively(self, size, algorithms=ALGORITHMS):
+        """Run iterations of one size until the sampler's confidence target is met"""
+        from async_runner import censored
+        
+        def sort_times(pair):
+            return {algorithm: measured['sort'] if measured is not None and not censored(measured) else None
+                    for algorithm, measured in zip(ALGORITHMS, pair) if algorithm in algorithms}
+        
+        pairs, report = self.sampler.sample(
+            lambda start, count: self.measure_iterations(size, start, count, algorithms), sort_times)
+        return pairs, report['converged']
     
-    def run_analysis(self):
-        """Run the complete analysis for all input sizes"""
-        print("Starting Merge Sort vs Quick Sort Performance Analysis...")
+    def planned_sizes(self, planners):
+        """(size, algorithms, pairs, converged, seconds) for planned sweeps, a batch of sizes at a time
+
+        Each batch is every size some algorithm's planner can take next (see
+        SweepPlanner.batch), run by the algorithms that want it.  Without a
+        sampler it is measured as one task list, so under the noise guard its
+        sizes are shuffled as well as their datasets.  Its time is split
+        between the sizes by their runs' wall time.
+        """
+        while True:
+            wanted = {}
+            for algorithm, planner in planners.items():
+                for size in planner.batch():
+                    wanted.setdefault(size, []).append(algorithm)
+            if not wanted:
+                return
+            batch = sorted(wanted)
+            algorithms = {size: tuple(a for a in ALGORITHMS if a in wanted[size]) for size in batch}
+            started = time.perf_counter()
+            if self.sampler is not None:
+                per_size = [self.sample_adaptively(size, algorithms[size]) for size in batch]
+            else:
+                measurements = iter(list(self.run_tasks([(size, i, algorithm) for size in batch
+                                                         for i in range(self.iterations_for(size))
+                                                         for algorithm in algorithms[size]])))
+                # Consecutive results belong to the same dataset
+                per_size = [([tuple(next(measurements) if algorithm in algorithms[size] else None
+                                    for algorithm in ALGORITHMS)
+                              for _ in range(self.iterations_for(size))], None) for size in batch]
+            elapsed = time.perf_counter() - started
+            walls = [sum(m['wall'] for pair in pairs for m in pair if m is not None) for pairs, _ in per_size]
+            for size, (pairs, converged), seconds in zip(batch, per_size, self.shares(elapsed, walls)):
+                yield size, algorithms[size], pairs, converged, seconds
+    
+    def run_analysis(self, planner=None):
+        """Run the complete analysis for all input sizes
+
+        With a SweepPlanner the sizes are planned as the sweep goes instead of
+        taken from input_sizes.  Each algorithm gets its own copy of the
+        planner, so each stops at its own budget (quick sort's quadratic cases
+        end early while merge sort carries on).
+        """
+        print(f"Starting Merge Sort vs Quick Sort Performance Analysis ({self.distribution} data)...")
         print("Improvements: Larger input sizes, warm-up runs, multiple measurements")
+        if planner is not None:
+            print(f"Sizes: adaptive, from {planner.start:,} growing x{planner.growth:g} "
+                  f"(budget {planner.trial_budget:g}s per run, {planner.total_budget:g}s total per algorithm)")
+        if self.scheduler is not None:
+            print(f"Workers: {self.scheduler.concurrency} pinned to cores {self.scheduler.cores[:self.scheduler.concurrency]}")
+        if self.async_runner is not None:
+            print(f"Async runner: up to {self.async_runner.concurrency} measurements in flight, "
+                  f"deadlines from the fitted model")
+        if self.noise is not None:
+            print(f"Order: randomized, algorithms interleaved per dataset, blocks of {self.noise.block_size} "
+                  f"between host checks")
         print("=" * 70)
         
-        for size in self.input_sizes:
-            print(f"\nTesting with input size: {size:,}")
+        fixed = planner is None and self.sampler is None
+        self.telemetry.start("sorting_comparison", distribution=self.distribution, profile=self.profile,
+                             backend="+".join(backend.name for backend in self.backends.values() if backend.in_process)
+                             or None,
+                             sizes=None if planner is not None else list(self.input_sizes),
+                             planner=planner.config() if planner is not None else None,
+                             planned_trials=(sum(self.iterations_for(size) for size in self.input_sizes)
+                                             * len(ALGORITHMS) if fixed else None),
+                             budget=planner.total_budget * len(ALGORITHMS) if planner is not None else None,
+                             resumed=self.journal.resumed if self.journal is not None else 0)
+        started = time.perf_counter()
+        planners = self.sweep(lambda: self.measure_sizes(planner))
+        
+        if planners is not None:
+            for algo, algo_planner in planners.items():
+                print(f"{algo} sweep stopped: {algo_planner.stop_reason}")
+        if self.noise is not None:
+            print(f"Noise control: {self.noise.describe()}")
+        self.telemetry.emit('sweep_end', status='done', elapsed=time.perf_counter() - started,
+                            sizes=len(self.results),
+                            stop_reason=({algo: p.stop_reason for algo, p in planners.items()}
+                                         if planners is not None else None),
+                            noise=self.noise.describe() if self.noise is not None else None)
+    
+    def measure_sizes(self, planner=None):
+        """The per-size loop of run_analysis; returns each algorithm's planner (None for fixed sizes)"""
+        from async_runner import censored
+        from planner import SweepPlanner
+        from stats import summarize
+        
+        planners = None
+        if planner is not None:
+            # The planners hand over a batch of sizes at a time
+            planners = {algorithm: SweepPlanner(**planner.config()) for algorithm in ALGORITHMS}
+            steps = self.planned_sizes(planners)
+        elif self.sampler is None:
+            # Measurements arrive in task order: size, then iteration, then algorithm
+            tasks = [(size, i, algorithm) for size in self.input_sizes
+                     for i in range(self.iterations_for(size))
+                     for algorithm in ALGORITHMS]
+            measurements = self.run_tasks(tasks)
+            steps = self.timed((size, ALGORITHMS, [(next(measurements), next(measurements))
+                                                   for _ in range(self.iterations_for(size))], None)
+                               for size in self.input_sizes)
+        else:
+            steps = self.timed((size, ALGORITHMS) + self.sample_adaptively(size) for size in self.input_sizes)
+        
+        first = len(self.results)
+        for size, algorithms, pairs, converged, measured_in in steps:
+            print(f"\nTesting with input size: {size:,}" +
+                  ("" if algorithms == ALGORITHMS else f" ({', '.join(algorithms)} only)"))
+            # Sweep time of this size: measuring it, then summarizing it below
+            started = time.perf_counter() - measured_in
             
             # Generate multiple test datasets and average the results
             merge_times = []
             quick_times = []
+            merge_phases = {phase: [] for phase in PHASES}
+            quick_phases = {phase: [] for phase in PHASES}
+            merge_usage = []
+            quick_usage = []
+            # Measurements that missed their deadline: only a lower bound is known
+            censored_counts = {'merge_sort': 0, 'quick_sort': 0}
             
-            # Use more iterations for better statistical accuracy
-            iterations = 7 if size <= 5000 else 5  # More iterations for smaller sizes
+            iterations = len(pairs)
             
-            for i in range(iterations):
+            # Merge Sort and Quick Sort times on the same dataset
+            for i, (merge_time, quick_time) in enumerate(pairs):
                 print(f"  Iteration {i+1}/{iterations}")
+                for algo, measured in (('merge_sort', merge_time), ('quick_sort', quick_time)):
+                    if censored(measured):
+                        censored_counts[algo] += 1
+                    elif measured is not None:
+                        self.samples.append({'algorithm': algo, 'distribution': self.distribution, 'size': size,
+                                             'trial': i, 'sort': measured['sort'] / 1000,
+                                             'wall': measured['wall'] / 1000,
+                                             'replayed': measured.get('replayed', False)})
                 
-                # Generate random data (use different seed for each iteration)
-                random.seed(42 + i + size)  # Vary the seed
-                data = self.generate_random_data(size)
-                
-                # Measure Merge Sort time
-                merge_time = self.measure_execution_time(self.mergesort_path, data.copy())
-                if merge_time is not None:
-                    merge_times.append(merge_time)
+                if merge_time is not None and not censored(merge_time):
+                    merge_times.append(merge_time['wall'])
+                    for phase in PHASES:
+                        merge_phases[phase].append(merge_time[phase])
+                    merge_usage.append(merge_time)
                 
-                # Measure Quick Sort time
-                quick_time = self.measure_execution_time(self.quicksort_path, data.copy())
-                if quick_time is not None:
-                    quick_times.append(quick_time)
+                if quick_time is not None and not censored(quick_time):
+                    quick_times.append(quick_time['wall'])
+                    for phase in PHASES:
+                        quick_phases[phase].append(quick_time[phase])
+                    quick_usage.append(quick_time)
             
             # Calculate statistics (use median for more robust results)
-            if merge_times and quick_times:
-                # Remove outliers (top and bottom 10%) for cleaner results
-                merge_times_clean = sorted(merge_times)[1:-1] if len(merge_times) > 3 else merge_times
-                quick_times_clean = sorted(quick_times)[1:-1] if len(quick_times) > 3 else quick_times
-                
-                avg_merge_time = sum(merge_times_clean) / len(merge_times_clean)
-                avg_quick_time = sum(quick_times_clean) / len(quick_times_clean)
-                
-                # Also calculate median for comparison
-                median_merge = sorted(merge_times)[len(merge_times)//2]
-                median_quick = sorted(quick_times)[len(quick_times)//2]
-            else:
-                avg_merge_time = avg_quick_time = 0
-                median_merge = median_quick = 0
+            avg_merge_time, median_merge = self.summarize(merge_times)
+            avg_quick_time, median_quick = self.summarize(quick_times)
             
             # Store results
-            self.results.append({
+            result = {
+                'profile': self.profile,
+                'distribution': self.distribution,
                 'input_size': size,
                 'merge_sort_time_ms': avg_merge_time,
                 'quick_sort_time_ms': avg_quick_time,
                 'merge_sort_median_ms': median_merge,
                 'quick_sort_median_ms': median_quick,
-                'iterations': min(len(merge_times), len(quick_times))
-            })
+                'iterations': min(len(times) for algo, times in (('merge_sort', merge_times), ('quick_sort', quick_times))
+                                  if algo in algorithms)
+            }
+            # In-binary phase timings, free of process startup overhead
+            for phase in PHASES:
+                result[f'merge_sort_{phase}_ms'] = self.summarize(merge_phases[phase])[0]
+                result[f'quick_sort_{phase}_ms'] = self.summarize(quick_phases[phase])[0]
+            # Sort-phase median confidence intervals and outlier counts
+            sort_medians = {}
+            for algo, phases in (('merge_sort', merge_phases), ('quick_sort', quick_phases)):
+                sort_stats = summarize(phases['sort'])
+                sort_medians[algo] = sort_stats['median']
+                result[f'{algo}_sort_ci_low_ms'] = sort_stats['ci_low']
+                result[f'{algo}_sort_ci_high_ms'] = sort_stats['ci_high']
+                result[f'{algo}_outliers'] = len(sort_stats['outliers'])
+            result['converged'] = converged
+            # Resource usage per run, to compare memory footprint and OS costs
+            for algo, usage in (('merge_sort', merge_usage), ('quick_sort', quick_usage)):
+                # None for an in-process backend, which has no peak of its own
+                result[f'{algo}_max_rss_kb'] = peak_rss(usage)
+                for key in USAGE_COLUMNS[1:-1]:
+                    result[f'{algo}_{key}'] = sum(u[key] for u in usage) / len(usage) if usage else 0
+                result[f'{algo}_preempted'] = sum(u['preempted'] for u in usage)
+                result[f'{algo}_noisy'] = sum(u.get('noisy', False) for u in usage)
+                result[f'{algo}_censored'] = censored_counts[algo]
+            # An algorithm with no completed run here (not planned at this size, or every run
+            # timed out or failed) has no times, rather than zeros
+            for algo, times in (('merge_sort', merge_times), ('quick_sort', quick_times)):
+                if not times:
+                    for key in MEASURED_COLUMNS:
+                        result[f'{algo}_{key}'] = None
+            self.results.append(result)
+            for algo, times in (('merge_sort', merge_times), ('quick_sort', quick_times)):
+                if algo not in algorithms:
+                    continue
+                # Times in seconds, when there are any
+                timing = {}
+                if times:
+                    timing = dict(median_sort_time=sort_medians[algo] / 1000,
+                                  avg_sort_time=result[f'{algo}_sort_ms'] / 1000,
+                                  sort_ci_low=result[f'{algo}_sort_ci_low_ms'] / 1000,
+                                  sort_ci_high=result[f'{algo}_sort_ci_high_ms'] / 1000,
+                                  outliers=result[f'{algo}_outliers'])
+                self.telemetry.emit('size', algorithm=algo, distribution=self.distribution, size=size,
+                                    status='ok' if times else 'censored' if censored_counts[algo] else 'failed',
+                                    trials=len(times), elapsed=time.perf_counter() - started, **timing,
+                                    max_rss_kb=result[f'{algo}_max_rss_kb'],
+                                    preempted=result[f'{algo}_preempted'], noisy=result[f'{algo}_noisy'],
+                                    censored_trials=censored_counts[algo], converged=converged)
             
-            print(f"  Average Merge Sort time: {avg_merge_time:.4f} ms (median: {median_merge:.4f})")
-            print(f"  Average Quick Sort time: {avg_quick_time:.4f} ms (median: {median_quick:.4f})")
+            for algo, label in (('merge_sort', "Merge Sort"), ('quick_sort', "Quick Sort")):
+                if result[f'{algo}_time_ms'] is None:
+                    continue
+                print(f"  Average {label} time: {result[f'{algo}_time_ms']:.4f} ms "
+                      f"(median: {result[f'{algo}_median_ms']:.4f}, sort phase: {result[f'{algo}_sort_ms']:.4f}, "
+                      f"median CI [{result[f'{algo}_sort_ci_low_ms']:.4f}, {result[f'{algo}_sort_ci_high_ms']:.4f}], "
+                      f"{result[f'{algo}_outliers']} outliers)")
+            print(f"  Peak RSS - Merge: {format_rss(result['merge_sort_max_rss_kb'])}, "
+                  f"Quick: {format_rss(result['quick_sort_max_rss_kb'])}; "
+                  f"preempted runs - Merge: {result['merge_sort_preempted']}, Quick: {result['quick_sort_preempted']}")
+            if result['merge_sort_noisy'] or result['quick_sort_noisy']:
+                print(f"  Measured in disturbed blocks - Merge: {result['merge_sort_noisy']}, "
+                      f"Quick: {result['quick_sort_noisy']}")
+            if any(censored_counts.values()):
+                print(f"  Timed out (censored) - Merge: {censored_counts['merge_sort']}, "
+                      f"Quick: {censored_counts['quick_sort']}")
             
-            if avg_merge_time > 0 and avg_quick_time > 0:
+            if merge_times and quick_times:
                 ratio = avg_merge_time / avg_quick_time
                 faster = "Quick Sort" if ratio > 1 else "Merge Sort"
                 print(f"  {faster} is {abs(ratio-1)*100:.1f}% faster")
@@ -145,82 +527,83 @@ class SortingAnalyzer:
                     merge_std = (sum((x - avg_merge_time)**2 for x in merge_times) / len(merge_times))**0.5
                     quick_std = (sum((x - avg_quick_time)**2 for x in quick_times) / len(quick_times))**0.5
                     print(f"  Standard deviation - Merge: {merge_std:.4f}ms, Quick: {quick_std:.4f}ms")
+            
+            if planners is not None:
+                # Each algorithm's planner follows its own sort phase; its slowest run is checked
+                # against the per-run budget and the size's sweep time is split between the algorithms
+                elapsed = (time.perf_counter() - started) / len(algorithms)
+                for algo, times in (('merge_sort', merge_times), ('quick_sort', quick_times)):
+                    if algo not in algorithms:
+                        continue
+                    if times:
+                        planners[algo].record(size, result[f'{algo}_sort_ms'] / 1000,
+                                              trial_time=max(times) / 1000, elapsed=elapsed)
+                    else:
+                        planners[algo].record(size, None, elapsed=elapsed)
+        
+        if planners is not None:
+            # Refinement sizes are measured out of order
+            self.results[first:] = sorted(self.results[first:], key=lambda r: r['input_size'])
+        return planners
     
-    def save_to_csv(self, filename="sorting_comparison_improved.csv"):
-        """Save results to CSV file"""
-        csv_path = os.path.join(os.path.dirname(__file__), filename)
+    def save_to_csv(self, filename=RESULTS_FILE, results=None):
+        """Save results (by default this analyzer's) to CSV file"""
+        csv_path = os.path.join(OUTPUT_DIR, filename)
         
         with open(csv_path, 'w', newline='') as csvfile:
-            fieldnames = ['input_size', 'merge_sort_time_ms', 'quick_sort_time_ms', 
+            fieldnames = ['profile', 'distribution', 'input_size', 'merge_sort_time_ms', 'quick_sort_time_ms', 
                          'merge_sort_median_ms', 'quick_sort_median_ms', 'iterations']
+            fieldnames += [f'{algo}_{phase}_ms' for phase in PHASES for algo in ('merge_sort', 'quick_sort')]
+            fieldnames += [f'{algo}_{field}' for algo in ('merge_sort', 'quick_sort')
+                           for field in ('sort_ci_low_ms', 'sort_ci_high_ms', 'outliers')]
+            fieldnames += ['converged']
+            fieldnames += [f'{algo}_{key}' for algo in ('merge_sort', 'quick_sort') for key in USAGE_COLUMNS]
+            fieldnames += ['merge_sort_censored', 'quick_sort_censored', 'merge_sort_noisy', 'quick_sort_noisy']
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             
             writer.writeheader()
-            for result in self.results[1:]:
+            for result in self.results if results is None else results:
                 writer.writerow(result)
         
         print(f"\nResults saved to: {csv_path}")
         return csv_path
     
+    def save_to_store(self, store, label=None):
+        """Record the measured iterations with build and host info; returns the run id"""
+        builds = [self.backends[algorithm].build_info(algorithm) for algorithm in ALGORITHMS]
+        # Each build profile (and input distribution other than the default random
+        # data) is its own history, so runs are only compared like for like
+        name = f"mergesort_analysis/{self.profile}" if self.profile else "mergesort_analysis"
+        in_process = [backend.name for backend in self.backends.values() if backend.in_process]
+        if in_process:
+            name += "/" + "+".join(in_process)
+        if self.distribution != "random":
+            name += f"/{self.distribution}"
+        return store.record_run(name, self.samples, builds, self.sweep_config(), label)
+    
     def generate_graph(self, filename="sorting_comparison_improved.png"):
         """Generate comparison graph with improved visualization"""
         if not self.results:
             print("No results to plot!")
             return
-        print(self.results)
-        # Prepare data for plotting
-        input_sizes = [r['input_size'] for r in self.results[1:]]
-        merge_times = [r['merge_sort_time_ms'] for r in self.results[1:]]
-        quick_times = [r['quick_sort_time_ms'] for r in self.results[1:]]
-        print(input_sizes)
-        # Create the plot with better styling
-        plt.figure(figsize=(12, 8))
-        
-        # Plot lines with better styling
-        plt.plot(input_sizes, merge_times, 'bo-', label='Merge Sort', 
-                linewidth=3, markersize=10, alpha=0.8)
-        plt.plot(input_sizes, quick_times, 'ro-', label='Quick Sort', 
-                linewidth=3, markersize=10, alpha=0.8)
-        
-        # Customize the plot
-        plt.xlabel('Input Size (number of elements)', fontsize=14)
-        plt.ylabel('Execution Time (milliseconds)', fontsize=14)
-        plt.title('Merge Sort vs Quick Sort Performance Comparison', 
-                 fontsize=16, fontweight='bold', pad=20)
-        plt.legend(fontsize=12)
-        plt.grid(True, alpha=0.3, linestyle='--')
-        
-        # Use linear scale for cleaner visualization
-        plt.xscale('linear')
-        plt.yscale('linear')
-        
-        # Add value annotations with better positioning
-        for i, (size, merge_time, quick_time) in enumerate(zip(input_sizes, merge_times, quick_times)):
-            plt.annotate(f'{merge_time:.3f}ms', 
-                        (size, merge_time), 
-                        textcoords="offset points", 
-                        xytext=(0,15), 
-                        ha='center', fontsize=10, 
-                        bbox=dict(boxstyle="round,pad=0.3", facecolor="lightblue", alpha=0.7))
-            plt.annotate(f'{quick_time:.3f}ms', 
-                        (size, quick_time), 
-                        textcoords="offset points", 
-                        xytext=(0,-20), 
-                        ha='center', fontsize=10,
-                        bbox=dict(boxstyle="round,pad=0.3", facecolor="lightcoral", alpha=0.7))
-        
-        plt.tight_layout()
-        
-        # Save the plot
-        graph_path = os.path.join(os.path.dirname(__file__), filename)
-        plt.savefig(graph_path, dpi=300, bbox_inches='tight')
+        graph_path = charts.render(comparison_chart(self.results, self.distribution, self.profile,
+                                                    os.path.join(OUTPUT_DIR, filename)))
         print(f"Graph saved to: {graph_path}")
+    
+    @staticmethod
+    def fit_complexity(sizes, times):
+        """Complexity models fitted to a sweep, best first (empty if too few points)"""
+        import fitting
         
-        # Show the plot
-        plt.show()
+        try:
+            return fitting.fit_models(sizes, times)
+        except ValueError:
+            return []
     
     def print_summary(self):
         """Print a summary of the analysis"""
+        import fitting
+        
         print("\n" + "="*60)
         print("PERFORMANCE ANALYSIS SUMMARY")
         print("="*60)
@@ -231,10 +614,15 @@ class SortingAnalyzer:
             quick_time = result['quick_sort_time_ms']
             
             print(f"\nInput Size: {size:,} elements")
-            print(f"Merge Sort: {merge_time:.4f} ms")
-            print(f"Quick Sort: {quick_time:.4f} ms")
+            for algo, label in (('merge_sort', "Merge Sort"), ('quick_sort', "Quick Sort")):
+                if result[f'{algo}_time_ms'] is None:
+                    continue
+                print(f"{label}: {result[f'{algo}_time_ms']:.4f} ms (sort phase: {result[f'{algo}_sort_ms']:.4f} ms, "
+                      f"user {result[f'{algo}_user_ms']:.3f} ms, sys {result[f'{algo}_system_ms']:.3f} ms, "
+                      f"peak RSS {format_rss(result[f'{algo}_max_rss_kb'])}, "
+                      f"{result[f'{algo}_minor_faults']:.0f} minor faults)")
             
-            if merge_time > 0 and quick_time > 0:
+            if merge_time and quick_time:
                 if quick_time < merge_time:
                     improvement = ((merge_time - quick_time) / merge_time) * 100
                     print(f"Quick Sort is {improvement:.1f}% faster")
@@ -245,46 +633,226 @@ class SortingAnalyzer:
         print("\nTime Complexity Analysis:")
         print("- Merge Sort: O(n log n) - Guaranteed")
         print("- Quick Sort: O(n log n) average, O(n²) worst case")
+        
+        # Fitted models for the measured sort phase (weighted least squares, ranked by AIC)
+        for label, key in (("Merge Sort", 'merge_sort_sort_ms'), ("Quick Sort", 'quick_sort_sort_ms')):
+            fits = self.fit_complexity(*measured(self.results, key))
+            if not fits:
+                continue
+            print(f"\n{label} fitted models (sort phase, ms):")
+            for fit in fits:
+                print(f"  {fitting.name(fit):>16}: {fitting.describe(fit):<32} AIC {fit['aic']:8.2f}  R² {fit['r2']:.4f}")
+            best = fits[0]
+            print(f"  Best: {fitting.name(best)}; predicted at n=1,000,000: "
+                  f"{float(fitting.predict(best, 10**6)):.2f} ms, n=10,000,000: "
+                  f"{float(fitting.predict(best, 10**7)):.2f} ms")
+
+def print_profile_comparison(analyzers):
+    """Sort-phase times of both algorithms under every compiler profile, side by side"""
+    print("\n" + "="*60)
+    print("COMPILER PROFILE COMPARISON (sort phase, ms)")
+    print("="*60)
+    profiles = [a.profile for a in analyzers]
+    by_size = [{r['input_size']: r for r in a.results} for a in analyzers]
+    header = f"{'Size':>8}" + "".join(f" {p:>15}" for p in profiles)
+    for algo, label in (('merge_sort', "Merge Sort"), ('quick_sort', "Quick Sort")):
+        print(f"\n{label}:")
+        print(header)
+        for size in sorted(set.intersection(*(set(r) for r in by_size))):
+            # "-" where a profile's sweep of this algorithm stopped before the size
+            print(f"{size:>8}" + "".join(f" {r[size][f'{algo}_sort_ms']:>15.4f}" if r[size][f'{algo}_sort_ms']
+                                         else f" {'-':>15}" for r in by_size))
+        # Largest size every profile measured this algorithm at
+        common = [size for size in set.intersection(*(set(r) for r in by_size))
+                  if all(r[size][f'{algo}_sort_ms'] for r in by_size)]
+        if common:
+            largest = max(common)
+            times = {p: r[largest][f'{algo}_sort_ms'] for p, r in zip(profiles, by_size)}
+            best = min(times, key=times.get)
+            slowest = max(times.values())
+            print(f"  Fastest at n={largest:,}: {best} ({slowest / times[best]:.2f}x faster than the slowest profile)")
+
+
+def plot_profiles(analyzers, filename="sorting_comparison_profiles.png"):
+    """Plot sort-phase time against size for every compiler profile, one panel per algorithm"""
+    graph_path = charts.render(profiles_chart({analyzer.profile: analyzer.results for analyzer in analyzers},
+                                              os.path.join(OUTPUT_DIR, filename)))
+    print(f"Profile comparison graph saved to: {graph_path}")
+
+
+def comparison_chart(results, distribution, profile, graph_path):
+    """Chart spec of both algorithms' sort phase against size, with fitted models and annotated points"""
+    # Sizes an algorithm's sweep stopped before are left out
+    merge_sizes, merge_times = measured(results, 'merge_sort_sort_ms')
+    quick_sizes, quick_times = measured(results, 'quick_sort_sort_ms')
+    input_sizes = merge_sizes + quick_sizes
+    # Linear scale for cleaner visualization, unless a planned sweep spans several decades
+    scale = 'log' if input_sizes and max(input_sizes) > 100 * min(input_sizes) else 'linear'
+    return {'path': graph_path, 'figsize': (12, 8), 'panels': [{
+        'title': f'Merge Sort vs Quick Sort Performance Comparison ({distribution} data, {profile or "custom"} build)',
+        'title_kwargs': {'fontsize': 16, 'fontweight': 'bold', 'pad': 20},
+        'xlabel': 'Input Size (number of elements)', 'ylabel': 'Sort Time (milliseconds, excl. startup and I/O)',
+        'label_kwargs': {'fontsize': 14}, 'legend_kwargs': {'fontsize': 12},
+        'grid_kwargs': {'alpha': 0.3, 'linestyle': '--'}, 'xscale': scale, 'yscale': scale,
+        'series': [
+            {'kind': 'line', 'x': merge_sizes, 'y': merge_times, 'fmt': 'bo-', 'label': 'Merge Sort',
+             'linewidth': 3, 'markersize': 10, 'alpha': 0.8,
+             'annotate': {'format': '{:.3f}ms', 'offset': (0, 15), 'facecolor': "lightblue"}},
+            {'kind': 'line', 'x': quick_sizes, 'y': quick_times, 'fmt': 'ro-', 'label': 'Quick Sort',
+             'linewidth': 3, 'markersize': 10, 'alpha': 0.8,
+             'annotate': {'format': '{:.3f}ms', 'offset': (0, -20), 'facecolor': "lightcoral"}},
+            # The best-ranked complexity model for each algorithm
+            {'kind': 'fit', 'x': merge_sizes, 'y': merge_times, 'color': 'blue', 'linestyle': ':', 'linewidth': 2},
+            {'kind': 'fit', 'x': quick_sizes, 'y': quick_times, 'color': 'red', 'linestyle': ':', 'linewidth': 2},
+        ]}]}
+
+
+def profiles_chart(results, graph_path):
+    """Chart spec of sort-phase time per compiler profile ({profile: results}), one panel per algorithm"""
+    panels = []
+    for algo, label in (('merge_sort', "Merge Sort"), ('quick_sort', "Quick Sort")):
+        series = []
+        for profile, profile_results in results.items():
+            sizes, times = measured(profile_results, f'{algo}_sort_ms')
+            series.append({'kind': 'line', 'x': sizes, 'y': times, 'fmt': 'o-', 'label': profile,
+                           'linewidth': 2, 'markersize': 6})
+        panels.append({'title': label, 'title_kwargs': {'fontsize': 14, 'fontweight': 'bold'},
+                       'xlabel': 'Input Size (number of elements)', 'legend_kwargs': {'fontsize': 11},
+                       'grid_kwargs': {'alpha': 0.3, 'linestyle': '--'}, 'series': series})
+    panels[0]['ylabel'] = 'Sort Time (milliseconds, excl. startup and I/O)'
+    return {'path': graph_path, 'figsize': (16, 7), 'sharey': True, 'panels': panels,
+            'suptitle': 'Sort Time by Compiler Profile', 'suptitle_kwargs': {'fontsize': 16, 'fontweight': 'bold'}}
+
+
+def load_csv(filename=RESULTS_FILE):
+    """Results saved by save_to_csv, with numbers and flags parsed back"""
+    def parse(value):
+        if value in ("", "None"):
+            return None
+        if value in ("True", "False"):
+            return value == "True"
+        for kind in (int, float):
+            try:
+                return kind(value)
+            except ValueError:
+                pass
+        return value
+    
+    with open(os.path.join(OUTPUT_DIR, filename), newline='') as csvfile:
+        return [{key: parse(value) for key, value in row.items()} for row in csv.DictReader(csvfile)]
+
+
+def report_charts(filename=RESULTS_FILE):
+    """Chart specs for every graph of the saved results, as main() draws them"""
+    if not os.path.exists(os.path.join(OUTPUT_DIR, filename)):
+        print(f"No saved results in {os.path.join(OUTPUT_DIR, filename)}")
+        return []
+    rows = load_csv(filename)
+    if not rows or 'merge_sort_sort_ms' not in rows[0]:
+        print(f"{filename} has no sort-phase columns to chart")
+        return []
+    runs = {}
+    for row in rows:
+        runs.setdefault((row['distribution'], row['profile']), []).append(row)
+    specs = []
+    # Every profile on random data side by side, the default build's in detail
+    profiles = {profile: results for (distribution, profile), results in runs.items() if distribution == "random"}
+    if len(profiles) > 1:
+        specs.append(profiles_chart(profiles, os.path.join(OUTPUT_DIR, "sorting_comparison_profiles.png")))
+    for (distribution, profile), results in runs.items():
+        if distribution == "random":
+            if profile == DEFAULT_PROFILE:
+                specs.append(comparison_chart(results, distribution, profile,
+                                              os.path.join(OUTPUT_DIR, "sorting_comparison_improved.png")))
+        else:
+            suffix = "" if profile == DEFAULT_PROFILE else f"_{profile}"
+            specs.append(comparison_chart(results, distribution, profile,
+                                          os.path.join(OUTPUT_DIR, f"sorting_comparison_{distribution}{suffix}.png")))
+    return specs
+
 
 def main():
     """Main function to run the analysis"""
-    # Check if executables exist
-    analyzer = SortingAnalyzer()
-    
-    if not os.path.exists(analyzer.mergesort_path):
-        print(f"Error: Merge sort executable not found at {analyzer.mergesort_path}")
-        print("Please compile mergesort.cpp first.")
-        return
+    from planner import SweepPlanner
     
-    if not os.path.exists(analyzer.quicksort_path):
-        print(f"Error: Quick sort executable not found at {analyzer.quicksort_path}")
-        print("Please compile quicksort.cpp first.")
+    # Build both algorithms under every compiler profile (in parallel, cached by source and flags)
+    print(f"Building profiles: {', '.join(DEFAULT_MATRIX)}")
+    try:
+        builds = build_matrix(profiles=DEFAULT_MATRIX)
+    except BuildError as e:
+        print(f"Error: {e}")
         return
+    for build in builds:
+        print(f"  {build['algorithm']:<10} {build['profile']:<14} {'cached' if build['cached'] else 'built':<7} {build['flags']}")
     
-    # Set random seed for reproducible results
-    random.seed(42)
+    # Sizes grow geometrically and are refined where the slope bends; each
+    # algorithm stops once a run would take more than a second
+    sweep = dict(start=10, growth=2.0, trial_budget=1.0, total_budget=120.0)
     
+    analyzers = []
+    adversarial = None
     try:
-        # Run the analysis
-        analyzer.run_analysis()
+        # Every profile is a full merge vs quick sweep; each measurement is journaled
+        # as it completes, so re-running resumes an interrupted sweep
+        for profile in DEFAULT_MATRIX:
+            print(f"\n{'#' * 70}\n# Profile {profile}\n{'#' * 70}")
+            analyzer = SortingAnalyzer(SortingOptions(profile=profile, journal=True, verify=True, noise=True,
+                                                      telemetry=True))
+            analyzers.append(analyzer)
+            print(f"Telemetry: {analyzer.telemetry.target} (watch with: python telemetry.py tail <file> --follow)")
+            if analyzer.journal.resumed:
+                print(f"Resuming: {analyzer.journal.resumed} measurements already recorded in {analyzer.journal.path}")
+            
+            # Run the analysis
+            analyzer.run_analysis(SweepPlanner(**sweep))
+            
+            # Keep the run in the results history and check for regressions
+            analyzer.check_regressions()
+            
+            # Print summary
+            analyzer.print_summary()
+        
+        # Quick sort's constructed worst case (datagen "adversary") under the default build,
+        # to set against the random-data curves
+        print(f"\n{'#' * 70}\n# Adversarial input, profile {DEFAULT_PROFILE}\n{'#' * 70}")
+        adversarial = SortingAnalyzer(SortingOptions(profile=DEFAULT_PROFILE, distribution="adversary",
+                                                     journal=True, verify=True, noise=True, telemetry=True))
+        adversarial.run_analysis(SweepPlanner(**sweep))
+        adversarial.check_regressions()
+        adversarial.print_summary()
         
-        # Save results to CSV
-        analyzer.save_to_csv()
+        # Save results of all profiles to one CSV
+        analyzers[0].save_to_csv(results=[r for a in analyzers + [adversarial] for r in a.results])
         
-        # Generate graph
-        analyzer.generate_graph()
+        # Compare the profiles, then draw every graph from the saved CSV exactly as
+        # `lab.py report mergesort` would
+        print_profile_comparison(analyzers)
+        for graph_path in charts.render_all(report_charts()):
+            print(f"Graph saved to: {graph_path}")
         
-        # Print summary
-        analyzer.print_summary()
+        # Every sweep finished: retire the journals so the next run measures afresh
+        for analyzer in analyzers + [adversarial]:
+            analyzer.journal.complete()
         
         print("\nAnalysis completed successfully!")
         
     except KeyboardInterrupt:
         print("\nAnalysis interrupted by user.")
+        if analyzers:
+            print(f"{sum(len(a.journal) for a in analyzers)} measurements saved to "
+                  f"{os.path.dirname(analyzers[-1].journal.path)}; run again to resume")
+        # Keep the sizes that did complete
+        completed = [r for a in analyzers + [adversarial] if a is not None for r in a.results]
+        if completed:
+            analyzers[0].save_to_csv(results=completed)
     except Exception as e:
         print(f"\nError during analysis: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        for analyzer in analyzers + [adversarial]:
+            if analyzer is not None:
+                analyzer.close()
 
 if __name__ == "__main__":
     main()
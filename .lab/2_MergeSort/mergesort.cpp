@@ -1,4 +1,5 @@
 #include <bits/stdc++.h>
+#include "../.harness/bench.hpp"
 using namespace std;
 
 void merge(vector<int>& arr, int left, int mid, int right) {
@@ -47,19 +48,9 @@ void mergeSort(vector<int>& arr, int left, int right) {
     }
 }
 
-int main() {
-    int len;
-    cin >> len;
-    vector<int> arr(len);
-    for (int i = 0; i < len; i++) cin >> arr[i];
-    
-    mergeSort(arr, 0, len - 1);
-    
-    for (int i = 0; i < len; i++) {
-        cout << arr[i];
-        if (i < len - 1) cout << " ";
-    }
-    cout << endl;
-
-    return 0;
-}
\ No newline at end of file
+int main(int argc, char** argv) {
+    return bench::run(argc, argv, [](vector<int>& arr) {
+        int len = arr.size();
+        mergeSort(arr, 0, len - 1);
+    });
+}